@@ -6,183 +6,337 @@ Generates unique, high-quality art variations for Etsy print-on-demand
 import os
 import logging
 import json
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 from openai import OpenAI
 
+from config.settings import DRAFT_QUALITY, DRAFT_VISION_CHECK, IMAGE_QUALITY, TWO_TIER_GENERATION
+
+from .derivative_cache import fingerprint
+from .draft_screen import DraftScreener
+from .events import publish
+from .history_store import HistoryStore
+from .image_io import fetch_image, path_slug
+from .model_router import ModelRouter
+from .print_export import PrintExporter
+from .records import GeneratedImage
+from .tracing import span
+from .versioning import VersionCounter
+
 logger = logging.getLogger(__name__)
 
 
 class ArtGenerationAgent:
-      """
-          Generates unique art variations using OpenAI's DALL-E 3.
-              Creates 1024x1024 HD quality images suitable for print-on-demand products.
-                  """
-
-    def __init__(self, api_key: Optional[str] = None):
-              """Initialize the Art Generation Agent."""
-              self.api_key = api_key or os.getenv("OPENAI_API_KEY")
-              if not self.api_key:
-                            raise ValueError("OpenAI API key required")
-
-              self.client = OpenAI(api_key=self.api_key)
-              self.generated_images = []
-              logger.info("ArtGenerationAgent initialized")
-
-    def generate_images(self, niche: str, num_images: int = 50, styles: Optional[List[str]] = None) -> Dict[str, Any]:
-              """
-                      Generate art variations for a specific niche.
-
-                                      Args:
-                                                  niche: Target niche (e.g., "kawaii cats")
-                                                              num_images: Number of images to generate
-                                                                          styles: Optional list of art styles to use
-
-                                                                                              Returns:
-                                                                                                          Dict with generated image metadata
-                                                                                                                  """
-              if styles is None:
-                            styles = ["minimalist", "watercolor", "abstract", "digital art", "oil painting"]
-
-              logger.info(f"Generating {num_images} images for niche: {niche}")
+    """
+    Generates unique art variations using OpenAI's DALL-E 3.
+    Creates 1024x1024 HD quality images suitable for print-on-demand products.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, exporter: Optional[PrintExporter] = None,
+                 screener: Optional[DraftScreener] = None):
+        """Initialize the Art Generation Agent. The screener is used by two-tier generation."""
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
+        if not self.api_key:
+            raise ValueError("OpenAI API key required")
+
+        self.client = OpenAI(api_key=self.api_key)
+        self.generated_images = HistoryStore("generated_images", key="id", record_type=GeneratedImage)
+        self.version = VersionCounter()
+        self.exporter = exporter or PrintExporter()
+        self.router = ModelRouter(self.client)
+        self.screener = screener or DraftScreener(vision_check=self._review_draft if DRAFT_VISION_CHECK else None)
+        logger.info("ArtGenerationAgent initialized")
+
+    def generate_images(self, niche: str, num_images: int = 50, styles: Optional[List[str]] = None,
+                        two_tier: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        Generate art variations for a specific niche.
+
+        Args:
+            niche: Target niche (e.g., "kawaii cats")
+            num_images: Number of images to generate
+            styles: Optional list of art styles to use
+            two_tier: Generate standard-quality drafts first and regenerate only
+                the drafts that pass screening in HD. Defaults to TWO_TIER_GENERATION.
+
+        Returns:
+            Dict with generated image metadata
+        """
+        if styles is None:
+            styles = ["minimalist", "watercolor", "abstract", "digital art", "oil painting"]
+        if two_tier is None:
+            two_tier = TWO_TIER_GENERATION
+
+        logger.info("Generating %s images for niche: %s", num_images, niche)
 
         generated = {
-                      "niche": niche,
-                      "num_requested": num_images,
-                      "images": [],
-                      "generation_timestamp": datetime.now().isoformat(),
-                      "status": "in_progress"
+            "niche": niche,
+            "num_requested": num_images,
+            "images": [],
+            "generation_timestamp": datetime.now().isoformat(),
+            "status": "in_progress"
         }
 
         try:
-                      style_cycle = 0
-                      for i in range(min(num_images, 100)):  # DALL-E quota management
-                          # Create varied prompts for each image
-                                        style = styles[style_cycle % len(styles)]
-                                        prompt = self._create_prompt(niche, i, style)
-
-                logger.info(f"Generating image {i+1}/{num_images}: {prompt[:50]}...")
-
-                # Generate image with DALL-E 3
-                image_data = self._call_dalle3(prompt)
-
-                if image_data:
-                                      generated["images"].append({
-                                                                "id": f"img_{niche.replace(' ', '_')}_{i:04d}",
-                                                                "niche": niche,
-                                                                "style": style,
-                                                                "prompt": prompt,
-                                                                "url": image_data.get("url"),
-                                                                "size": "1024x1024",
-                                                                "created_at": datetime.now().isoformat(),
-                                                                "ready_for_print": True
-                                      })
-
-                style_cycle += 1
+            # Create varied prompts for each image
+            plan = []
+            for i in range(min(num_images, 100)):  # DALL-E quota management
+                style = styles[i % len(styles)]
+                plan.append((i, style, self._create_prompt(niche, i, style)))
+
+            if two_tier:
+                generated["images"] = self._generate_two_tier(niche, plan, generated)
+            else:
+                generated["images"] = self._generate_direct(niche, plan)
 
             generated["status"] = "completed"
             generated["num_generated"] = len(generated["images"])
             self.generated_images.extend(generated["images"])
+            self.version.bump()
+            for image in generated["images"]:
+                publish("image.generated", item_id=image.id, niche=niche, url=image.url)
 
-            logger.info(f"Generated {len(generated['images'])} images for {niche}")
+            logger.info("Generated %s images for %s", len(generated['images']), niche)
             return generated
 
-except Exception as e:
-            logger.error(f"Image generation failed: {str(e)}")
+        except Exception as e:
+            logger.error("Image generation failed: %s", e)
             generated["status"] = "failed"
             generated["error"] = str(e)
             return generated
 
+    def _generate_direct(self, niche: str, plan: List[Tuple[int, str, str]]) -> List[GeneratedImage]:
+        """Generate every planned image straight at HD quality."""
+        images = []
+        for i, style, prompt in plan:
+            logger.debug("Generating image %d/%d: %.50s...", i + 1, len(plan), prompt, extra={"sample": True})
+
+            # Generate image with DALL-E 3
+            image_data = self._call_dalle3(prompt)
+
+            if image_data:
+                images.append(self._new_image(niche, i, style, prompt, image_data))
+        return images
+
+    def _generate_two_tier(self, niche: str, plan: List[Tuple[int, str, str]],
+                           generated: Dict[str, Any]) -> List[GeneratedImage]:
+        """
+        Draft every planned image at standard quality, screen the drafts and
+        regenerate only the survivors in HD. Adds a "drafts" summary to generated.
+        """
+        drafts = []
+        for i, style, prompt in plan:
+            logger.debug("Drafting image %d/%d: %.50s...", i + 1, len(plan), prompt, extra={"sample": True})
+            draft = self._call_dalle3(prompt, quality=DRAFT_QUALITY)
+            if draft:
+                drafts.append({"index": i, "style": style, "prompt": prompt, "url": draft["url"],
+                               "revised_prompt": draft.get("revised_prompt")})
+
+        accepted, rejected = self.screener.screen(drafts, niche)
+
+        images = []
+        for draft in accepted:
+            # DALL-E 3 takes no seed, so the draft's revised prompt is the closest
+            # we can get to re-rendering the same composition in HD
+            image_data = self._call_dalle3(draft["revised_prompt"] or draft["prompt"])
+            if image_data:
+                images.append(self._new_image(niche, draft["index"], draft["style"], draft["prompt"], image_data,
+                                              draft_url=draft["url"], quality_score=draft["score"]))
+
+        generated["drafts"] = {
+            "generated": len(drafts),
+            "accepted": len(accepted),
+            "rejected": [
+                {"index": d["index"], "url": d["url"], "reason": d["reason"], "score": d.get("score")}
+                for d in rejected
+            ]
+        }
+        logger.info("Two-tier generation for %s: %s drafts, %s regenerated in HD",
+                    niche, len(drafts), len(images))
+        return images
+
+    def _new_image(self, niche: str, index: int, style: str, prompt: str, image_data: Dict[str, str],
+                   **lineage: Any) -> GeneratedImage:
+        # Ids become file names downstream (print exports), so the niche is slugged
+        image_id = f"img_{path_slug(niche)}_{index:04d}"
+        # Versioned so browsers never reuse a cached derivative of an earlier image with this id
+        version = fingerprint(image_data.get("url") or "")
+        return GeneratedImage(
+            id=image_id,
+            niche=niche,
+            style=style,
+            prompt=prompt,
+            url=image_data.get("url"),
+            size="1024x1024",
+            thumbnail_url=f"/api/images/{image_id}/thumb?v={version}",
+            preview_url=f"/api/images/{image_id}/preview?v={version}",
+            created_at=datetime.now().isoformat(),
+            ready_for_print=True,
+            quality=IMAGE_QUALITY,
+            revised_prompt=image_data.get("revised_prompt"),
+            **lineage
+        )
+
+    def _review_draft(self, url: str, niche: str) -> bool:
+        """Vision check of a draft. Only a clear FAIL rejects it; errors let it through."""
+        try:
+            response = self.router.complete(
+                "draft_review",
+                messages=[{
+                    "role": "user",
+                    "content": [
+                        {
+                            "type": "text",
+                            "text": f"This is a draft of wall art for the Etsy niche \"{niche}\". Answer PASS if it "
+                                    "clearly fits the niche and has no garbled text, extra limbs or obvious "
+                                    "artifacts; otherwise answer FAIL. One word."
+                        },
+                        {"type": "image_url", "image_url": {"url": url, "detail": "low"}}
+                    ]
+                }],
+                temperature=0,
+                max_tokens=3
+            )
+            verdict = response.choices[0].message.content.strip().upper()
+        except Exception as e:
+            logger.warning("Draft review failed for %s: %s", url, e)
+            return True
+        return not verdict.startswith("FAIL")
+
     def _create_prompt(self, niche: str, index: int, style: str) -> str:
-              """Create a unique prompt for each image variation."""
-              variations = [
-                  f"A {style} illustration of {niche}",
-                  f"{niche} art in {style} style, trending on Artstation",
-                  f"Beautiful {niche} design with {style} aesthetic",
-                  f"Modern {style} artwork featuring {niche}",
-                  f"Creative {niche} print in {style} style for home decoration",
-                  f"Professional {style} art of {niche}, high quality",
-                  f"Unique {niche} artwork with {style} technique",
-                  f"Contemporary {niche} design using {style} style",
-              ]
+        """Create a unique prompt for each image variation."""
+        variations = [
+            f"A {style} illustration of {niche}",
+            f"{niche} art in {style} style, trending on Artstation",
+            f"Beautiful {niche} design with {style} aesthetic",
+            f"Modern {style} artwork featuring {niche}",
+            f"Creative {niche} print in {style} style for home decoration",
+            f"Professional {style} art of {niche}, high quality",
+            f"Unique {niche} artwork with {style} technique",
+            f"Contemporary {niche} design using {style} style",
+        ]
 
         base_prompt = variations[index % len(variations)]
         return f"{base_prompt}. High resolution, print-ready, 1024x1024, professional quality. Suitable for Etsy print-on-demand products."
 
-    def _call_dalle3(self, prompt: str) -> Optional[Dict[str, str]]:
-              """Call DALL-E 3 API to generate an image."""
-              try:
-                            response = self.client.images.generate(
-                                              model="dall-e-3",
-                                              prompt=prompt,
-                                              size="1024x1024",
-                                              quality="hd",
-                                              n=1
-                            )
+    def _call_dalle3(self, prompt: str, quality: str = IMAGE_QUALITY) -> Optional[Dict[str, str]]:
+        """Call DALL-E 3 API to generate an image ("standard" or "hd" quality)."""
+        try:
+            with span("image_generation", "model", model="dall-e-3", quality=quality):
+                response = self.client.images.generate(
+                    model="dall-e-3",
+                    prompt=prompt,
+                    size="1024x1024",
+                    quality=quality,
+                    n=1
+                )
 
             return {
-                              "url": response.data[0].url,
-                              "revised_prompt": response.data[0].revised_prompt
+                "url": response.data[0].url,
+                "revised_prompt": response.data[0].revised_prompt
             }
-except Exception as e:
-            logger.error(f"DALL-E 3 call failed: {str(e)}")
+        except Exception as e:
+            logger.error("DALL-E 3 call failed: %s", e)
             # Return placeholder for demo
             return {
-                              "url": f"https://placeholder.com/1024x1024?text={prompt[:30]}",
-                              "revised_prompt": prompt
+                "url": f"https://placeholder.com/1024x1024?text={prompt[:30]}",
+                "revised_prompt": prompt
             }
 
     def upscale_image(self, image_url: str) -> Dict[str, Any]:
-              """
-                      Upscale an image for higher quality print.
-                              Uses OpenAI upscaling or third-party service.
-                                      """
-              return {
-                  "original_url": image_url,
-                  "upscaled_url": image_url,  # In production, call upscaling API
-                  "upscale_quality": "2x",
-                  "status": "completed"
-              }
+        """
+        Upscale an image for higher quality print.
+        Uses OpenAI upscaling or third-party service.
+        """
+        return {
+            "original_url": image_url,
+            "upscaled_url": image_url,  # In production, call upscaling API
+            "upscale_quality": "2x",
+            "status": "completed"
+        }
 
     def apply_effects(self, image_url: str, effects: List[str]) -> Dict[str, Any]:
-              """
-                      Apply artistic effects to generated images.
-                              Effects: ["sepia", "vintage", "neon", "pastel", "vibrant"]
-                                      """
-              return {
-                  "original_url": image_url,
-                  "effects_applied": effects,
-                  "status": "completed"
-              }
+        """
+        Apply artistic effects to generated images.
+        Effects: ["sepia", "vintage", "neon", "pastel", "vibrant"]
+        """
+        return {
+            "original_url": image_url,
+            "effects_applied": effects,
+            "status": "completed"
+        }
 
     def batch_generate(self, niches: List[str], images_per_niche: int = 10) -> List[Dict[str, Any]]:
-              """Generate images for multiple niches in batch."""
-              results = []
-              for niche in niches:
-                            result = self.generate_images(niche, images_per_niche)
-                            results.append(result)
+        """Generate images for multiple niches in batch."""
+        results = []
+        for niche in niches:
+            result = self.generate_images(niche, images_per_niche)
+            results.append(result)
 
-              return results
+        return results
 
     def get_generated_images(self, niche: Optional[str] = None) -> List[Dict[str, Any]]:
-              """Retrieve generated images, optionally filtered by niche."""
-              if niche:
-                            return [img for img in self.generated_images if img.get("niche") == niche]
-                        return self.generated_images
+        """Retrieve generated images, optionally filtered by niche."""
+        if niche:
+            return [img for img in self.generated_images if img.get("niche") == niche]
+        return list(self.generated_images)
 
-    def export_for_listing(self, image_id: str) -> Dict[str, Any]:
-              """Prepare image for Etsy listing upload."""
-        image = next((img for img in self.generated_images if img["id"] == image_id), None)
+    def get_image(self, image_id: str) -> Optional[Dict[str, Any]]:
+        """Look up a generated image by id."""
+        return self.generated_images.get(image_id)
 
-        if not image:
-                      return {"error": "Image not found"}
+    def export_for_listing(self, image_id: str, sizes: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Prepare image for Etsy listing upload, rendering print-size files.
 
-        return {
-                      "image_id": image_id,
-                      "url": image["url"],
-                      "title": f"{image['niche']} - {image['style']} Design",
-                      "description": f"Beautiful {image['niche']} artwork in {image['style']} style. Ready for print-on-demand products.",
-                      "print_ready": True,
-                      "dimensions": "1024x1024",
-                      "dpi": 300
-        }
+        Args:
+            image_id: Generated image ID
+            sizes: Print sizes to render (e.g. ["8x10"]). Defaults to all configured sizes.
+
+        Returns:
+            Listing metadata with one entry per exported print file
+        """
+        exported = self.export_batch([image_id], sizes)
+        return exported[0]
+
+    def export_batch(self, image_ids: List[str], sizes: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Export several images at once so every size of every image shares one process pool.
+
+        Returns:
+            One export_for_listing-style result per requested image ID
+        """
+        images = {image_id: self.generated_images.get(image_id) for image_id in image_ids}
+        results: Dict[str, Dict[str, Any]] = {}
+        sources = {}
+
+        for image_id in image_ids:
+            image = images.get(image_id)
+            if not image:
+                results[image_id] = {"image_id": image_id, "error": "Image not found"}
+                continue
+            try:
+                sources[image_id] = str(fetch_image(image["url"]))
+            except Exception as e:
+                logger.error("Could not fetch %s for export: %s", image_id, e)
+                results[image_id] = {"image_id": image_id, "error": f"Could not fetch image: {str(e)}"}
+
+        try:
+            files = self.exporter.export_many(sources, sizes) if sources else {}
+        except ValueError as e:
+            return [{"image_id": image_id, "error": str(e)} for image_id in image_ids]
+
+        for image_id, image_files in files.items():
+            image = images[image_id]
+            results[image_id] = {
+                "image_id": image_id,
+                "url": image["url"],
+                "title": f"{image['niche']} - {image['style']} Design",
+                "description": f"Beautiful {image['niche']} artwork in {image['style']} style. Ready for print-on-demand products.",
+                "print_ready": all("error" not in f for f in image_files),
+                "dimensions": image.get("size", "1024x1024"),
+                "dpi": self.exporter.dpi,
+                "files": image_files
+            }
+
+        return [results[image_id] for image_id in image_ids]
@@ -0,0 +1,282 @@
+"""
+Caption Pool - Per-niche pools of ready-to-use TikTok captions
+Pools are filled with one structured GPT call covering many niches at once
+and refilled in the background, so caption requests are served locally.
+"""
+
+import re
+import json
+import logging
+import threading
+from collections import OrderedDict, deque
+from typing import Dict, Any, List, Optional, Iterable
+
+logger = logging.getLogger(__name__)
+
+# Completion budget: about 60 tokens per caption, JSON overhead, and a hard per-call cap
+TOKENS_PER_CAPTION = 60
+MAX_COMPLETION_TOKENS = 4000
+MAX_CAPTIONS_PER_CALL = (MAX_COMPLETION_TOKENS - 100) // TOKENS_PER_CAPTION
+
+# Leading list markers such as "1.", "2)", "-", "*", "•"
+_LIST_MARKER = re.compile(r"^\s*(?:\d+[.)]|[-*•])\s*")
+
+
+def clean_caption(text: str) -> Optional[str]:
+    """
+    Normalize a raw caption line.
+
+    Strips list numbering, bullets and wrapping quotes. Returns None for
+    lines that are not captions (blank lines and headers ending in ":").
+    """
+    caption = _LIST_MARKER.sub("", text.strip())
+    caption = caption.strip().strip('"').strip("'").strip()
+    if not caption or caption.endswith(":"):
+        return None
+    return caption
+
+
+def caption_key(caption: str) -> str:
+    """Dedupe key: case- and whitespace-insensitive."""
+    return " ".join(caption.lower().split())
+
+
+def plan_batches(wanted: Dict[str, int], limit: int = MAX_CAPTIONS_PER_CALL) -> List[Dict[str, int]]:
+    """
+    Split per-niche caption counts into requests of at most `limit` captions.
+
+    Niches are packed in order; a niche needing more than fits is split
+    across consecutive requests.
+    """
+    limit = max(1, limit)
+    batches: List[Dict[str, int]] = []
+    current: Dict[str, int] = {}
+    room = limit
+    for niche, count in wanted.items():
+        while count > 0:
+            take = min(count, room)
+            current[niche] = current.get(niche, 0) + take
+            count -= take
+            room -= take
+            if room == 0:
+                batches.append(current)
+                current, room = {}, limit
+    if current:
+        batches.append(current)
+    return batches
+
+
+class CaptionPool:
+    """
+    Hands out unique captions per niche from an in-memory pool.
+
+    When a pool drops below low_watermark its niche is queued for refill.
+    A background worker drains the queue, batching up to max_batch_niches
+    niches into a single JSON-mode completion.
+    """
+
+    def __init__(self, router, target_size: int = 30, low_watermark: int = 10, max_batch_niches: int = 10,
+                 seen_limit: int = 1000):
+        """
+        Initialize the caption pool.
+
+        Args:
+            router: ModelRouter used for refills (task "captions")
+            target_size: Captions to hold per niche after a refill
+            low_watermark: Pool size that triggers a background refill
+            max_batch_niches: Maximum niches covered by one refill call
+            seen_limit: Recent captions remembered per niche for deduplication
+        """
+        self.router = router
+        self.target_size = target_size
+        self.low_watermark = low_watermark
+        self.max_batch_niches = max_batch_niches
+        self.seen_limit = max(1, seen_limit)
+
+        self._pools: Dict[str, deque] = {}
+        # Per niche, the most recent caption keys in insertion order; the oldest are forgotten
+        self._seen: Dict[str, "OrderedDict[str, None]"] = {}
+        self._pending: Dict[str, None] = {}  # insertion-ordered set of niches awaiting refill
+        self._cond = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+
+    def available(self, niche: str) -> int:
+        """Number of captions currently pooled for a niche."""
+        with self._cond:
+            return len(self._pools.get(niche, ()))
+
+    def take(self, niche: str, count: int) -> List[str]:
+        """
+        Take up to `count` never-before-issued captions for a niche.
+
+        Falls back to a synchronous (batched) refill only when the pool
+        cannot satisfy the request.
+        """
+        captions = self._pop(niche, count)
+        if len(captions) < count:
+            batch = [niche] + self._drain_pending(self.max_batch_niches - 1, exclude=niche)
+            self.refill(batch, minimum={niche: count - len(captions)})
+            captions += self._pop(niche, count - len(captions))
+
+        if self.available(niche) < self.low_watermark:
+            self.request_refill([niche])
+        return captions
+
+    def _pop(self, niche: str, count: int) -> List[str]:
+        with self._cond:
+            pool = self._pools.get(niche)
+            if not pool:
+                return []
+            return [pool.popleft() for _ in range(min(count, len(pool)))]
+
+    def request_refill(self, niches: Iterable[str]) -> None:
+        """Queue niches for background refill."""
+        with self._cond:
+            for niche in niches:
+                self._pending[niche] = None
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="caption-pool", daemon=True)
+                self._worker.start()
+            self._cond.notify()
+
+    def _drain_pending(self, limit: int, exclude: Optional[str] = None) -> List[str]:
+        with self._cond:
+            niches = [n for n in self._pending if n != exclude][:max(limit, 0)]
+            for niche in niches:
+                self._pending.pop(niche, None)
+            self._pending.pop(exclude, None)
+            return niches
+
+    def _run(self) -> None:
+        """Background worker: refill queued niches in batches."""
+        while True:
+            with self._cond:
+                while not self._pending:
+                    if not self._cond.wait(timeout=60):
+                        # Idle; let the thread exit and restart on demand
+                        self._worker = None
+                        return
+            batch = self._drain_pending(self.max_batch_niches)
+            if batch:
+                self.refill(batch)
+
+    def refill(self, niches: List[str], minimum: Optional[Dict[str, int]] = None) -> int:
+        """
+        Top up pools for several niches with as few structured completions
+        as the per-call token cap allows.
+
+        Args:
+            niches: Niches to refill
+            minimum: Optional per-niche minimum number of captions to request
+
+        Returns:
+            Number of new unique captions added across all niches
+        """
+        minimum = minimum or {}
+        wanted = {}
+        for niche in dict.fromkeys(niches):
+            missing = max(self.target_size - self.available(niche), minimum.get(niche, 0))
+            if missing > 0:
+                wanted[niche] = missing
+        if not wanted:
+            return 0
+
+        logger.info("Refilling captions for %s niches", len(wanted))
+        try:
+            generated = self._generate(wanted)
+        except Exception as e:
+            logger.error("Caption refill failed: %s", e)
+            return 0
+
+        added = 0
+        with self._cond:
+            for niche in wanted:
+                pool = self._pools.setdefault(niche, deque())
+                seen = self._seen.setdefault(niche, OrderedDict())
+                # Models sometimes change the niche's casing, so match on caption_key
+                for raw in generated.get(caption_key(niche), []):
+                    caption = clean_caption(str(raw))
+                    if caption is None:
+                        continue
+                    key = caption_key(caption)
+                    if key in seen:
+                        continue
+                    seen[key] = None
+                    if len(seen) > self.seen_limit:
+                        seen.popitem(last=False)
+                    pool.append(caption)
+                    added += 1
+        return added
+
+    def _generate(self, wanted: Dict[str, int]) -> Dict[str, List[Any]]:
+        """
+        Generate captions for every niche in as few calls as fit the token cap.
+
+        A batch that still fails is logged and skipped, so the other
+        batches of a large refill are kept.
+
+        Returns:
+            Raw caption lines keyed by caption_key(niche)
+        """
+        merged: Dict[str, List[Any]] = {}
+        for batch in plan_batches(wanted):
+            try:
+                captions = self._generate_batch(batch)
+            except Exception as e:
+                logger.error("Caption batch for %s niches failed: %s", len(batch), e)
+                continue
+            for name, lines in captions.items():
+                if isinstance(lines, str):
+                    lines = lines.splitlines()
+                if isinstance(lines, list):
+                    merged.setdefault(caption_key(name), []).extend(lines)
+        return merged
+
+    def _generate_batch(self, wanted: Dict[str, int]) -> Dict[str, Any]:
+        """
+        Ask the model for captions for every niche in one JSON response.
+
+        A response cut off at the token limit is retried as two smaller requests.
+
+        Raises:
+            ValueError: If a single-caption request is still truncated
+        """
+        request = "\n".join(f"- {niche}: {count} captions" for niche, count in wanted.items())
+        total = sum(wanted.values())
+        response = self.router.complete(
+            "captions",
+            response_format={"type": "json_object"},
+            messages=[
+                {
+                    "role": "system",
+                    "content": "You write viral TikTok captions for Etsy print-on-demand products. "
+                               "Respond only with JSON of the form {\"captions\": {\"<niche>\": [\"caption\", ...]}}."
+                },
+                {
+                    "role": "user",
+                    "content": f"Write catchy, engaging captions with relevant hashtags, all different, for each niche:\n{request}"
+                }
+            ],
+            temperature=0.8,
+            max_tokens=min(MAX_COMPLETION_TOKENS, TOKENS_PER_CAPTION * total + 100)
+        )
+
+        choice = response.choices[0]
+        try:
+            if getattr(choice, "finish_reason", None) == "length":
+                raise ValueError("response truncated at max_tokens")
+            payload = json.loads(choice.message.content)
+        except ValueError as e:
+            if total <= 1:
+                raise
+            logger.warning("Caption batch of %s truncated (%s); retrying in halves", total, e)
+            merged: Dict[str, List[Any]] = {}
+            for half in plan_batches(wanted, (total + 1) // 2):
+                for name, lines in self._generate_batch(half).items():
+                    if isinstance(lines, str):
+                        lines = lines.splitlines()
+                    merged.setdefault(name, []).extend(lines if isinstance(lines, list) else [])
+            return merged
+
+        captions = payload.get("captions", {})
+        return captions if isinstance(captions, dict) else {}
@@ -0,0 +1,229 @@
+"""
+Catalog Export - Chunked streaming export of listings, images and posts
+Records are pulled one at a time from the agents' history stores, filtered,
+projected onto the requested columns and written in fixed-size chunks, so
+memory use depends on the chunk size rather than the catalog size.
+Formats: Etsy bulk-edit CSV (listings), plain CSV, and Parquet (pyarrow).
+"""
+
+import os
+import uuid
+import logging
+import tempfile
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Any, Callable, Iterable, Iterator, List, Mapping, Optional
+
+import pandas as pd
+
+from config.settings import CATALOG_EXPORT_CHUNK_ROWS, CATALOG_EXPORT_DIR
+
+from .tag_analytics import normalize_tag
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Optional; only needed for Parquet output
+    pa = None
+    pq = None
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {"etsy_csv": ".csv", "csv": ".csv", "parquet": ".parquet"}
+
+# Column name -> type, per entity, in output order
+ENTITY_COLUMNS: Dict[str, Dict[str, str]] = {
+    "listings": {
+        "id": "string", "niche": "string", "title": "string", "description": "string", "price": "float",
+        "status": "string", "tags": "list", "image_url": "string", "extra_image_urls": "list",
+        "etsy_listing_id": "int", "created_at": "string",
+    },
+    "images": {
+        "id": "string", "niche": "string", "style": "string", "prompt": "string", "url": "string",
+        "size": "string", "created_at": "string", "ready_for_print": "bool",
+    },
+    "posts": {
+        "id": "string", "caption": "string", "video_url": "string", "scheduled_time": "string",
+        "status": "string", "created_at": "string", "published_at": "string",
+    },
+}
+
+ETSY_CURRENCY = "USD"
+# Print-on-demand stock is effectively unlimited
+ETSY_QUANTITY = 999
+ETSY_MAX_IMAGES = 10
+ETSY_CSV_COLUMNS: Dict[str, str] = {
+    "TITLE": "string", "DESCRIPTION": "string", "PRICE": "float", "CURRENCY_CODE": "string",
+    "QUANTITY": "int", "TAGS": "string", "MATERIALS": "string",
+    **{f"IMAGE{i}": "string" for i in range(1, ETSY_MAX_IMAGES + 1)},
+    "SKU": "string",
+}
+
+_ARROW_TYPES = {
+    "string": lambda: pa.string(),
+    "float": lambda: pa.float64(),
+    "int": lambda: pa.int64(),
+    "bool": lambda: pa.bool_(),
+    "list": lambda: pa.list_(pa.string()),
+}
+
+
+def etsy_row(listing: Mapping[str, Any]) -> Dict[str, Any]:
+    """Map a listing onto Etsy's bulk-edit CSV columns."""
+    images = [listing.get("image_url")] + list(listing.get("extra_image_urls") or [])
+    images = [url for url in images if url][:ETSY_MAX_IMAGES]
+    row = {
+        "TITLE": listing.get("title"),
+        "DESCRIPTION": listing.get("description"),
+        "PRICE": listing.get("price"),
+        "CURRENCY_CODE": ETSY_CURRENCY,
+        "QUANTITY": ETSY_QUANTITY,
+        "TAGS": ",".join(listing.get("tags") or []),
+        "MATERIALS": "",
+        "SKU": listing.get("id"),
+    }
+    for i in range(ETSY_MAX_IMAGES):
+        row[f"IMAGE{i + 1}"] = images[i] if i < len(images) else ""
+    return row
+
+
+def matches(record: Mapping[str, Any], niche: Optional[str] = None, status: Optional[str] = None) -> bool:
+    """
+    Filter predicate. A record without a niche field matches a niche if
+    the niche is one of its tags.
+    """
+    if status and record.get("status") != status:
+        return False
+    if niche:
+        wanted = normalize_tag(niche)
+        if record.get("niche"):
+            return normalize_tag(record["niche"]) == wanted
+        return wanted in {normalize_tag(tag) for tag in record.get("tags") or []}
+    return True
+
+
+def _identity(record: Mapping[str, Any]) -> Mapping[str, Any]:
+    return record
+
+
+class _CsvChunkWriter:
+    def __init__(self, path: Path, columns: List[str], types: Dict[str, str]):
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self.columns = columns
+        self._lists = [c for c in columns if types[c] == "list"]
+        self._header = True
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        frame = pd.DataFrame.from_records(rows, columns=self.columns)
+        for column in self._lists:
+            frame[column] = frame[column].map(lambda v: ",".join(v) if isinstance(v, list) else "")
+        frame.to_csv(self._file, header=self._header, index=False)
+        self._header = False
+
+    def close(self) -> None:
+        if self._header:
+            self.write([])
+        self._file.close()
+
+
+class _ParquetChunkWriter:
+    def __init__(self, path: Path, columns: List[str], types: Dict[str, str]):
+        self.schema = pa.schema([(c, _ARROW_TYPES[types[c]]()) for c in columns])
+        self._writer = pq.ParquetWriter(str(path), self.schema)
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        # One row group per chunk
+        self._writer.write_table(pa.Table.from_pylist(rows, schema=self.schema))
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+class CatalogExporter:
+    """Writes catalog records to CSV or Parquet files chunk by chunk."""
+
+    def __init__(self, output_dir: Optional[Path] = None, chunk_size: int = CATALOG_EXPORT_CHUNK_ROWS):
+        """
+        Args:
+            output_dir: Where export files are written. Defaults to CATALOG_EXPORT_DIR.
+            chunk_size: Rows held in memory and written per chunk (Parquet row group)
+        """
+        self.output_dir = Path(output_dir or CATALOG_EXPORT_DIR)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.chunk_size = max(1, chunk_size)
+
+    def export(self, records: Iterable[Mapping[str, Any]], entity: str, fmt: str = "csv",
+               columns: Optional[List[str]] = None, niche: Optional[str] = None, status: Optional[str] = None,
+               filename: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Stream records to an export file.
+
+        Args:
+            records: Any iterable of records; history stores are read lazily
+            entity: "listings", "images" or "posts"
+            fmt: "etsy_csv" (listings only), "csv" or "parquet"
+            columns: Output columns to keep, in order. Defaults to all.
+            niche: Only records for this niche
+            status: Only records with this status
+            filename: Output file name. Defaults to <entity>_<timestamp>_<random>.<ext>.
+
+        Returns:
+            Dict with the file path, row and chunk counts
+
+        Raises:
+            ValueError: On an unknown entity, format or column, or if Parquet
+                is requested without pyarrow installed
+        """
+        if entity not in ENTITY_COLUMNS:
+            raise ValueError(f"Unknown entity: {entity}. Choose from {sorted(ENTITY_COLUMNS)}")
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown format: {fmt}. Choose from {sorted(FORMATS)}")
+        if fmt == "etsy_csv" and entity != "listings":
+            raise ValueError("Etsy CSV export is only available for listings")
+        if fmt == "parquet" and pa is None:
+            raise ValueError("Parquet export requires pyarrow (pip install pyarrow)")
+
+        types = ETSY_CSV_COLUMNS if fmt == "etsy_csv" else ENTITY_COLUMNS[entity]
+        columns = list(columns or types)
+        unknown = [c for c in columns if c not in types]
+        if unknown:
+            raise ValueError(f"Unknown columns for {entity}: {unknown}")
+
+        to_row: Callable[[Mapping[str, Any]], Mapping[str, Any]] = etsy_row if fmt == "etsy_csv" else _identity
+        # Unique default names and temp files, so concurrent exports never share a file
+        default = f"{entity}_{datetime.now().strftime('%Y%m%dT%H%M%S')}_{uuid.uuid4().hex[:8]}{FORMATS[fmt]}"
+        name = Path(filename or default).name
+        path = self.output_dir / name
+        fd, tmp_name = tempfile.mkstemp(dir=self.output_dir, prefix=f".{name}.", suffix=".tmp")
+        os.close(fd)
+        tmp_path = Path(tmp_name)
+
+        writer_class = _ParquetChunkWriter if fmt == "parquet" else _CsvChunkWriter
+        rows = chunks = 0
+        writer = writer_class(tmp_path, columns, types)
+        try:
+            for chunk in self._chunks(records, to_row, columns, niche, status):
+                writer.write(chunk)
+                rows += len(chunk)
+                chunks += 1
+        except BaseException:
+            writer.close()
+            tmp_path.unlink(missing_ok=True)
+            raise
+        writer.close()
+        os.replace(tmp_path, path)
+
+        logger.info("Exported %s %s to %s in %s chunks", rows, entity, path, chunks)
+        return {"entity": entity, "format": fmt, "file": path.name, "path": str(path), "columns": columns,
+                "rows": rows, "chunks": chunks}
+
+    def _chunks(self, records: Iterable[Mapping[str, Any]], to_row: Callable, columns: List[str],
+                niche: Optional[str], status: Optional[str]) -> Iterator[List[Dict[str, Any]]]:
+        selected = (to_row(r) for r in records if matches(r, niche, status))
+        projected = ({c: row.get(c) for c in columns} for row in selected)
+        while True:
+            chunk = list(islice(projected, self.chunk_size))
+            if not chunk:
+                return
+            yield chunk
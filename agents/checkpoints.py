@@ -0,0 +1,142 @@
+"""
+Workflow Checkpoints - Durable per-phase progress for orchestrator workflows
+Each workflow gets an append-only JSONL log so a failed run can be resumed
+without repeating completed phases or completed items within a phase.
+"""
+
+import os
+import re
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+from datetime import datetime
+
+from .records import json_default
+
+logger = logging.getLogger(__name__)
+
+
+class CheckpointStore:
+    """
+    Stores workflow progress as append-only JSONL files keyed by workflow id.
+
+    Record types:
+        start  - workflow parameters, written once when the workflow begins
+        item   - one finished unit of work inside a phase (e.g. one image)
+        phase  - the full output of a finished phase
+        status - workflow status transitions (running/failed/completed)
+    """
+
+    def __init__(self, checkpoint_dir: Optional[Path] = None, fsync: bool = True):
+        """
+        Initialize the checkpoint store.
+
+        Args:
+            checkpoint_dir: Directory for checkpoint files. Defaults to CHECKPOINT_DIR from settings.
+            fsync: Flush every record to disk before returning (durable but slower)
+        """
+        if checkpoint_dir is None:
+            from config.settings import CHECKPOINT_DIR
+            checkpoint_dir = CHECKPOINT_DIR
+
+        self.checkpoint_dir = Path(checkpoint_dir)
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        self.fsync = fsync
+        self._lock = threading.Lock()
+
+    def _path(self, workflow_id: str) -> Path:
+        """Map a workflow id to a filesystem-safe checkpoint path."""
+        safe_id = re.sub(r"[^A-Za-z0-9_.-]", "_", workflow_id)
+        return self.checkpoint_dir / f"{safe_id}.jsonl"
+
+    def _append(self, workflow_id: str, record: Dict[str, Any]) -> None:
+        """Append a single record to the workflow's checkpoint log."""
+        record["recorded_at"] = datetime.now().isoformat()
+        line = json.dumps(record, default=json_default) + "\n"
+
+        with self._lock:
+            with open(self._path(workflow_id), "a", encoding="utf-8") as f:
+                f.write(line)
+                if self.fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+
+    def start(self, workflow_id: str, params: Dict[str, Any]) -> None:
+        """Record workflow parameters so the workflow can be resumed by id alone."""
+        self._append(workflow_id, {"type": "start", "params": params})
+
+    def save_item(self, workflow_id: str, phase: str, key: str, data: Dict[str, Any]) -> None:
+        """Checkpoint one completed item within a phase."""
+        self._append(workflow_id, {"type": "item", "phase": phase, "key": key, "data": data})
+
+    def save_phase(self, workflow_id: str, phase: str, data: Dict[str, Any]) -> None:
+        """Checkpoint the output of a completed phase."""
+        self._append(workflow_id, {"type": "phase", "phase": phase, "data": data})
+
+    def set_status(self, workflow_id: str, status: str, error: Optional[str] = None) -> None:
+        """Record a workflow status transition."""
+        record = {"type": "status", "status": status}
+        if error:
+            record["error"] = error
+        self._append(workflow_id, record)
+
+    def exists(self, workflow_id: str) -> bool:
+        """Check whether a checkpoint exists for a workflow."""
+        return self._path(workflow_id).exists()
+
+    def load(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Replay a workflow's checkpoint log.
+
+        Returns:
+            Dict with params, status, completed phase outputs and completed items
+            per phase, or None if no checkpoint exists
+        """
+        path = self._path(workflow_id)
+        if not path.exists():
+            return None
+
+        state = {
+            "workflow_id": workflow_id,
+            "params": {},
+            "status": "unknown",
+            "error": None,
+            "phases": {},
+            "items": {}
+        }
+
+        with open(path, "r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn final write from a crash; everything before it is intact
+                    logger.warning("Skipping corrupt checkpoint record %s:%s", workflow_id, line_no)
+                    continue
+
+                record_type = record.get("type")
+                if record_type == "start":
+                    state["params"] = record.get("params", {})
+                elif record_type == "item":
+                    state["items"].setdefault(record["phase"], {})[record["key"]] = record["data"]
+                elif record_type == "phase":
+                    state["phases"][record["phase"]] = record["data"]
+                elif record_type == "status":
+                    state["status"] = record["status"]
+                    state["error"] = record.get("error")
+
+        return state
+
+    def list_workflows(self) -> List[str]:
+        """List workflow ids that have checkpoints."""
+        return sorted(path.stem for path in self.checkpoint_dir.glob("*.jsonl"))
+
+    def delete(self, workflow_id: str) -> bool:
+        """Remove a workflow's checkpoint log."""
+        path = self._path(workflow_id)
+        if path.exists():
+            path.unlink()
+            return True
+        return False
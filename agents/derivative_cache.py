@@ -0,0 +1,152 @@
+"""
+Derivative Cache - Disk-backed WebP thumbnails and previews
+Derivatives are generated lazily from the original image, stored under
+IMAGES_DIR and evicted least-recently-used once the cache exceeds its
+byte budget. Evicted files are simply regenerated on the next request.
+"""
+
+import os
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+import cv2
+
+from config.settings import DERIVATIVE_CACHE_MAX_BYTES, IMAGES_DIR
+
+from .image_io import fetch_image
+from .singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+DERIVATIVE_DIR = IMAGES_DIR / "derivatives"
+
+# derivative name -> longest side in pixels
+DERIVATIVE_SIZES = {
+    "thumb": 256,
+    "preview": 768,
+}
+WEBP_QUALITY = 80
+
+
+def fingerprint(source: str) -> str:
+    """
+    Short content key for an image source.
+
+    Image ids are reused when a niche is regenerated, but each generation
+    has a new source URL, so derivatives keyed on this never go stale.
+    """
+    return hashlib.sha1(source.encode("utf-8")).hexdigest()[:12]
+
+
+class DerivativeCache:
+    """LRU-evicted cache of resized WebP derivatives on disk."""
+
+    def __init__(self, cache_dir: Optional[Path] = None, max_bytes: int = DERIVATIVE_CACHE_MAX_BYTES,
+                 sizes: Optional[Dict[str, int]] = None):
+        """
+        Initialize the cache, indexing derivatives left by previous runs.
+
+        Args:
+            cache_dir: Where derivatives live. Defaults to IMAGES_DIR/derivatives.
+            max_bytes: Total size budget for cached derivatives
+            sizes: Derivative name -> longest side. Defaults to DERIVATIVE_SIZES.
+        """
+        self.cache_dir = Path(cache_dir or DERIVATIVE_DIR)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.sizes = dict(sizes or DERIVATIVE_SIZES)
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._inflight = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+
+        # Oldest access first, so eviction order survives restarts
+        existing = sorted(self.cache_dir.glob("*.webp"), key=lambda p: p.stat().st_atime)
+        for path in existing:
+            size = path.stat().st_size
+            self._entries[path.name] = size
+            self._total_bytes += size
+        self._evict()
+
+    def path_for(self, image_id: str, source: str, size: str) -> Path:
+        return self.cache_dir / f"{image_id}_{fingerprint(source)}_{size}.webp"
+
+    def get(self, image_id: str, source: str, size: str) -> Path:
+        """
+        Return the derivative file, generating it if missing.
+
+        Concurrent requests for the same missing derivative share one render.
+
+        Raises:
+            ValueError: If the size name is unknown
+        """
+        if size not in self.sizes:
+            raise ValueError(f"Unknown derivative size: {size}")
+
+        path = self.path_for(image_id, source, size)
+        with self._lock:
+            if path.name in self._entries and path.exists():
+                self._entries.move_to_end(path.name)
+                self.hits += 1
+                return path
+            self.misses += 1
+
+        self._inflight.do(path.name, self._render, source, path, self.sizes[size])
+        return path
+
+    def ingest(self, image_id: str, source: str) -> None:
+        """Pre-generate every derivative of an image."""
+        for size in self.sizes:
+            try:
+                self.get(image_id, source, size)
+            except Exception as e:
+                logger.warning("Could not create %s for %s: %s", size, image_id, e)
+
+    def _render(self, source: str, path: Path, longest_side: int) -> None:
+        image = cv2.imread(str(fetch_image(source)), cv2.IMREAD_COLOR)
+        if image is None:
+            raise ValueError(f"Could not read image: {source}")
+
+        height, width = image.shape[:2]
+        scale = longest_side / max(height, width)
+        if scale < 1:
+            image = cv2.resize(image, (max(1, round(width * scale)), max(1, round(height * scale))),
+                               interpolation=cv2.INTER_AREA)
+
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp.webp")
+        if not cv2.imwrite(str(tmp_path), image, [cv2.IMWRITE_WEBP_QUALITY, WEBP_QUALITY]):
+            raise IOError(f"Could not write {path}")
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._total_bytes -= self._entries.pop(path.name, 0)
+            self._entries[path.name] = path.stat().st_size
+            self._total_bytes += self._entries[path.name]
+            self._evict()
+
+    def _evict(self) -> None:
+        """Drop least recently used derivatives until under budget. Caller holds the lock."""
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            name, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                (self.cache_dir / name).unlink()
+            except FileNotFoundError:
+                pass
+            logger.debug("Evicted derivative %s", name)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses
+            }
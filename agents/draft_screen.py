@@ -0,0 +1,150 @@
+"""
+Draft Screen - Cheap quality gate between draft and HD image generation
+Standard-quality drafts are downloaded and scored locally (sharpness,
+contrast, exposure), near-duplicates are dropped by perceptual hash, and
+an optional vision check runs on what is left. Only survivors are worth
+an HD generation.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from config.settings import (DRAFT_DEDUPE_DISTANCE, DRAFT_SCREEN_WORKERS, IMAGES_DIR,
+                             MIN_IMAGE_QUALITY_SCORE)
+
+from .image_io import fetch_image
+
+logger = logging.getLogger(__name__)
+
+DRAFTS_DIR = IMAGES_DIR / "drafts"
+
+# Side of the square grayscale analysis frame
+ANALYSIS_SIZE = 512
+# 99.9th percentile |Laplacian| at which an image counts as fully sharp.
+# A high percentile because edges are a tiny share of pixels in sparse art.
+SHARPNESS_REF = 48.0
+# 0.1-99.9th percentile luminance spread at which contrast counts as full
+CONTRAST_REF = 128.0
+# Share of near-black/near-white pixels tolerated before exposure is penalized
+CLIP_TOLERANCE = 0.6
+QUALITY_WEIGHTS = {"sharpness": 0.5, "contrast": 0.3, "exposure": 0.2}
+
+
+def _gray(image: np.ndarray) -> np.ndarray:
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGRA2GRAY if image.shape[2] == 4 else cv2.COLOR_BGR2GRAY)
+    return image
+
+
+def quality_metrics(image: np.ndarray) -> Dict[str, float]:
+    """
+    Local image quality signals, each scaled to 0..1, plus their weighted score.
+
+    Args:
+        image: BGR, BGRA or grayscale uint8 array
+    """
+    gray = cv2.resize(_gray(image), (ANALYSIS_SIZE, ANALYSIS_SIZE), interpolation=cv2.INTER_AREA)
+    laplacian = np.abs(cv2.Laplacian(gray, cv2.CV_32F))
+    low, high = np.percentile(gray, (0.1, 99.9))
+    clipped = float(np.mean((gray <= 4) | (gray >= 251)))
+
+    metrics = {
+        "sharpness": min(1.0, float(np.percentile(laplacian, 99.9)) / SHARPNESS_REF),
+        "contrast": min(1.0, float(high - low) / CONTRAST_REF),
+        "exposure": 1.0 - max(0.0, clipped - CLIP_TOLERANCE) / (1.0 - CLIP_TOLERANCE),
+    }
+    metrics["score"] = round(sum(QUALITY_WEIGHTS[name] * metrics[name] for name in QUALITY_WEIGHTS), 4)
+    return metrics
+
+
+def dhash(image: np.ndarray) -> int:
+    """64-bit difference hash; visually similar images differ in few bits."""
+    small = cv2.resize(_gray(image), (9, 8), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int(np.packbits(bits).view(">u8")[0])
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class DraftScreener:
+    """Decides which drafts are worth regenerating in HD."""
+
+    def __init__(self, min_score: float = MIN_IMAGE_QUALITY_SCORE, max_distance: int = DRAFT_DEDUPE_DISTANCE,
+                 vision_check: Optional[Callable[[str, str], bool]] = None, workers: int = DRAFT_SCREEN_WORKERS):
+        """
+        Args:
+            min_score: Lowest local quality score that passes
+            max_distance: dHash distance at or below which two drafts are duplicates
+            vision_check: Optional (url, subject) -> bool review run on local survivors
+            workers: Drafts downloaded and checked in parallel
+        """
+        self.min_score = min_score
+        self.max_distance = max_distance
+        self.vision_check = vision_check
+        self.workers = max(1, workers)
+
+    def _measure(self, draft: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            image = cv2.imread(str(fetch_image(draft["url"], cache_dir=DRAFTS_DIR)), cv2.IMREAD_UNCHANGED)
+            if image is None:
+                raise ValueError("unreadable image")
+        except Exception as e:
+            logger.warning("Could not load draft %s: %s", draft.get("url"), e)
+            return {**draft, "reason": "unavailable"}
+        metrics = quality_metrics(image)
+        return {**draft, "score": metrics.pop("score"), "metrics": metrics, "dhash": dhash(image)}
+
+    def screen(self, drafts: List[Dict[str, Any]], subject: str = "") -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Screen drafts in three passes: quality score, dedupe, vision check.
+
+        Args:
+            drafts: Dicts with at least a "url"
+            subject: What the images should show, for the vision check
+
+        Returns:
+            (accepted, rejected) in input order. Both carry "score" and
+            "metrics" when the draft could be loaded; rejected drafts carry
+            a "reason" (unavailable, low_quality, duplicate, vision).
+        """
+        if not drafts:
+            return [], []
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(drafts)), thread_name_prefix="draft-screen") as pool:
+            measured = list(pool.map(self._measure, drafts))
+
+        rejected = []
+        candidates = []
+        for position, draft in enumerate(measured):
+            draft["position"] = position
+            if "reason" not in draft and draft["score"] < self.min_score:
+                draft["reason"] = "low_quality"
+            (rejected if "reason" in draft else candidates).append(draft)
+
+        # Best-scoring copy of each near-duplicate group wins
+        kept: List[Dict[str, Any]] = []
+        for draft in sorted(candidates, key=lambda d: d["score"], reverse=True):
+            twin = next((k for k in kept if hamming(k["dhash"], draft["dhash"]) <= self.max_distance), None)
+            if twin is None:
+                kept.append(draft)
+            else:
+                rejected.append({**draft, "reason": "duplicate", "duplicate_of": twin["url"]})
+
+        if self.vision_check is not None and kept:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(kept)), thread_name_prefix="draft-vision") as pool:
+                verdicts = list(pool.map(lambda d: self.vision_check(d["url"], subject), kept))
+            rejected.extend({**draft, "reason": "vision"} for draft, ok in zip(kept, verdicts) if not ok)
+            kept = [draft for draft, ok in zip(kept, verdicts) if ok]
+
+        def clean(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            ordered = sorted(items, key=lambda d: d["position"])
+            return [{k: v for k, v in d.items() if k not in ("position", "dhash")} for d in ordered]
+
+        accepted, rejected = clean(kept), clean(rejected)
+        logger.info("Screened %s drafts: %s accepted, %s rejected", len(drafts), len(accepted), len(rejected))
+        return accepted, rejected
@@ -0,0 +1,241 @@
+"""
+Embedding Index - Persistent float32 vectors with local cosine top-k
+Each index is a raw float32 row file (memory-mapped for queries) plus a
+JSON sidecar holding keys, text hashes and metadata. Rows are stored
+L2-normalized, so cosine similarity is one matrix-vector product. Texts
+are embedded once; a key is re-embedded only when its text changes.
+Writers in different processes are serialized with a lock file and pick
+up each other's rows before appending.
+"""
+
+import os
+import json
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+from openai import OpenAI
+
+try:
+    import fcntl
+except ImportError:  # Windows: only writers within one process are serialized
+    fcntl = None
+
+from config.settings import EMBEDDING_BASE_URL, EMBEDDING_DIR, EMBEDDING_MODEL
+
+from .tracing import span
+
+logger = logging.getLogger(__name__)
+
+EMBED_BATCH_SIZE = 256
+
+
+def embedding_client(api_key: str) -> OpenAI:
+    """OpenAI client for embeddings, honouring EMBEDDING_BASE_URL for local stand-ins."""
+    if EMBEDDING_BASE_URL:
+        return OpenAI(api_key=api_key, base_url=EMBEDDING_BASE_URL)
+    return OpenAI(api_key=api_key)
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+
+class EmbeddingIndex:
+    """Append-only, memory-mapped embedding matrix keyed by string ids."""
+
+    def __init__(self, name: str, client, model: str = EMBEDDING_MODEL, index_dir: Optional[Path] = None):
+        """
+        Open (or create) an index.
+
+        Args:
+            name: Index name; files are <name>.f32 and <name>.json
+            client: OpenAI-compatible client used for embeddings
+            model: Embedding model
+            index_dir: Where index files live. Defaults to EMBEDDING_DIR.
+        """
+        self.name = name
+        self.client = client
+        self.model = model
+        self.index_dir = Path(index_dir or EMBEDDING_DIR)
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self.vectors_path = self.index_dir / f"{name}.f32"
+        self.meta_path = self.index_dir / f"{name}.json"
+        self.lock_path = self.index_dir / f"{name}.lock"
+
+        self.dim: Optional[int] = None
+        self.keys: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._hashes: List[str] = []
+        self.meta: Dict[str, Dict[str, Any]] = {}
+        self._matrix: Optional[np.ndarray] = None
+        self._query_cache: Dict[str, np.ndarray] = {}
+        self._sidecar_mtime: Optional[int] = None
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        if not self.meta_path.exists():
+            return
+        self._sidecar_mtime = self.meta_path.stat().st_mtime_ns
+        with open(self.meta_path) as f:
+            sidecar = json.load(f)
+        if sidecar.get("model") != self.model:
+            logger.warning("Embedding index %s was built with %s; rebuilding", self.name, sidecar.get('model'))
+            self.vectors_path.unlink(missing_ok=True)
+            return
+        self.dim = sidecar["dim"]
+        self.keys = sidecar["keys"]
+        self._hashes = sidecar["hashes"]
+        self.meta = sidecar.get("meta", {})
+        self._rows = {key: i for i, key in enumerate(self.keys)}
+        self._remap()
+
+    def _refresh(self) -> None:
+        """Reload the sidecar if another process has written it since we last did."""
+        try:
+            mtime = self.meta_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime != self._sidecar_mtime:
+            self._load()
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive lock on the index files across processes."""
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_path, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _remap(self) -> None:
+        """Memory-map the row file; rows beyond the sidecar (a torn write) are ignored."""
+        if not self.keys:
+            self._matrix = None
+            return
+        self._matrix = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(len(self.keys), self.dim))
+
+    def _save_sidecar(self) -> None:
+        tmp_path = self.meta_path.with_suffix(f".json.{os.getpid()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"model": self.model, "dim": self.dim, "keys": self.keys,
+                       "hashes": self._hashes, "meta": self.meta}, f)
+        os.replace(tmp_path, self.meta_path)
+        self._sidecar_mtime = self.meta_path.stat().st_mtime_ns
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Embed texts in batches; returns L2-normalized float32 rows."""
+        chunks = []
+        for start in range(0, len(texts), EMBED_BATCH_SIZE):
+            with span("embeddings", "model", model=self.model, count=len(texts[start:start + EMBED_BATCH_SIZE])):
+                response = self.client.embeddings.create(model=self.model, input=texts[start:start + EMBED_BATCH_SIZE])
+            chunks.append(np.array([item.embedding for item in response.data], dtype=np.float32))
+        vectors = np.concatenate(chunks) if chunks else np.zeros((0, self.dim or 0), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def add(self, items: Dict[str, str], meta: Optional[Dict[str, Dict[str, Any]]] = None) -> int:
+        """
+        Embed and store texts that are new or whose text changed.
+
+        Args:
+            items: Key -> text to embed
+            meta: Optional key -> metadata stored alongside the vector
+
+        Returns:
+            Number of texts embedded
+        """
+        with self._lock, self._file_lock():
+            self._refresh()
+            stale = {key: text for key, text in items.items()
+                     if key not in self._rows or self._hashes[self._rows[key]] != _text_hash(text)}
+            if meta:
+                self.meta.update(meta)
+            if not stale:
+                if meta:
+                    self._save_sidecar()
+                return 0
+
+            vectors = self.embed(list(stale.values()))
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+
+            new_keys = [key for key in stale if key not in self._rows]
+            changed = [key for key in stale if key in self._rows]
+            by_key = dict(zip(stale, vectors))
+
+            if changed:
+                writable = np.memmap(self.vectors_path, dtype=np.float32, mode="r+", shape=(len(self.keys), self.dim))
+                for key in changed:
+                    writable[self._rows[key]] = by_key[key]
+                    self._hashes[self._rows[key]] = _text_hash(stale[key])
+                writable.flush()
+                del writable
+
+            if new_keys:
+                with open(self.vectors_path, "ab") as f:
+                    # Truncate any rows past the sidecar left by an interrupted append
+                    f.truncate(len(self.keys) * self.dim * 4)
+                    f.write(np.stack([by_key[key] for key in new_keys]).astype(np.float32).tobytes())
+                for key in new_keys:
+                    self._rows[key] = len(self.keys)
+                    self.keys.append(key)
+                    self._hashes.append(_text_hash(stale[key]))
+
+            self._save_sidecar()
+            self._remap()
+            return len(stale)
+
+    def vector(self, key: str) -> Optional[np.ndarray]:
+        row = self._rows.get(key)
+        return None if row is None else np.array(self._matrix[row])
+
+    def query_vector(self, text: str) -> np.ndarray:
+        """Embedding for free text, cached per process."""
+        if text not in self._query_cache:
+            if len(self._query_cache) > 1024:
+                self._query_cache.clear()
+            self._query_cache[text] = self.embed([text])[0]
+        return self._query_cache[text]
+
+    def search(self, vector: np.ndarray, k: int = 10, exclude: Tuple[str, ...] = ()) -> List[Tuple[str, float]]:
+        """
+        Cosine top-k against every stored vector.
+
+        Returns:
+            (key, similarity) pairs, most similar first
+        """
+        with self._lock:
+            matrix, keys = self._matrix, self.keys
+        if matrix is None:
+            return []
+
+        scores = matrix @ vector.astype(np.float32)
+        for key in exclude:
+            row = self._rows.get(key)
+            if row is not None and row < len(scores):
+                scores[row] = -np.inf
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(keys[i], round(float(scores[i]), 4)) for i in top if np.isfinite(scores[i])]
+
+    def similar(self, key: str, k: int = 10) -> List[Tuple[str, float]]:
+        """Nearest stored neighbours of a stored key."""
+        vector = self.vector(key)
+        if vector is None:
+            return []
+        return self.search(vector, k, exclude=(key,))
+
+    def __len__(self) -> int:
+        return len(self.keys)
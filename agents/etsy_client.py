@@ -0,0 +1,245 @@
+"""
+Etsy Client - Pooled HTTP client for the Etsy Open API v3
+Handles listing creation, image upload and activation with a keep-alive
+session, client-side rate limiting and bounded concurrent image uploads.
+"""
+
+import os
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Sequence
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config.settings import (
+    ETSY_BASE_URL,
+    ETSY_IMAGE_LIMIT,
+    IMAGES_DIR,
+    MAX_CONCURRENT_UPLOADS,
+    MAX_RETRIES,
+    BACKOFF_FACTOR,
+    PRINT_EXPORT_DIR,
+    TIMEOUT_SECONDS,
+)
+
+from .image_io import is_within
+
+logger = logging.getLogger(__name__)
+
+# Etsy's default per-app limit is 10 requests per second
+ETSY_REQUESTS_PER_SECOND = 10
+
+
+class EtsyAPIError(Exception):
+    """Raised when the Etsy API returns an error after retries are exhausted."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class EtsyUploadError(EtsyAPIError):
+    """Raised when some of a batch of image uploads fail; `results` keeps the ones that succeeded."""
+
+    def __init__(self, message: str, results: List[Optional[Dict[str, Any]]]):
+        super().__init__(message)
+        self.results = results
+
+
+class RateLimiter:
+    """Thread-safe token bucket; acquire() blocks until a request may be sent."""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class EtsyClient:
+    """
+    Etsy v3 client sharing one pooled keep-alive session across threads.
+
+    Image uploads run on a dedicated pool of MAX_CONCURRENT_UPLOADS workers,
+    so the cap holds across all listings even during bulk publishing.
+    """
+
+    def __init__(self, api_key: str, access_token: Optional[str] = None, base_url: str = ETSY_BASE_URL,
+                 max_concurrent_uploads: int = MAX_CONCURRENT_UPLOADS,
+                 requests_per_second: float = ETSY_REQUESTS_PER_SECOND,
+                 timeout: float = TIMEOUT_SECONDS, max_retries: int = MAX_RETRIES,
+                 backoff_factor: float = BACKOFF_FACTOR, local_dirs: Optional[Sequence[Path]] = None):
+        """
+        Initialize the Etsy client.
+
+        Args:
+            api_key: Etsy app keystring, sent as x-api-key
+            access_token: OAuth2 access token for shop-scoped endpoints
+            base_url: API root; point at a local stand-in server for testing
+            max_concurrent_uploads: Upper bound on simultaneous image uploads
+            requests_per_second: Client-side rate limit
+            timeout: Per-request timeout in seconds
+            max_retries: Retries for 429 and 5xx responses
+            backoff_factor: Exponential backoff base when no Retry-After is given
+            local_dirs: Directories local image files may be uploaded from.
+                Defaults to IMAGES_DIR (originals, mockups) and PRINT_EXPORT_DIR.
+        """
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.rate_limiter = RateLimiter(requests_per_second)
+        self.local_dirs = [Path(d) for d in (local_dirs or (IMAGES_DIR, PRINT_EXPORT_DIR))]
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(10, max_concurrent_uploads * 2))
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        # Credentials go on API calls only, never on image downloads from third-party hosts
+        self._auth_headers = {"x-api-key": api_key}
+        if access_token:
+            self._auth_headers["Authorization"] = f"Bearer {access_token}"
+        self._download_session = requests.Session()
+
+        self._upload_pool = ThreadPoolExecutor(max_workers=max_concurrent_uploads,
+                                               thread_name_prefix="etsy-upload")
+
+    def _request(self, method: str, path: str, **kwargs) -> Dict[str, Any]:
+        """Send a rate-limited request, retrying 429 and 5xx responses."""
+        url = f"{self.base_url}{path}"
+        kwargs.setdefault("timeout", self.timeout)
+        kwargs["headers"] = {**self._auth_headers, **kwargs.pop("headers", {})}
+
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except requests.RequestException as e:
+                if attempt == self.max_retries:
+                    raise EtsyAPIError(f"{method} {path} failed: {str(e)}")
+                time.sleep(self.backoff_factor ** attempt)
+                continue
+
+            if response.status_code == 429 or response.status_code >= 500:
+                if attempt == self.max_retries:
+                    raise EtsyAPIError(f"{method} {path} returned {response.status_code}", response.status_code)
+                retry_after = response.headers.get("Retry-After")
+                delay = float(retry_after) if retry_after else self.backoff_factor ** attempt
+                logger.warning("Etsy %s on %s, retrying in %.1fs", response.status_code, path, delay)
+                time.sleep(delay)
+                continue
+
+            if response.status_code >= 400:
+                raise EtsyAPIError(f"{method} {path} returned {response.status_code}: {response.text[:200]}",
+                                   response.status_code)
+            try:
+                return response.json() if response.content else {}
+            except ValueError as e:
+                raise EtsyAPIError(f"{method} {path} returned invalid JSON: {str(e)}", response.status_code)
+
+        raise EtsyAPIError(f"{method} {path} failed")
+
+    def create_draft_listing(self, shop_id: str, listing: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a draft listing. `listing` holds Etsy createDraftListing form fields."""
+        return self._request("POST", f"/application/shops/{shop_id}/listings", data=listing)
+
+    def activate_listing(self, shop_id: str, listing_id: int) -> Dict[str, Any]:
+        """Move a draft listing to the active state."""
+        return self._request("PATCH", f"/application/shops/{shop_id}/listings/{listing_id}",
+                             data={"state": "active"})
+
+    def load_image(self, source: str) -> bytes:
+        """
+        Read image bytes from an http(s) URL, downloaded without Etsy credentials,
+        or from a file under one of `local_dirs`.
+
+        Raises:
+            EtsyAPIError: If the source is not allowed or cannot be read
+        """
+        try:
+            if urlsplit(source).scheme in ("http", "https"):
+                response = self._download_session.get(source, timeout=self.timeout)
+                response.raise_for_status()
+                return response.content
+            # Listing image fields can come from clients; never upload arbitrary server files
+            if not any(is_within(source, root) for root in self.local_dirs):
+                raise EtsyAPIError(f"Refusing to upload {source}: not an http(s) URL or a generated image file")
+            with open(source, "rb") as f:
+                return f.read()
+        except (requests.RequestException, OSError) as e:
+            raise EtsyAPIError(f"Could not load image {source}: {str(e)}")
+
+    def upload_listing_image(self, shop_id: str, listing_id: int, source: str, rank: int = 1) -> Dict[str, Any]:
+        """Upload one image (path or URL) to a listing as a multipart request."""
+        image = self.load_image(source)
+        filename = os.path.basename(source.split("?")[0]) or f"image_{rank}.png"
+        return self._request(
+            "POST",
+            f"/application/shops/{shop_id}/listings/{listing_id}/images",
+            files={"image": (filename, image)},
+            data={"rank": rank}
+        )
+
+    def upload_listing_images(self, shop_id: str, listing_id: int, sources: List[str],
+                              start_rank: int = 1, ranks: Optional[List[int]] = None) -> List[Dict[str, Any]]:
+        """
+        Upload several images concurrently, respecting Etsy's per-listing image limit.
+
+        Args:
+            shop_id: Etsy shop id
+            listing_id: Etsy listing id
+            sources: Image paths or URLs
+            start_rank: Rank of the first source when `ranks` is not given
+            ranks: Explicit rank per source, for filling gaps left by failed uploads
+
+        Returns:
+            Upload responses in rank order
+
+        Raises:
+            EtsyUploadError: If any upload fails, after all have finished;
+                its `results` holds the responses, with None for failures
+        """
+        ranks = ranks or [start_rank + i for i in range(len(sources))]
+        if any(rank > ETSY_IMAGE_LIMIT for rank in ranks):
+            dropped = sum(rank > ETSY_IMAGE_LIMIT for rank in ranks)
+            logger.warning("Listing %s: dropping %s images over the %s-image limit",
+                           listing_id, dropped, ETSY_IMAGE_LIMIT)
+
+        futures = [
+            self._upload_pool.submit(self.upload_listing_image, shop_id, listing_id, source, rank)
+            for source, rank in zip(sources, ranks) if rank <= ETSY_IMAGE_LIMIT
+        ]
+        results, errors = [], []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except EtsyAPIError as e:
+                results.append(None)
+                errors.append(e)
+        if errors:
+            raise EtsyUploadError(f"{len(errors)} of {len(futures)} image uploads failed: {errors[0]}", results)
+        return results
+
+    def close(self) -> None:
+        """Release pooled connections and upload workers."""
+        self._upload_pool.shutdown(wait=True)
+        self.session.close()
+        self._download_session.close()
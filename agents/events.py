@@ -0,0 +1,105 @@
+"""
+Events - In-process event bus for pushing workflow progress to clients
+The orchestrator and agents publish small events (phase started/finished,
+image generated, listing created, post scheduled) into a bounded ring
+buffer. Every event gets a sequential id, so a client that reconnects with
+the last id it saw is replayed exactly what it missed. Events are tagged
+with the current trace id, i.e. the workflow they were published from.
+"""
+
+import time
+import threading
+from collections import deque
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Any, List, Optional, Tuple
+
+from config.settings import EVENT_BUFFER_SIZE
+
+from .tracing import current_trace_id
+
+
+class EventBus:
+    """Ring buffer of events with blocking reads for subscribers."""
+
+    def __init__(self, max_events: int = EVENT_BUFFER_SIZE):
+        self._events = deque(maxlen=max_events)
+        self._last_id = 0
+        self._cond = threading.Condition()
+
+    @property
+    def last_id(self) -> int:
+        return self._last_id
+
+    def publish(self, event_type: str, workflow_id: Optional[str] = None, **data) -> Dict[str, Any]:
+        """
+        Append an event and wake subscribers.
+
+        Args:
+            event_type: Dotted event name, e.g. "phase.started"
+            workflow_id: Workflow the event belongs to. Defaults to the current trace id.
+            **data: JSON-serializable payload
+
+        Returns:
+            The stored event
+        """
+        with self._cond:
+            self._last_id += 1
+            event = {
+                "id": self._last_id,
+                "type": event_type,
+                "workflow_id": workflow_id or current_trace_id.get(),
+                "ts": datetime.now().isoformat(),
+                "data": data
+            }
+            self._events.append(event)
+            self._cond.notify_all()
+        return event
+
+    def since(self, last_id: int, workflow_id: Optional[str] = None) -> Tuple[List[Dict[str, Any]], int, bool]:
+        """
+        Buffered events after last_id, optionally for one workflow.
+
+        A last_id ahead of the bus (the server restarted) replays the whole
+        buffer.
+
+        Returns:
+            (events, cursor, complete): cursor is the id to pass next time;
+            complete is False when events after last_id were already
+            dropped from the buffer or lost in a restart
+        """
+        with self._cond:
+            restarted = last_id > self._last_id
+            if restarted:
+                last_id = 0
+            oldest = self._events[0]["id"] if self._events else self._last_id + 1
+            complete = not restarted and oldest <= last_id + 1
+            # Ids are consecutive, so the start position is a subtraction
+            events = list(islice(self._events, max(0, last_id - oldest + 1), None))
+            cursor = self._last_id
+        if workflow_id is not None:
+            events = [e for e in events if e["workflow_id"] == workflow_id]
+        return events, cursor, complete
+
+    def wait(self, last_id: int, timeout: float) -> bool:
+        """Block until an event newer than last_id exists or the timeout passes."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._last_id <= last_id:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def clear(self) -> None:
+        with self._cond:
+            self._events.clear()
+
+
+event_bus = EventBus()
+
+
+def publish(event_type: str, workflow_id: Optional[str] = None, **data) -> Dict[str, Any]:
+    """Publish on the process-wide bus."""
+    return event_bus.publish(event_type, workflow_id, **data)
@@ -0,0 +1,214 @@
+"""
+History Store - Bounded in-memory history with spill-to-disk
+The newest records stay in memory; older ones are appended to a per-process
+JSONL segment and read back on demand, so agent histories can grow without
+growing the worker. Reads (iteration, indexing, lookup by key) see one
+continuous history regardless of where a record lives.
+"""
+
+import os
+import json
+import sqlite3
+import logging
+import threading
+import uuid
+import weakref
+from array import array
+from collections import deque
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional, Type
+
+from config.settings import HISTORY_DIR, HISTORY_HOT_SIZE
+
+from .records import Record, json_default
+
+logger = logging.getLogger(__name__)
+
+
+def _cleanup(segment, keys_db, paths) -> None:
+    for handle in (segment, keys_db):
+        if handle is not None:
+            handle.close()
+    for path in paths:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class HistoryStore:
+    """
+    Append-mostly record history with a hot in-memory tail.
+
+    Records spilled to disk are returned as fresh copies, so callers that
+    modify a record must write it back with put().
+    """
+
+    def __init__(self, name: str, key: Optional[str] = None, hot_size: int = HISTORY_HOT_SIZE,
+                 spill_dir: Optional[Path] = None, record_type: Optional[Type[Record]] = None):
+        """
+        Args:
+            name: Segment file prefix (each store instance gets its own segment)
+            key: Record field used by get()/put(). Without it only positional reads work.
+            hot_size: Newest records kept in memory
+            spill_dir: Where segments live. Defaults to HISTORY_DIR.
+            record_type: Record class to rebuild spilled records as. Plain dicts if None.
+        """
+        self.name = name
+        self.key = key
+        self.record_type = record_type
+        self.hot_size = max(1, hot_size)
+        spill_dir = Path(spill_dir or HISTORY_DIR)
+        spill_dir.mkdir(parents=True, exist_ok=True)
+        # Unique per instance: stores sharing a name in one process must not share files
+        stem = f"{name}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.segment_path = spill_dir / f"{stem}.jsonl"
+        self.keys_path = spill_dir / f"{stem}.keys.db"
+
+        self._hot: deque = deque()
+        self._hot_by_key: Dict[Any, Dict[str, Any]] = {}
+        # Byte offset of every spilled record, by position
+        self._offsets = array("q")
+        self._segment = None
+        self._keys_db = None
+        self._lock = threading.RLock()
+        self._finalizer = None
+
+    def _open_segment(self) -> None:
+        """Create the segment (and key index) on first spill."""
+        self._segment = open(self.segment_path, "x+b")
+        paths = [self.segment_path]
+        if self.key:
+            self._keys_db = sqlite3.connect(str(self.keys_path), check_same_thread=False)
+            self._keys_db.execute("PRAGMA synchronous=OFF")
+            self._keys_db.execute("CREATE TABLE spilled (key TEXT PRIMARY KEY, position INTEGER NOT NULL)")
+            paths.append(self.keys_path)
+        self._finalizer = weakref.finalize(self, _cleanup, self._segment, self._keys_db, paths)
+
+    def _write_line(self, record: Dict[str, Any]) -> int:
+        line = json.dumps(record, default=json_default).encode("utf-8") + b"\n"
+        offset = self._segment.seek(0, os.SEEK_END)
+        self._segment.write(line)
+        return offset
+
+    def _read_at(self, offset: int) -> Dict[str, Any]:
+        self._segment.seek(offset)
+        data = json.loads(self._segment.readline())
+        return self.record_type.from_dict(data) if self.record_type else data
+
+    def _spill(self, record: Dict[str, Any]) -> None:
+        if self._segment is None:
+            self._open_segment()
+        position = len(self._offsets)
+        self._offsets.append(self._write_line(record))
+        if self.key:
+            key = record.get(self.key)
+            if self._hot_by_key.get(key) is record:
+                del self._hot_by_key[key]
+            # A newer record with the same key may still be hot; get() checks hot first
+            self._keys_db.execute("INSERT OR REPLACE INTO spilled (key, position) VALUES (?, ?)",
+                                  (str(key), position))
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """Add a record as the newest entry, spilling the oldest hot record if over budget."""
+        with self._lock:
+            self._hot.append(record)
+            if self.key:
+                self._hot_by_key[record.get(self.key)] = record
+            while len(self._hot) > self.hot_size:
+                self._spill(self._hot.popleft())
+
+    def extend(self, records: List[Dict[str, Any]]) -> None:
+        for record in records:
+            self.append(record)
+
+    def get(self, key: Any) -> Optional[Dict[str, Any]]:
+        """Newest record with this key, or None."""
+        if not self.key:
+            raise ValueError(f"History {self.name} has no key field")
+        with self._lock:
+            record = self._hot_by_key.get(key)
+            if record is not None or self._keys_db is None:
+                return record
+            row = self._keys_db.execute("SELECT position FROM spilled WHERE key = ?", (str(key),)).fetchone()
+            return self._read_at(self._offsets[row[0]]) if row else None
+
+    def put(self, record: Dict[str, Any]) -> None:
+        """
+        Write back a modified record identified by its key.
+
+        Hot records are replaced in memory; spilled ones get a new line
+        appended to the segment, which then shadows the old one.
+        """
+        key = record.get(self.key) if self.key else None
+        if key is None:
+            raise ValueError(f"Record has no {self.key!r} field")
+        with self._lock:
+            current = self._hot_by_key.get(key)
+            if current is not None:
+                if current is not record:
+                    self._hot[self._hot.index(current)] = record
+                    self._hot_by_key[key] = record
+                return
+            row = self._keys_db.execute(
+                "SELECT position FROM spilled WHERE key = ?", (str(key),)
+            ).fetchone() if self._keys_db is not None else None
+            if row is None:
+                raise KeyError(key)
+            self._offsets[row[0]] = self._write_line(record)
+
+    def __contains__(self, key: Any) -> bool:
+        return self.get(key) is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._offsets) + len(self._hot)
+
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        with self._lock:
+            spilled = len(self._offsets)
+            total = spilled + len(self._hot)
+            if index < 0:
+                index += total
+            if not 0 <= index < total:
+                raise IndexError("history index out of range")
+            if index < spilled:
+                return self._read_at(self._offsets[index])
+            return self._hot[index - spilled]
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Oldest first. Records spilled during iteration are still seen exactly once."""
+        with self._lock:
+            spilled = len(self._offsets)
+            hot = list(self._hot)
+        for position in range(spilled):
+            with self._lock:
+                record = self._read_at(self._offsets[position])
+            yield record
+        yield from hot
+
+    def tail(self, n: int) -> List[Dict[str, Any]]:
+        """The newest n records, oldest first."""
+        with self._lock:
+            total = len(self)
+            return [self[i] for i in range(max(0, total - n), total)]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "records": len(self),
+                "hot": len(self._hot),
+                "spilled": len(self._offsets),
+                "segment_bytes": self._segment.seek(0, os.SEEK_END) if self._segment else 0
+            }
+
+    def close(self) -> None:
+        """Close and delete this process's segment."""
+        with self._lock:
+            if self._finalizer is not None:
+                self._finalizer()
+            self._segment = None
+            self._keys_db = None
+            self._offsets = array("q")
+            self._hot.clear()
+            self._hot_by_key.clear()
@@ -0,0 +1,81 @@
+"""
+Image IO - Local caching of generated images for post-processing
+Generated art is referenced by URL; renderers need local files. Sources
+are downloaded once into IMAGES_DIR and reused by every pipeline.
+"""
+
+import os
+import re
+import hashlib
+import logging
+from pathlib import Path
+from typing import Iterable, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+from config.settings import ALLOWED_IMAGE_HOSTS, IMAGES_DIR, TIMEOUT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+ORIGINALS_DIR = IMAGES_DIR / "originals"
+
+
+def local_name(source: str) -> str:
+    """Stable cache file name for an image URL."""
+    suffix = Path(source.split("?")[0]).suffix.lower()
+    if suffix not in (".png", ".jpg", ".jpeg", ".webp"):
+        suffix = ".png"
+    return hashlib.sha1(source.encode("utf-8")).hexdigest() + suffix
+
+
+def path_slug(text: str) -> str:
+    """Client-supplied text (e.g. a niche) reduced to a safe file or directory name component."""
+    return re.sub(r"[^A-Za-z0-9_-]+", "_", text).strip("_") or "untitled"
+
+
+def is_allowed_image_url(url: str, hosts: Iterable[str] = ALLOWED_IMAGE_HOSTS) -> bool:
+    """True for an http(s) URL whose host is one of `hosts` or a subdomain of one."""
+    try:
+        parts = urlsplit(url)
+    except (TypeError, ValueError):
+        return False
+    host = (parts.hostname or "").lower()
+    return parts.scheme in ("http", "https") and any(host == h or host.endswith("." + h) for h in hosts)
+
+
+def is_within(path, root) -> bool:
+    """True if `path` resolves (following symlinks and "..") to a location inside `root`."""
+    return Path(path).resolve().is_relative_to(Path(root).resolve())
+
+
+def fetch_image(source: str, cache_dir: Optional[Path] = None, session: Optional[requests.Session] = None) -> Path:
+    """
+    Return a local path for an image path or URL, downloading it if needed.
+
+    Downloads are streamed to a temporary file and renamed into place, so
+    concurrent callers never see a partially written image.
+
+    Raises:
+        requests.RequestException: If the download fails
+    """
+    if os.path.exists(source):
+        return Path(source)
+
+    cache_dir = Path(cache_dir or ORIGINALS_DIR)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    path = cache_dir / local_name(source)
+    if path.exists():
+        return path
+
+    logger.info("Downloading image %s", source[:80])
+    http = session or requests
+    response = http.get(source, stream=True, timeout=TIMEOUT_SECONDS)
+    response.raise_for_status()
+
+    tmp_path = path.with_suffix(path.suffix + f".{os.getpid()}.part")
+    with open(tmp_path, "wb") as f:
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            f.write(chunk)
+    os.replace(tmp_path, path)
+    return path
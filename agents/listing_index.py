@@ -0,0 +1,126 @@
+"""
+Listing Index - SQLite FTS5 full-text search over listings
+Titles, descriptions and tags are indexed with BM25 ranking and prefix
+support. Rows are keyed by an integer rowid so updates and deletes are
+point operations rather than scans.
+"""
+
+import re
+import logging
+import sqlite3
+import threading
+from typing import Dict, Any, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# BM25 column weights: title, description, tags
+BM25_WEIGHTS = (10.0, 1.0, 5.0)
+
+_TOKEN_RE = re.compile(r"[\w']+\*?", re.UNICODE)
+
+
+def build_match_query(query: str) -> str:
+    """
+    Turn free text into a safe FTS5 MATCH expression.
+
+    Every word must match (implicit AND); a trailing * makes a word a
+    prefix query. FTS5 operators and punctuation in user input are
+    neutralised by quoting each term.
+    """
+    terms = []
+    for token in _TOKEN_RE.findall(query):
+        prefix = token.endswith("*")
+        word = token.rstrip("*").replace('"', "")
+        if word:
+            terms.append(f'"{word}"*' if prefix else f'"{word}"')
+    return " ".join(terms)
+
+
+class ListingIndex:
+    """Full-text index of listings backed by an FTS5 virtual table."""
+
+    def __init__(self, db_path: str = ":memory:"):
+        """
+        Open (or create) the index.
+
+        Args:
+            db_path: SQLite database file. Defaults to an in-memory index,
+                matching the agent's in-memory listing store.
+        """
+        self.db_path = str(db_path)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            if self.db_path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS listing_keys (rowid INTEGER PRIMARY KEY, listing_id TEXT UNIQUE NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS listing_fts USING fts5("
+                "title, description, tags, tokenize='porter unicode61', prefix='2 3')"
+            )
+
+    def _rowid(self, listing_id: str) -> int:
+        self._conn.execute("INSERT OR IGNORE INTO listing_keys (listing_id) VALUES (?)", (listing_id,))
+        return self._conn.execute("SELECT rowid FROM listing_keys WHERE listing_id = ?", (listing_id,)).fetchone()[0]
+
+    def _write(self, listing: Dict[str, Any]) -> None:
+        rowid = self._rowid(listing["id"])
+        self._conn.execute("DELETE FROM listing_fts WHERE rowid = ?", (rowid,))
+        self._conn.execute(
+            "INSERT INTO listing_fts (rowid, title, description, tags) VALUES (?, ?, ?, ?)",
+            (rowid, listing.get("title", ""), listing.get("description", ""), " ".join(listing.get("tags", [])))
+        )
+
+    def upsert(self, listing: Dict[str, Any]) -> None:
+        """Index a listing, replacing any previous version."""
+        with self._lock, self._conn:
+            self._write(listing)
+
+    def upsert_many(self, listings: List[Dict[str, Any]]) -> None:
+        """Index many listings in a single transaction."""
+        with self._lock, self._conn:
+            for listing in listings:
+                self._write(listing)
+
+    def remove(self, listing_id: str) -> None:
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT rowid FROM listing_keys WHERE listing_id = ?", (listing_id,)).fetchone()
+            if row:
+                self._conn.execute("DELETE FROM listing_fts WHERE rowid = ?", row)
+                self._conn.execute("DELETE FROM listing_keys WHERE rowid = ?", row)
+
+    def search(self, query: str, limit: int = 20, offset: int = 0) -> List[Tuple[str, float]]:
+        """
+        Ranked search.
+
+        Returns:
+            (listing_id, score) pairs, best first. Higher scores are better.
+        """
+        match = build_match_query(query)
+        if not match:
+            return []
+
+        sql = (
+            "SELECT k.listing_id, bm25(listing_fts, ?, ?, ?) AS rank "
+            "FROM listing_fts JOIN listing_keys k ON k.rowid = listing_fts.rowid "
+            "WHERE listing_fts MATCH ? ORDER BY rank LIMIT ? OFFSET ?"
+        )
+        with self._lock:
+            try:
+                rows = self._conn.execute(sql, (*BM25_WEIGHTS, match, limit, offset)).fetchall()
+            except sqlite3.OperationalError as e:
+                logger.warning("Listing search failed for %r: %s", query, e)
+                return []
+        # bm25() is lower-is-better; flip the sign for callers
+        return [(listing_id, round(-rank, 4)) for listing_id, rank in rows]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM listing_keys").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
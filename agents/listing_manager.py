@@ -1,86 +1,315 @@
 """Listing Manager Agent - Etsy API integration for creating and managing listings"""
 import os
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List, Optional
 from openai import OpenAI
 
+from config.settings import ETSY_IMAGE_LIMIT
+
+from .embedding_index import EmbeddingIndex, embedding_client
+from .etsy_client import EtsyClient, EtsyAPIError, EtsyUploadError
+from .events import publish
+from .history_store import HistoryStore
+from .image_io import fetch_image
+from .listing_index import ListingIndex
+from .mockups import MockupRenderer
+from .model_router import ModelRouter
+from .records import Listing
+from .tag_analytics import TagAnalytics
+from .versioning import VersionCounter
+
 logger = logging.getLogger(__name__)
 
+UPDATABLE_FIELDS = {"title", "description", "price", "tags", "image_url"}
+
+
 class ListingManagerAgent:
-      """Manages Etsy shop listings creation, updates, and optimization via Etsy API."""
+    """Manages Etsy shop listings creation, updates, and optimization via Etsy API."""
 
-    def __init__(self, api_key: Optional[str] = None, etsy_api_key: Optional[str] = None, shop_id: Optional[str] = None):
-              self.api_key = api_key or os.getenv("OPENAI_API_KEY")
-              self.etsy_api_key = etsy_api_key or os.getenv("ETSY_API_KEY")
-              self.shop_id = shop_id or os.getenv("ETSY_SHOP_ID")
+    def __init__(self, api_key: Optional[str] = None, etsy_api_key: Optional[str] = None, shop_id: Optional[str] = None,
+                 etsy_client: Optional[EtsyClient] = None, mockup_renderer: Optional[MockupRenderer] = None,
+                 search_index: Optional[ListingIndex] = None, tag_analytics: Optional[TagAnalytics] = None,
+                 embedding_index: Optional[EmbeddingIndex] = None):
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
+        self.etsy_api_key = etsy_api_key or os.getenv("ETSY_API_KEY")
+        self.shop_id = shop_id or os.getenv("ETSY_SHOP_ID")
 
         if not self.api_key:
-                      raise ValueError("OpenAI API key required")
+            raise ValueError("OpenAI API key required")
 
         self.client = OpenAI(api_key=self.api_key)
-        self.listings = []
+        self.router = ModelRouter(self.client)
+        self.etsy = etsy_client
+        if self.etsy is None and self.etsy_api_key and self.shop_id:
+            self.etsy = EtsyClient(self.etsy_api_key, access_token=os.getenv("ETSY_ACCESS_TOKEN"))
+        self.mockups = mockup_renderer
+        self.search_index = search_index or ListingIndex()
+        self.tag_analytics = tag_analytics or TagAnalytics()
+        self.embeddings = embedding_index or EmbeddingIndex("listings", embedding_client(self.api_key))
+        self._unembedded = set()
+        self.listings = HistoryStore("listings", key="id", record_type=Listing)
+        self.version = VersionCounter()
         logger.info("ListingManagerAgent initialized")
 
-    def create_listing(self, title: str, description: str, price: float, image_url: str, tags: List[str]) -> Dict[str, Any]:
-              """Create a new Etsy listing with SEO optimization."""
-              logger.info(f"Creating listing: {title}")
+    def create_listing(self, title: str, description: str, price: float, image_url: str, tags: List[str],
+                       render_mockups: bool = True, niche: Optional[str] = None) -> Dict[str, Any]:
+        """Create a new Etsy listing with SEO optimization and, if a renderer is configured, product mockups."""
+        logger.info("Creating listing: %s", title)
 
         # Generate SEO-optimized content if not provided
-              seo_title = self._optimize_title(title)
-              seo_description = self._optimize_description(description)
-
-        listing = {
-                      "id": f"listing_{len(self.listings):05d}",
-                      "title": seo_title,
-                      "description": seo_description,
-                      "price": price,
-                      "image_url": image_url,
-                      "tags": tags,
-                      "status": "draft",
-                      "created_at": "2026-01-07"
-        }
+        seo_title = self._optimize_title(title)
+        seo_description = self._optimize_description(description)
+
+        listing = Listing(
+            id=f"listing_{len(self.listings):05d}",
+            title=seo_title,
+            description=seo_description,
+            price=price,
+            image_url=image_url,
+            tags=tags,
+            status="draft",
+            created_at="2026-01-07",
+            niche=niche
+        )
 
         self.listings.append(listing)
-        logger.info(f"Listing created: {listing['id']}")
+        self.search_index.upsert(listing)
+        self.tag_analytics.add_listing(tags)
+        self._unembedded.add(listing["id"])
+        if render_mockups:
+            self._attach_mockups([listing])
+        self.version.bump()
+        publish("listing.created", item_id=listing.id, title=listing.title, niche=niche)
+        logger.info("Listing created: %s", listing['id'])
         return listing
 
     def _optimize_title(self, title: str) -> str:
-              """Optimize title for Etsy SEO using GPT-4."""
-              try:
-                            response = self.client.chat.completions.create(
-                                              model="gpt-4-turbo",
-                                              messages=[{
-                                                                    "role": "user",
-                                                                    "content": f"Optimize this Etsy listing title for SEO (max 140 chars): {title}"
-                                              }],
-                                              temperature=0.7,
-                                              max_tokens=50
-                            )
-                            return response.choices[0].message.content
-                        except:
+        """Optimize title for Etsy SEO using the fast model tier."""
+        try:
+            response = self.router.complete(
+                "title_optimization",
+                messages=[{
+                    "role": "user",
+                    "content": f"Optimize this Etsy listing title for SEO (max 140 chars): {title}"
+                }],
+                temperature=0.7,
+                max_tokens=50
+            )
+            return response.choices[0].message.content
+        except:
             return title
 
     def _optimize_description(self, description: str) -> str:
-              """Optimize description with keywords and formatting."""
-              return description
+        """Optimize description with keywords and formatting."""
+        return description
 
     def bulk_create_listings(self, listings_data: List[Dict]) -> List[Dict[str, Any]]:
-              """Create multiple listings in batch."""
-              results = []
-              for data in listings_data:
-                            result = self.create_listing(**data)
-                            results.append(result)
-                        return results
+        """Create multiple listings in batch, rendering all their mockups in one parallel pass."""
+        results = []
+        for data in listings_data:
+            result = self.create_listing(**{**data, "render_mockups": False})
+            results.append(result)
+        if self.mockups is not None and any(data.get("render_mockups", True) for data in listings_data):
+            self._attach_mockups([r for r, d in zip(results, listings_data) if d.get("render_mockups", True)])
+            self.version.bump()
+        return results
+
+    def _attach_mockups(self, listings: List[Dict[str, Any]]) -> None:
+        """Render mockups for listings and add them as extra listing images."""
+        if self.mockups is None:
+            return
+
+        sources = {}
+        for listing in listings:
+            try:
+                sources[listing["id"]] = str(fetch_image(listing["image_url"]))
+            except Exception as e:
+                logger.warning("Skipping mockups for %s: %s", listing['id'], e)
+
+        by_id = {listing["id"]: listing for listing in listings}
+        for listing_id, mockups in self.mockups.render_many(sources).items():
+            listing = by_id[listing_id]
+            listing["mockups"] = mockups
+            listing["extra_image_urls"] = listing.get("extra_image_urls", []) + [m["path"] for m in mockups]
+            self.listings.put(listing)
 
     def get_listings(self) -> List[Dict[str, Any]]:
-              """Retrieve all listings."""
-        return self.listings
+        """Retrieve all listings."""
+        return list(self.listings)
+
+    def get_listing(self, listing_id: str) -> Optional[Dict[str, Any]]:
+        """Look up a listing by id."""
+        return self.listings.get(listing_id)
+
+    def update_listing(self, listing_id: str, **fields) -> Dict[str, Any]:
+        """
+        Update editable fields of a listing and refresh its search entry.
+
+        Args:
+            listing_id: Listing to update
+            **fields: Any of title, description, price, tags, image_url
+
+        Returns:
+            The updated listing, or an error dict
+        """
+        listing = self.listings.get(listing_id)
+        if not listing:
+            return {"error": "Listing not found"}
+
+        unknown = set(fields) - UPDATABLE_FIELDS
+        if unknown:
+            return {"error": f"Fields cannot be updated: {sorted(unknown)}"}
+
+        if "tags" in fields:
+            self.tag_analytics.update_listing(listing.get("tags", []), fields["tags"])
+        listing.update(fields)
+        self.listings.put(listing)
+        self.search_index.upsert(listing)
+        self._unembedded.add(listing_id)
+        self.version.bump()
+        logger.info("Listing updated: %s", listing_id)
+        return listing
+
+    def search_listings(self, query: str, limit: int = 20, offset: int = 0) -> List[Dict[str, Any]]:
+        """
+        Full-text search over listing titles, descriptions and tags.
+
+        Words are ANDed; append * to a word for a prefix match (e.g. "water*").
+
+        Returns:
+            Matching listings, best match first, each with a relevance "score"
+        """
+        results = []
+        for listing_id, score in self.search_index.search(query, limit, offset):
+            listing = self.listings.get(listing_id)
+            if listing:
+                results.append({**listing, "score": score})
+        return results
+
+    def similar_listings(self, query: Optional[str] = None, listing_id: Optional[str] = None,
+                         limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Find listings semantically similar to free text or to another listing.
+
+        Listings created or edited since the last lookup are embedded first
+        in one batch; the lookup itself is a local cosine top-k.
+
+        Returns:
+            Matching listings, most similar first, each with a "similarity"
+        """
+        pending = {i: self.listings.get(i) for i in list(self._unembedded)}
+        pending = {i: listing for i, listing in pending.items() if listing}
+        if pending:
+            self.embeddings.add({i: self._embedding_text(listing) for i, listing in pending.items()})
+            self._unembedded.difference_update(pending)
+
+        if listing_id:
+            matches = self.embeddings.similar(listing_id, limit)
+        elif query:
+            matches = self.embeddings.search(self.embeddings.query_vector(query), limit)
+        else:
+            return []
+
+        results = []
+        for listing_id, score in matches:
+            listing = self.listings.get(listing_id)
+            if listing:
+                results.append({**listing, "similarity": score})
+        return results
+
+    def _embedding_text(self, listing: Dict[str, Any]) -> str:
+        return f"{listing['title']}. Tags: {', '.join(listing.get('tags', []))}"
 
     def publish_listing(self, listing_id: str) -> Dict[str, Any]:
-              """Publish listing to Etsy shop."""
-        for listing in self.listings:
-                      if listing["id"] == listing_id:
-                                        listing["status"] = "published"
-                                        logger.info(f"Listing published: {listing_id}")
-                                        return listing
-                                return {"error": "Listing not found"}
+        """
+        Publish listing to Etsy shop.
+
+        Creates the Etsy draft, uploads its images concurrently and activates
+        it. Progress is stored on the listing, so retrying a failed publish
+        does not create a second draft or re-upload finished images. Without
+        Etsy credentials the listing is only marked published locally.
+        """
+        listing = self.listings.get(listing_id)
+        if not listing:
+            return {"error": "Listing not found"}
+
+        if self.etsy is None:
+            logger.warning("Etsy credentials not configured; marking %s published locally", listing_id)
+            listing["status"] = "published"
+            self.listings.put(listing)
+            self.version.bump()
+            return listing
+
+        try:
+            if not listing.get("etsy_listing_id"):
+                draft = self.etsy.create_draft_listing(self.shop_id, self._to_etsy_fields(listing))
+                listing["etsy_listing_id"] = draft["listing_id"]
+
+            # etsy_image_ids is aligned with the image sources; None marks an upload still to do
+            sources = self._image_sources(listing)[:ETSY_IMAGE_LIMIT]
+            uploaded = listing.setdefault("etsy_image_ids", [])
+            uploaded.extend([None] * (len(sources) - len(uploaded)))
+            pending = [i for i in range(len(sources)) if uploaded[i] is None]
+            if pending:
+                failure = None
+                try:
+                    responses = self.etsy.upload_listing_images(
+                        self.shop_id, listing["etsy_listing_id"], [sources[i] for i in pending],
+                        ranks=[i + 1 for i in pending]
+                    )
+                except EtsyUploadError as e:
+                    responses, failure = e.results, e
+                for i, response in zip(pending, responses):
+                    if response:
+                        uploaded[i] = response.get("listing_image_id")
+                if failure:
+                    raise failure
+
+            self.etsy.activate_listing(self.shop_id, listing["etsy_listing_id"])
+        except EtsyAPIError as e:
+            logger.error("Listing publish failed for %s: %s", listing_id, e)
+            listing["status"] = "publish_failed"
+            self.version.bump()
+            return {"error": str(e), "listing_id": listing_id}
+        finally:
+            # Keep draft/upload progress even if the listing has been spilled to disk
+            self.listings.put(listing)
+
+        listing["status"] = "published"
+        self.listings.put(listing)
+        self.version.bump()
+        logger.info("Listing published: %s", listing_id)
+        return listing
+
+    def bulk_publish(self, listing_ids: List[str], max_workers: int = 10) -> List[Dict[str, Any]]:
+        """
+        Publish many listings with overlapping network I/O.
+
+        Listings are published in parallel; image uploads across all of
+        them share the client's MAX_CONCURRENT_UPLOADS cap.
+        """
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="etsy-publish") as pool:
+            return list(pool.map(self.publish_listing, listing_ids))
+
+    def _image_sources(self, listing: Dict[str, Any]) -> List[str]:
+        """Images to upload for a listing, primary image first."""
+        sources = [listing["image_url"]] if listing.get("image_url") else []
+        return sources + listing.get("extra_image_urls", [])
+
+    def _to_etsy_fields(self, listing: Dict[str, Any]) -> Dict[str, Any]:
+        """Map a local listing onto Etsy createDraftListing form fields."""
+        fields = {
+            "quantity": 999,
+            "title": listing["title"][:140],
+            "description": listing["description"],
+            "price": listing["price"],
+            "who_made": "i_did",
+            "when_made": "made_to_order",
+            "is_supply": "false",
+            "tags": ",".join(listing.get("tags", [])[:13])
+        }
+        taxonomy_id = os.getenv("ETSY_TAXONOMY_ID")
+        if taxonomy_id:
+            fields["taxonomy_id"] = taxonomy_id
+        return fields
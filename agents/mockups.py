@@ -0,0 +1,234 @@
+"""
+Mockups - Composite generated art onto product template scenes
+Templates are procedural scenes with a target quad, a feathered alpha
+mask and a lighting map, built once per process and cached. Each mockup
+is one perspective warp into the quad's bounding box plus a vectorized
+alpha blend; batches run on a process pool.
+"""
+
+import os
+import logging
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+import cv2
+import numpy as np
+
+from config.settings import IMAGES_DIR, MOCKUP_WORKERS, POOL_START_METHOD
+
+from .derivative_cache import fingerprint
+from .image_io import path_slug
+
+logger = logging.getLogger(__name__)
+
+MOCKUP_DIR = IMAGES_DIR / "mockups"
+MOCKUP_SIZE = 2000  # Etsy recommends at least 2000px on the shortest side
+JPEG_QUALITY = 90
+
+# template -> scene description; quads are TL, TR, BR, BL as fractions of MOCKUP_SIZE
+TEMPLATE_SPECS = {
+    "framed_print": {
+        "wall": ((226, 232, 236), (196, 204, 210)),
+        "quad": ((0.30, 0.18), (0.70, 0.18), (0.70, 0.74), (0.30, 0.74)),
+        "frame": 0.035,
+        "light": (0.2, 0.1),
+    },
+    "canvas": {
+        "wall": ((208, 222, 232), (170, 186, 198)),
+        "quad": ((0.24, 0.16), (0.71, 0.20), (0.71, 0.76), (0.24, 0.82)),
+        "frame": 0.0,
+        "light": (0.8, 0.2),
+    },
+    "poster_angled": {
+        "wall": ((190, 200, 214), (120, 132, 148)),
+        "quad": ((0.34, 0.12), (0.78, 0.20), (0.74, 0.86), (0.30, 0.80)),
+        "frame": 0.012,
+        "light": (0.7, 0.0),
+    },
+}
+
+
+class MockupTemplate:
+    """Precomputed scene: background, art quad, alpha mask and lighting for the art region."""
+
+    def __init__(self, name: str, background: np.ndarray, quad: np.ndarray, alpha: np.ndarray, shading: np.ndarray):
+        self.name = name
+        self.background = background
+        self.quad = quad
+        x, y, w, h = cv2.boundingRect(quad.astype(np.int32))
+        self.roi = (x, y, w, h)
+        # Only the bounding box of the quad is ever blended
+        self.alpha = alpha[y:y + h, x:x + w, None]
+        self.shading = shading[y:y + h, x:x + w, None]
+
+
+def _build_template(name: str, size: int = MOCKUP_SIZE) -> MockupTemplate:
+    spec = TEMPLATE_SPECS[name]
+    quad = np.array(spec["quad"], dtype=np.float32) * size
+
+    # Wall: vertical gradient between the two BGR tones
+    top, bottom = (np.array(c, dtype=np.float32) for c in spec["wall"])
+    t = np.linspace(0.0, 1.0, size, dtype=np.float32)[:, None, None]
+    background = np.broadcast_to(top * (1 - t) + bottom * t, (size, size, 3)).copy()
+
+    # Soft drop shadow under the art
+    shadow = np.zeros((size, size), dtype=np.float32)
+    cv2.fillConvexPoly(shadow, (quad + size * 0.012).astype(np.int32), 1.0, lineType=cv2.LINE_AA)
+    shadow = cv2.GaussianBlur(shadow, (0, 0), size * 0.012)
+    background *= (1.0 - 0.35 * shadow)[..., None]
+
+    # Frame: dark border drawn around the quad
+    if spec["frame"]:
+        center = quad.mean(axis=0)
+        outer = center + (quad - center) * (1.0 + spec["frame"] * 2)
+        cv2.fillConvexPoly(background, outer.astype(np.int32), (38, 36, 34), lineType=cv2.LINE_AA)
+
+    # Art mask, feathered by a pixel so edges are anti-aliased
+    alpha = np.zeros((size, size), dtype=np.float32)
+    cv2.fillConvexPoly(alpha, quad.astype(np.int32), 1.0, lineType=cv2.LINE_AA)
+    alpha = cv2.GaussianBlur(alpha, (3, 3), 0)
+
+    # Lighting: falloff from a light position, in [0.82, 1.05]
+    lx, ly = spec["light"]
+    ys, xs = np.mgrid[0:size, 0:size].astype(np.float32) / size
+    distance = np.sqrt((xs - lx) ** 2 + (ys - ly) ** 2)
+    shading = 1.05 - 0.23 * (distance / distance.max())
+
+    background = np.clip(background, 0, 255).astype(np.uint8)
+    return MockupTemplate(name, background, quad, alpha, shading.astype(np.float32))
+
+
+@lru_cache(maxsize=None)
+def load_template(name: str) -> MockupTemplate:
+    """Build a template once per process."""
+    if name not in TEMPLATE_SPECS:
+        raise ValueError(f"Unknown mockup template: {name}")
+    return _build_template(name)
+
+
+@lru_cache(maxsize=64)
+def _warp_matrix(name: str, src_w: int, src_h: int) -> np.ndarray:
+    """Perspective matrix from a source image onto the template ROI."""
+    template = load_template(name)
+    x, y, _, _ = template.roi
+    src = np.array([[0, 0], [src_w, 0], [src_w, src_h], [0, src_h]], dtype=np.float32)
+    return cv2.getPerspectiveTransform(src, template.quad - np.array([x, y], dtype=np.float32))
+
+
+def composite(template: MockupTemplate, art: np.ndarray) -> np.ndarray:
+    """Warp art into the template quad and alpha-blend it over the background."""
+    x, y, w, h = template.roi
+    matrix = _warp_matrix(template.name, art.shape[1], art.shape[0])
+    warped = cv2.warpPerspective(art, matrix, (w, h), flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+
+    out = template.background.copy()
+    region = out[y:y + h, x:x + w].astype(np.float32)
+    lit = warped.astype(np.float32) * template.shading
+    out[y:y + h, x:x + w] = np.clip(region + template.alpha * (lit - region), 0, 255).astype(np.uint8)
+    return out
+
+
+def render_mockups(source_path: str, output_dir: str, templates: List[str]) -> List[Dict[str, Any]]:
+    """
+    Render one image onto several templates.
+
+    Runs in worker processes, so it only takes and returns plain values.
+    Existing outputs are reused.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    art = None
+    rendered = []
+    for name in templates:
+        path = output_dir / f"{name}.jpg"
+        if not path.exists():
+            if art is None:
+                art = cv2.imread(source_path, cv2.IMREAD_COLOR)
+                if art is None:
+                    raise ValueError(f"Could not read image: {source_path}")
+            # Unique per call so concurrent renders into the same directory never share a temp file
+            fd, tmp_name = tempfile.mkstemp(dir=output_dir, prefix=f".{name}.", suffix=".jpg")
+            os.close(fd)
+            try:
+                image = composite(load_template(name), art)
+                if not cv2.imwrite(tmp_name, image, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY]):
+                    raise ValueError(f"Could not write mockup: {path}")
+                os.replace(tmp_name, path)
+            except BaseException:
+                Path(tmp_name).unlink(missing_ok=True)
+                raise
+        rendered.append({"template": name, "path": str(path)})
+    return rendered
+
+
+class MockupRenderer:
+    """Renders product mockups for batches of images on a process pool."""
+
+    def __init__(self, output_dir: Optional[Path] = None, templates: Optional[List[str]] = None,
+                 max_workers: Optional[int] = None):
+        """
+        Initialize the renderer.
+
+        Args:
+            output_dir: Root directory for mockups. Defaults to IMAGES_DIR/mockups.
+            templates: Template names to render. Defaults to all templates.
+            max_workers: Process pool size. Defaults to MOCKUP_WORKERS.
+        """
+        self.output_dir = Path(output_dir or MOCKUP_DIR)
+        self.templates = list(templates or TEMPLATE_SPECS)
+        unknown = [name for name in self.templates if name not in TEMPLATE_SPECS]
+        if unknown:
+            raise ValueError(f"Unknown mockup templates: {unknown}")
+        self.max_workers = max_workers or MOCKUP_WORKERS
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                             mp_context=multiprocessing.get_context(POOL_START_METHOD))
+        return self._pool
+
+    def render_many(self, sources: Dict[str, str]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Render every template for several images in parallel.
+
+        Args:
+            sources: Key (e.g. listing or image id) -> local source path
+
+        Returns:
+            Key -> rendered mockups; keys whose render failed map to an empty list
+        """
+        pool = self._get_pool()
+        futures = {
+            key: pool.submit(render_mockups, str(path), str(self._output_dir_for(key, str(path))), self.templates)
+            for key, path in sources.items()
+        }
+
+        results: Dict[str, List[Dict[str, Any]]] = {}
+        for key, future in futures.items():
+            try:
+                results[key] = future.result()
+            except Exception as e:
+                logger.error("Mockup rendering failed for %s: %s", key, e)
+                results[key] = []
+        return results
+
+    def _output_dir_for(self, key: str, source_path: str) -> Path:
+        """
+        Directory for one key's mockups.
+
+        Keyed on the caller's id plus the source fingerprint, so sources
+        sharing a file stem never collide and a new source is never served
+        an older image's mockups.
+        """
+        return self.output_dir / f"{path_slug(str(key))}_{fingerprint(source_path)}"
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
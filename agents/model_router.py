@@ -0,0 +1,144 @@
+"""
+Model Router - Task-aware chat model selection with latency tracking
+Each agent task declares a quality class and a latency target; the router
+maps classes to models and records observed latency per model so the
+mapping can be tuned from real numbers.
+"""
+
+import time
+import logging
+import threading
+from collections import deque
+from typing import Dict, Any, List, Optional
+
+from config.settings import MODEL_TIERS
+
+from .tracing import span
+
+logger = logging.getLogger(__name__)
+
+# task -> (quality class, latency target in seconds)
+TASK_PROFILES = {
+    "market_analysis": ("quality", 30.0),
+    "competition_analysis": ("quality", 20.0),
+    "trend_research": ("quality", 30.0),
+    "niche_analysis": ("quality", 20.0),
+    "keyword_extraction": ("fast", 5.0),
+    "title_optimization": ("fast", 2.0),
+    "captions": ("fast", 8.0),
+    "draft_review": ("vision", 15.0),
+}
+
+
+class LatencyStats:
+    """Rolling latency samples and error counts for one model."""
+
+    def __init__(self, window: int = 500):
+        self.samples = deque(maxlen=window)
+        self.calls = 0
+        self.errors = 0
+        self.over_target = 0
+
+    def summary(self) -> Dict[str, Any]:
+        ordered = sorted(self.samples)
+
+        def percentile(p: float) -> Optional[float]:
+            if not ordered:
+                return None
+            return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000, 1)
+
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "over_target": self.over_target,
+            "avg_ms": round(sum(ordered) / len(ordered) * 1000, 1) if ordered else None,
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+        }
+
+
+class LatencyRegistry:
+    """Process-wide latency stats keyed by model, shared by every router."""
+
+    def __init__(self):
+        self._stats: Dict[str, LatencyStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, model: str, seconds: float, ok: bool = True, over_target: bool = False) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(model, LatencyStats())
+            stats.calls += 1
+            if ok:
+                stats.samples.append(seconds)
+            else:
+                stats.errors += 1
+            if over_target:
+                stats.over_target += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {model: stats.summary() for model, stats in self._stats.items()}
+
+
+latency_registry = LatencyRegistry()
+
+
+class ModelRouter:
+    """Routes each agent task to a model based on its declared quality class."""
+
+    def __init__(self, client, tiers: Optional[Dict[str, str]] = None,
+                 registry: LatencyRegistry = latency_registry):
+        """
+        Initialize the router.
+
+        Args:
+            client: OpenAI client used for completions
+            tiers: Quality class -> model mapping. Defaults to MODEL_TIERS from settings.
+            registry: Where observed latencies are recorded
+        """
+        self.client = client
+        self.tiers = dict(tiers or MODEL_TIERS)
+        self.registry = registry
+        self._overrides: Dict[str, str] = {}
+
+    def model_for(self, task: str) -> str:
+        """Model currently assigned to a task."""
+        if task in self._overrides:
+            return self._overrides[task]
+        quality_class, _ = TASK_PROFILES.get(task, ("quality", None))
+        return self.tiers[quality_class]
+
+    def set_model(self, task: str, model: str) -> None:
+        """Pin a task to a specific model, e.g. after reviewing latency stats."""
+        self._overrides[task] = model
+
+    def complete(self, task: str, messages: List[Dict[str, str]], **kwargs):
+        """
+        Run a chat completion for a task on its routed model.
+
+        Returns:
+            The raw OpenAI chat completion response
+        """
+        model = self.model_for(task)
+        _, target = TASK_PROFILES.get(task, ("quality", None))
+        started = time.perf_counter()
+        try:
+            with span(task, "model", model=model):
+                response = self.client.chat.completions.create(model=model, messages=messages, **kwargs)
+        except Exception:
+            self.registry.record(model, time.perf_counter() - started, ok=False)
+            raise
+
+        elapsed = time.perf_counter() - started
+        over_target = target is not None and elapsed > target
+        self.registry.record(model, elapsed, over_target=over_target)
+        if over_target:
+            logger.warning("Task %s on %s took %.2fs (target %.0fs)", task, model, elapsed, target)
+        return response
+
+    def describe(self) -> Dict[str, Dict[str, Any]]:
+        """Current task -> model mapping with latency targets."""
+        return {
+            task: {"class": quality_class, "latency_target_s": target, "model": self.model_for(task)}
+            for task, (quality_class, target) in TASK_PROFILES.items()
+        }
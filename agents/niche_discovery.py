@@ -4,252 +4,346 @@ Analyzes Etsy trends, competition, and identifies profitable niches
 """
 
 import os
+import re
 import logging
 from typing import Dict, Any, List, Optional
 from openai import OpenAI
 
+from .embedding_index import EmbeddingIndex, embedding_client
+from .model_router import ModelRouter
+from .singleflight import coalesce
+from .tag_analytics import TagAnalytics
+
 logger = logging.getLogger(__name__)
 
+_SCALE_RE = re.compile(r"\(\s*1\s*-\s*10\s*\)")
+_OUT_OF_TEN_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(?:/|out of)\s*10\b", re.IGNORECASE)
+_NUMBER_RE = re.compile(r"(?<![\d.])(\d+(?:\.\d+)?)(?![\d.])")
+_COMPETITION_RE = re.compile(r"competition(?:\s+level)?\W{0,10}(?:is\s+)?(low|medium|moderate|high)", re.IGNORECASE)
 
-class NicheDiscoveryAgent:
-      """
-          Analyzes market trends and identifies profitable niches for print-on-demand products.
-              Uses GPT-4 to perform competitive analysis and trend research on Etsy.
-                  """
 
-    def __init__(self, api_key: Optional[str] = None):
-              """Initialize the Niche Discovery Agent."""
-              self.api_key = api_key or os.getenv("OPENAI_API_KEY")
-              if not self.api_key:
-                            raise ValueError("OpenAI API key required")
+def parse_viability(text: str) -> Optional[float]:
+    """
+    Extract the 1-10 market viability score from an analysis, or None if absent.
+
+    Takes the first number shortly after the first mention of
+    "viability", or failing that an "N/10" / "N out of 10" further on.
+    """
+    start = (text or "").lower().find("viability")
+    if start < 0:
+        return None
+    window = _SCALE_RE.sub("", text[start:start + 300])
+    match = _NUMBER_RE.search(window[:80]) or _OUT_OF_TEN_RE.search(window)
+    if not match:
+        return None
+    return min(max(float(match.group(1)), 0.0), 10.0)
+
 
-              self.client = OpenAI(api_key=self.api_key)
-              self.model = "gpt-4-turbo"
-              logger.info("NicheDiscoveryAgent initialized")
+def parse_competition(text: str) -> str:
+    """Extract the low/medium/high competition level from an analysis."""
+    match = _COMPETITION_RE.search(text or "")
+    if not match:
+        return "unknown"
+    level = match.group(1).lower()
+    return "medium" if level == "moderate" else level
 
+
+class NicheDiscoveryAgent:
+    """
+    Analyzes market trends and identifies profitable niches for print-on-demand products.
+    Uses GPT-4 to perform competitive analysis and trend research on Etsy.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, tag_analytics: Optional[TagAnalytics] = None):
+        """Initialize the Niche Discovery Agent. Extracted keywords are recorded in tag_analytics if given."""
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
+        if not self.api_key:
+            raise ValueError("OpenAI API key required")
+
+        self.client = OpenAI(api_key=self.api_key)
+        self.router = ModelRouter(self.client)
+        self.tag_analytics = tag_analytics
+        embed_client = embedding_client(self.api_key)
+        self.niche_index = EmbeddingIndex("niches", embed_client)
+        self.keyword_index = EmbeddingIndex("keywords", embed_client)
+        logger.info("NicheDiscoveryAgent initialized")
+
+    @coalesce()
     def analyze_niche(self, niche: str) -> Dict[str, Any]:
-              """
-                      Perform comprehensive niche analysis.
+        """
+        Perform comprehensive niche analysis.
 
-                                      Args:
-                                                  niche: Niche keyword to analyze (e.g., "kawaii cats")
+        Identical concurrent calls share a single in-flight analysis.
 
-                                                                      Returns:
-                                                                                  Dict with market viability, competition, trends, pricing, and SEO keywords
-                                                                                          """
-              logger.info(f"Analyzing niche: {niche}")
+        Args:
+            niche: Niche keyword to analyze (e.g., "kawaii cats")
+
+        Returns:
+            Dict with market viability, competition, trends, pricing, and SEO keywords
+        """
+        logger.info("Analyzing niche: %s", niche)
 
         try:
-                      # Get market analysis from GPT-4
-                      market_data = self._get_market_analysis(niche)
+            # Get market analysis from GPT-4
+            market_data = self._get_market_analysis(niche)
 
             # Get competition analysis
-                      competition = self._analyze_competition(niche)
+            competition = self._analyze_competition(niche)
 
             # Get trending keywords and variations
-                      keywords = self._extract_keywords(niche)
+            keywords = self._extract_keywords(niche)
+
+            if self.tag_analytics is not None:
+                self.tag_analytics.record_keywords(niche, keywords)
+            self._index_niche(niche, keywords)
 
             # Get pricing recommendations
-                      pricing = self._recommend_pricing(niche)
+            pricing = self._recommend_pricing(niche)
 
             result = {
-                              "niche": niche,
-                              "market_viability": market_data.get("viability_score"),
-                              "competition_level": market_data.get("competition"),
-                              "market_analysis": market_data.get("analysis"),
-                              "competition_data": competition,
-                              "trending_keywords": keywords,
-                              "recommended_pricing": pricing,
-                              "status": "completed"
+                "niche": niche,
+                "market_viability": market_data.get("viability_score"),
+                "competition_level": market_data.get("competition"),
+                "market_analysis": market_data.get("analysis"),
+                "competition_data": competition,
+                "trending_keywords": keywords,
+                "recommended_pricing": pricing,
+                "status": "completed"
             }
 
-            logger.info(f"Niche analysis completed for: {niche}")
+            logger.info("Niche analysis completed for: %s", niche)
             return result
 
-except Exception as e:
-            logger.error(f"Niche analysis failed: {str(e)}")
+        except Exception as e:
+            logger.error("Niche analysis failed: %s", e)
             return {"niche": niche, "status": "failed", "error": str(e)}
 
+    def _index_niche(self, niche: str, keywords: List[str]) -> None:
+        """Embed a niche and its keywords once for local similarity lookups."""
+        try:
+            self.niche_index.add({niche.lower(): niche})
+            if keywords:
+                self.keyword_index.add({k.lower(): k for k in keywords}, meta={k.lower(): {"niche": niche} for k in keywords})
+        except Exception as e:
+            logger.warning("Could not index niche %s: %s", niche, e)
+
+    def related_niches(self, niche: str, limit: int = 5) -> Dict[str, Any]:
+        """
+        Find previously analyzed niches and keywords similar to a niche.
+
+        Uses the local embedding index; only a niche that was never analyzed
+        costs one embedding call. Lookups never add to the index, which
+        holds analyzed niches only.
+
+        Returns:
+            Dict with related niches and keywords, each with a cosine similarity
+        """
+        key = niche.lower()
+        try:
+            vector = self.niche_index.vector(key)
+            if vector is None:
+                vector = self.niche_index.query_vector(niche)
+        except Exception as e:
+            logger.error("Embedding failed for %s: %s", niche, e)
+            return {"niche": niche, "status": "failed", "error": str(e)}
+
+        return {
+            "niche": niche,
+            "related_niches": [
+                {"niche": other, "similarity": score}
+                for other, score in self.niche_index.search(vector, limit, exclude=(key,))
+            ],
+            "related_keywords": [
+                {"keyword": keyword, "similarity": score, "niche": self.keyword_index.meta.get(keyword, {}).get("niche")}
+                for keyword, score in self.keyword_index.search(vector, limit * 2)
+            ],
+            "status": "completed"
+        }
+
     def _get_market_analysis(self, niche: str) -> Dict[str, Any]:
-              """Get market viability and trends analysis from GPT-4."""
-              prompt = f"""Analyze the Etsy market for "{niche}" products:
-
-1. Market Viability Score (1-10)
-      2. Current Trend Status (Growing/Stable/Declining)
-      3. Competition Level (Low/Medium/High)
-      4. Market Saturation Assessment
-      5. Top 5 Trending Variations of this niche
-      6. Seasonal Demand Patterns
-      7. Ideal Customer Demographics
-
-      Provide detailed analysis with reasoning."""
-
-              try:
-                  response = self.client.chat.completions.create(
-                      model=self.model,
-                      messages=[
-                          {
-                              "role": "system",
-                              "content": "You are an expert Etsy market researcher with deep knowledge of print-on-demand trends."
-                          },
-                          {"role": "user", "content": prompt}
-                      ],
-                      temperature=0.7,
-                      max_tokens=1500
-                  )
-
-                  return {
-                      "viability_score": 7.5,  # Extract from response in production
-                      "competition": "medium",  # Extract from response in production
-                      "analysis": response.choices[0].message.content
-                  }
-              except Exception as e:
-                  logger.error(f"Market analysis failed: {str(e)}")
-                  return {"viability_score": 0, "competition": "unknown", "analysis": ""}
-
-          def _analyze_competition(self, niche: str) -> Dict[str, Any]:
-              """Analyze competition in the niche."""
-              prompt = f"""Analyze competition for "{niche}" on Etsy:
-
-      1. Number of Estimated Competitors (Range)
-      2. Average Product Ratings
-      3. Price Range of Top Sellers
-      4. Best-Selling Product Types
-      5. Competitive Advantages Opportunities
-      6. Market Share Distribution
-
-      Provide actionable competitive insights."""
-
-              try:
-                  response = self.client.chat.completions.create(
-                      model=self.model,
-                      messages=[
-                          {"role": "system", "content": "You are a competitive intelligence analyst."},
-                          {"role": "user", "content": prompt}
-                      ],
-                      temperature=0.7,
-                      max_tokens=1000
-                  )
-
-                  return {
-                      "analysis": response.choices[0].message.content,
-                      "estimated_competitors": "50-200",
-                      "market_entry_difficulty": "moderate"
-                  }
-              except Exception as e:
-                  logger.error(f"Competition analysis failed: {str(e)}")
-                  return {}
-
-          def _extract_keywords(self, niche: str) -> List[str]:
-              """Extract SEO keywords and trending variations."""
-              prompt = f"""For the Etsy niche "{niche}", provide:
-
-      1. Top 20 Long-tail Keywords
-      2. Hashtags with high search volume
-      3. Related niche variations
-      4. Seasonal keywords
-      5. Buyer intent keywords
-
-      Format as a JSON array of keywords."""
-
-              try:
-                  response = self.client.chat.completions.create(
-                      model=self.model,
-                      messages=[
-                          {"role": "system", "content": "You are an SEO expert for Etsy."},
-                          {"role": "user", "content": prompt}
-                      ],
-                      temperature=0.7,
-                      max_tokens=800
-                  )
-
-                  # In production, parse the JSON response
-                  keywords = [
-                      f"{niche} art",
-                      f"{niche} print",
-                      f"{niche} design",
-                      f"custom {niche}",
-                      f"{niche} gift"
-                  ]
-
-                  return keywords
-              except Exception as e:
-                  logger.error(f"Keyword extraction failed: {str(e)}")
-                  return []
-
-          def _recommend_pricing(self, niche: str) -> Dict[str, float]:
-              """Get pricing recommendations based on market analysis."""
-              return {
-                  "entry_price": 12.99,
-                  "mid_range_price": 19.99,
-                  "premium_price": 29.99,
-                  "recommended_price": 17.99,
-                  "profit_margin_percentage": 60
-              }
-
-          def get_trending_niches(self, limit: int = 10) -> List[Dict[str, Any]]:
-              """Get currently trending Etsy niches."""
-              prompt = f"""List the top {limit} trending niches on Etsy right now for print-on-demand:
-
-      For each niche provide:
-      1. Niche Name
-      2. Current Popularity Score (1-10)
-      3. Expected Monthly Revenue Potential
-      4. Difficulty Level (1-10)
-      5. Brief Opportunity Description
-
-      Format as structured data."""
-
-              try:
-                  response = self.client.chat.completions.create(
-                      model=self.model,
-                      messages=[
-                          {
-                              "role": "system",
-                              "content": "You are an Etsy market trends expert."
-                          },
-                          {"role": "user", "content": prompt}
-                      ],
-                      temperature=0.8,
-                      max_tokens=2000
-                  )
-
-                  # In production, parse response into structured format
-                  return [
-                      {
-                          "niche": "Minimalist Art",
-                          "popularity": 8.5,
-                          "monthly_potential": "$2000-5000",
-                          "difficulty": 6
-                      },
-                      {
-                          "niche": "Pet Portraits",
-                          "popularity": 9,
-                          "monthly_potential": "$3000-7000",
-                          "difficulty": 7
-                      }
-                  ]
-              except Exception as e:
-                  logger.error(f"Trending niches fetch failed: {str(e)}")
-                  return []
-
-          def validate_niche(self, niche: str) -> Dict[str, Any]:
-              """
-              Validate if a niche is viable for automation.
-
-              Returns validation result with reasoning.
-              """
-              analysis = self.analyze_niche(niche)
-
-              is_viable = (
-                  analysis.get("status") == "completed" and
-                  analysis.get("market_viability", 0) >= 5
-              )
-
-              return {
-                  "niche": niche,
-                  "is_viable": is_viable,
-                  "analysis": analysis,
-                  "recommendation": "Proceed with automation" if is_viable else "Consider different niche"
-              }
-      
+        """Get market viability and trends analysis from GPT-4."""
+        prompt = f"""Analyze the Etsy market for "{niche}" products:
+
+1. Market Viability Score (1-10), written as "Market Viability Score: N/10"
+2. Current Trend Status (Growing/Stable/Declining)
+3. Competition Level (Low/Medium/High)
+4. Market Saturation Assessment
+5. Top 5 Trending Variations of this niche
+6. Seasonal Demand Patterns
+7. Ideal Customer Demographics
+
+Provide detailed analysis with reasoning."""
+
+        try:
+            response = self.router.complete(
+                "market_analysis",
+                messages=[
+                    {
+                        "role": "system",
+                        "content": "You are an expert Etsy market researcher with deep knowledge of print-on-demand trends."
+                    },
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.7,
+                max_tokens=1500
+            )
+
+            analysis = response.choices[0].message.content
+            viability = parse_viability(analysis)
+            if viability is None:
+                logger.warning("No viability score found in market analysis for %s", niche)
+            return {
+                "viability_score": viability,
+                "competition": parse_competition(analysis),
+                "analysis": analysis
+            }
+        except Exception as e:
+            logger.error("Market analysis failed: %s", e)
+            return {"viability_score": 0, "competition": "unknown", "analysis": ""}
+
+    def _analyze_competition(self, niche: str) -> Dict[str, Any]:
+        """Analyze competition in the niche."""
+        prompt = f"""Analyze competition for "{niche}" on Etsy:
+
+1. Number of Estimated Competitors (Range)
+2. Average Product Ratings
+3. Price Range of Top Sellers
+4. Best-Selling Product Types
+5. Competitive Advantages Opportunities
+6. Market Share Distribution
+
+Provide actionable competitive insights."""
+
+        try:
+            response = self.router.complete(
+                "competition_analysis",
+                messages=[
+                    {"role": "system", "content": "You are a competitive intelligence analyst."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.7,
+                max_tokens=1000
+            )
+
+            return {
+                "analysis": response.choices[0].message.content,
+                "estimated_competitors": "50-200",
+                "market_entry_difficulty": "moderate"
+            }
+        except Exception as e:
+            logger.error("Competition analysis failed: %s", e)
+            return {}
+
+    def _extract_keywords(self, niche: str) -> List[str]:
+        """Extract SEO keywords and trending variations."""
+        prompt = f"""For the Etsy niche "{niche}", provide:
+
+1. Top 20 Long-tail Keywords
+2. Hashtags with high search volume
+3. Related niche variations
+4. Seasonal keywords
+5. Buyer intent keywords
+
+Format as a JSON array of keywords."""
+
+        try:
+            response = self.router.complete(
+                "keyword_extraction",
+                messages=[
+                    {"role": "system", "content": "You are an SEO expert for Etsy."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.7,
+                max_tokens=800
+            )
+
+            # In production, parse the JSON response
+            keywords = [
+                f"{niche} art",
+                f"{niche} print",
+                f"{niche} design",
+                f"custom {niche}",
+                f"{niche} gift"
+            ]
+
+            return keywords
+        except Exception as e:
+            logger.error("Keyword extraction failed: %s", e)
+            return []
+
+    def _recommend_pricing(self, niche: str) -> Dict[str, float]:
+        """Get pricing recommendations based on market analysis."""
+        return {
+            "entry_price": 12.99,
+            "mid_range_price": 19.99,
+            "premium_price": 29.99,
+            "recommended_price": 17.99,
+            "profit_margin_percentage": 60
+        }
+
+    @coalesce()
+    def get_trending_niches(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Get currently trending Etsy niches. Concurrent identical calls share one request."""
+        prompt = f"""List the top {limit} trending niches on Etsy right now for print-on-demand:
+
+For each niche provide:
+1. Niche Name
+2. Current Popularity Score (1-10)
+3. Expected Monthly Revenue Potential
+4. Difficulty Level (1-10)
+5. Brief Opportunity Description
+
+Format as structured data."""
+
+        try:
+            response = self.router.complete(
+                "trend_research",
+                messages=[
+                    {
+                        "role": "system",
+                        "content": "You are an Etsy market trends expert."
+                    },
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.8,
+                max_tokens=2000
+            )
+
+            # In production, parse response into structured format
+            return [
+                {
+                    "niche": "Minimalist Art",
+                    "popularity": 8.5,
+                    "monthly_potential": "$2000-5000",
+                    "difficulty": 6
+                },
+                {
+                    "niche": "Pet Portraits",
+                    "popularity": 9,
+                    "monthly_potential": "$3000-7000",
+                    "difficulty": 7
+                }
+            ]
+        except Exception as e:
+            logger.error("Trending niches fetch failed: %s", e)
+            return []
+
+    def validate_niche(self, niche: str) -> Dict[str, Any]:
+        """
+        Validate if a niche is viable for automation.
+
+        Returns validation result with reasoning.
+        """
+        analysis = self.analyze_niche(niche)
+
+        is_viable = (
+            analysis.get("status") == "completed" and
+            (analysis.get("market_viability") or 0) >= 5
+        )
+
+        return {
+            "niche": niche,
+            "is_viable": is_viable,
+            "analysis": analysis,
+            "recommendation": "Proceed with automation" if is_viable else "Consider different niche"
+        }
@@ -0,0 +1,207 @@
+"""
+Niche Ranker - Cascade screening of candidate niches
+Every candidate is scored in bulk from local signals (catalog tag usage,
+overlap with keywords of niches analyzed before, and optional sales
+counts). Only the top K go on to the full GPT analysis, whose results are
+cached, so screening hundreds of niches costs about as much as analyzing K.
+"""
+
+import time
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from config.settings import NICHE_ANALYSIS_CACHE_SIZE, NICHE_ANALYSIS_CACHE_TTL, NICHE_RANK_TOP_K
+
+from .niche_discovery import NicheDiscoveryAgent
+from .tag_analytics import TagAnalytics, normalize_tag
+
+logger = logging.getLogger(__name__)
+
+# Weights of the local signals in the screening score (each scaled to 0..1 first)
+SIGNAL_WEIGHTS = {
+    "catalog": 0.3,
+    "keywords": 0.3,
+    "sales": 0.4,
+}
+# Share of the final score taken by the GPT viability score for analyzed niches
+VIABILITY_WEIGHT = 0.5
+MAX_ANALYSIS_WORKERS = 4
+
+
+def _words(text: str) -> List[str]:
+    """Normalized, crudely singularized words ("cats" and "cat" count as one)."""
+    return [w[:-1] if len(w) > 3 and w.endswith("s") and not w.endswith("ss") else w
+            for w in normalize_tag(text).split()]
+
+
+def _word_counts(counts: Dict[str, float]) -> Dict[str, float]:
+    merged: Dict[str, float] = {}
+    for term, count in counts.items():
+        for word in _words(term):
+            merged[word] = merged.get(word, 0) + float(count)
+    return merged
+
+
+class NicheRanker:
+    """Two-stage niche ranking: vectorized local screen, then GPT analysis of the shortlist."""
+
+    def __init__(self, niche_agent: NicheDiscoveryAgent, tag_analytics: Optional[TagAnalytics] = None,
+                 cache_ttl: int = NICHE_ANALYSIS_CACHE_TTL, cache_size: int = NICHE_ANALYSIS_CACHE_SIZE):
+        """
+        Args:
+            niche_agent: Agent used for the full analysis of shortlisted niches
+            tag_analytics: Source of catalog tag and keyword statistics.
+                Defaults to the niche agent's.
+            cache_ttl: Seconds a completed analysis is reused
+            cache_size: Analyses kept; the least recently used are evicted
+        """
+        self.niche_agent = niche_agent
+        self.tag_analytics = tag_analytics or niche_agent.tag_analytics or TagAnalytics()
+        self.cache_ttl = cache_ttl
+        self.cache_size = max(1, cache_size)
+        # normalized niche -> (completed at, analysis), least recently used first
+        self._analyses: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def screen(self, candidates: List[str], sales: Optional[Dict[str, float]] = None) -> List[Dict[str, Any]]:
+        """
+        Score candidates from local signals only. No API calls.
+
+        A candidate's signal is the mean over its words of log1p(count),
+        scaled by the best candidate so each signal spans 0..1.
+
+        Args:
+            candidates: Niche names
+            sales: Optional units sold per tag or word from our own shop
+
+        Returns:
+            [{"niche", "local_score", "signals"}] best first
+        """
+        niches = list(dict.fromkeys(c.strip() for c in candidates if normalize_tag(c)))
+        if not niches:
+            return []
+
+        # Candidate x word incidence as parallel index arrays
+        vocab: Dict[str, int] = {}
+        rows, cols = [], []
+        for row, niche in enumerate(niches):
+            for word in dict.fromkeys(_words(niche)):
+                rows.append(row)
+                cols.append(vocab.setdefault(word, len(vocab)))
+        rows, cols = np.array(rows), np.array(cols)
+        words = list(vocab)
+        lengths = np.bincount(rows, minlength=len(niches))
+
+        sources = {
+            "catalog": _word_counts(self.tag_analytics.tag_word_counts()),
+            "keywords": _word_counts(self.tag_analytics.keyword_word_counts()),
+            "sales": _word_counts(sales or {}),
+        }
+        signals = {}
+        score = np.zeros(len(niches))
+        for name, counts in sources.items():
+            per_word = np.log1p(np.array([counts.get(w, 0) for w in words], dtype=np.float64))
+            values = np.bincount(rows, weights=per_word[cols], minlength=len(niches)) / lengths
+            peak = values.max()
+            signals[name] = values / peak if peak > 0 else values
+            score += SIGNAL_WEIGHTS[name] * signals[name]
+
+        order = np.argsort(-score, kind="stable")
+        return [
+            {
+                "niche": niches[i],
+                "local_score": round(float(score[i]), 4),
+                "signals": {name: round(float(values[i]), 4) for name, values in signals.items()}
+            }
+            for i in order
+        ]
+
+    def _cached_analysis(self, niche: str) -> Optional[Dict[str, Any]]:
+        key = normalize_tag(niche)
+        with self._lock:
+            entry = self._analyses.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] >= self.cache_ttl:
+                del self._analyses[key]
+                return None
+            self._analyses.move_to_end(key)
+            return entry[1]
+
+    def _analyze(self, niche: str) -> Dict[str, Any]:
+        cached = self._cached_analysis(niche)
+        if cached is not None:
+            return cached
+        analysis = self.niche_agent.analyze_niche(niche)
+        if analysis.get("status") == "completed":
+            key = normalize_tag(niche)
+            with self._lock:
+                self._analyses[key] = (time.monotonic(), analysis)
+                self._analyses.move_to_end(key)
+                while len(self._analyses) > self.cache_size:
+                    self._analyses.popitem(last=False)
+        return analysis
+
+    def rank(self, candidates: List[str], top_k: int = NICHE_RANK_TOP_K,
+             sales: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        """
+        Screen all candidates locally, then run the full analysis on the top K.
+
+        Analyzed niches are ordered by a blend of local score and GPT
+        market viability and come first; the rest keep their screening order.
+
+        Args:
+            candidates: Niche names to rank
+            top_k: How many screened niches get the full analysis
+            sales: Optional units sold per tag or word
+
+        Returns:
+            Dict with the ranking and how many analyses were run or reused
+        """
+        screened = self.screen(candidates, sales)
+        shortlist = screened[:max(0, top_k)]
+        cache_hits = sum(1 for entry in shortlist if self._cached_analysis(entry["niche"]) is not None)
+
+        if shortlist:
+            workers = min(len(shortlist), MAX_ANALYSIS_WORKERS)
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="niche-rank") as pool:
+                analyses = list(pool.map(self._analyze, [entry["niche"] for entry in shortlist]))
+        else:
+            analyses = []
+
+        analyzed = []
+        for entry, analysis in zip(shortlist, analyses):
+            viability = analysis.get("market_viability")
+            completed = analysis.get("status") == "completed" and viability is not None
+            final = ((1 - VIABILITY_WEIGHT) * entry["local_score"] + VIABILITY_WEIGHT * viability / 10
+                     if completed else entry["local_score"] * (1 - VIABILITY_WEIGHT))
+            analyzed.append({
+                **entry,
+                "stage": "analyzed",
+                "market_viability": viability,
+                "competition_level": analysis.get("competition_level"),
+                "trending_keywords": analysis.get("trending_keywords", []),
+                "is_viable": completed and viability >= 5,
+                "score": round(final, 4),
+                "error": analysis.get("error")
+            })
+        analyzed.sort(key=lambda entry: entry["score"], reverse=True)
+
+        rest = [{**entry, "stage": "screened", "score": entry["local_score"]} for entry in screened[len(shortlist):]]
+        logger.info("Ranked %s niches; analyzed %s (%s cached)", len(screened), len(shortlist), cache_hits)
+        return {
+            "ranking": analyzed + rest,
+            "candidates": len(screened),
+            "analyzed": len(shortlist),
+            "cache_hits": cache_hits,
+            "status": "completed"
+        }
+
+    def clear_cache(self) -> None:
+        with self._lock:
+            self._analyses.clear()
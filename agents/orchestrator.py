@@ -1,216 +1,540 @@
 """
 Orchestrator Agent - Main coordinator for all automation workflows
-Uses OpenAI Agents SDK to coordinate niche discovery, art generation, 
+Uses OpenAI Agents SDK to coordinate niche discovery, art generation,
 listing creation, and TikTok distribution.
 """
 
 import os
-from typing import Optional, Dict, Any
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, Callable, List
 from datetime import datetime
 import logging
 
 from openai import OpenAI
 
+from config.settings import HISTORY_HOT_SIZE
+
+from .checkpoints import CheckpointStore
+from .events import publish
+from .history_store import HistoryStore
+from .model_router import ModelRouter
+from .records import WorkflowResult
+from .singleflight import coalesce
+from .tracing import span, trace_context
+from .versioning import VersionCounter
+from .workflow_run import WorkflowRun
+
 logger = logging.getLogger(__name__)
 
+# Workflow phases in execution order; names double as checkpoint keys
+WORKFLOW_PHASES = ["niche_analysis", "generated_art", "listings", "tiktok_schedule"]
+# Event published for each item a phase produces
+ITEM_EVENTS = {"generated_art": "image.generated", "listings": "listing.created", "tiktok_schedule": "post.scheduled"}
+
+
+class PhaseFailed(RuntimeError):
+    """A phase returned status "failed"; the workflow stops and stays resumable."""
+
 
 class OrchestratorAgent:
-      """
-          Main orchestrator that coordinates all agents in the system.
-              Manages the workflow: Niche Research -> Art Generation -> Listing Creation -> Content Distribution
-                  """
-
-    def __init__(self, api_key: Optional[str] = None):
-              """
-                      Initialize the Orchestrator Agent.
-
-                                      Args:
-                                                  api_key: OpenAI API key. If None, uses OPENAI_API_KEY environment variable.
-                                                          """
-              self.api_key = api_key or os.getenv("OPENAI_API_KEY")
-              if not self.api_key:
-                            raise ValueError("OpenAI API key not provided. Set OPENAI_API_KEY environment variable.")
-
-              self.client = OpenAI(api_key=self.api_key)
-              self.model = "gpt-4-turbo"
-              self.workflow_state = {}
-              self.execution_history = []
+    """
+    Main orchestrator that coordinates all agents in the system.
+    Manages the workflow: Niche Research -> Art Generation -> Listing Creation -> Content Distribution
+    """
+
+    def __init__(self, api_key: Optional[str] = None, checkpoint_store: Optional[CheckpointStore] = None,
+                 max_concurrent_workflows: Optional[int] = None):
+        """
+        Initialize the Orchestrator Agent.
+
+        Args:
+            api_key: OpenAI API key. If None, uses OPENAI_API_KEY environment variable.
+            checkpoint_store: Store for per-phase workflow checkpoints. Defaults to CHECKPOINT_DIR.
+            max_concurrent_workflows: Workflows run at once by submit_workflow.
+                Defaults to MAX_CONCURRENT_WORKFLOWS from settings.
+        """
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
+        if not self.api_key:
+            raise ValueError("OpenAI API key not provided. Set OPENAI_API_KEY environment variable.")
+
+        if max_concurrent_workflows is None:
+            from config.settings import MAX_CONCURRENT_WORKFLOWS
+            max_concurrent_workflows = MAX_CONCURRENT_WORKFLOWS
+
+        self.client = OpenAI(api_key=self.api_key)
+        self.router = ModelRouter(self.client)
+        self.version = VersionCounter()
+        self.workflows: Dict[str, WorkflowRun] = {}
+        self.execution_history = HistoryStore("execution_history", key="workflow_id", record_type=WorkflowResult)
+        self.checkpoints = checkpoint_store or CheckpointStore()
+        self.max_concurrent_workflows = max_concurrent_workflows
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent_workflows,
+                                            thread_name_prefix="workflow")
+        self._lock = threading.Lock()
+        self._latest_workflow_id: Optional[str] = None
 
         logger.info("OrchestratorAgent initialized")
 
-    def run_workflow(self, niche: str, num_images: int = 50, num_listings: int = 10) -> Dict[str, Any]:
-              """
-                      Run complete automation workflow for a given niche.
+    @property
+    def workflow_state(self) -> Dict[str, Any]:
+        """Phase outputs of the most recently started workflow."""
+        return self.get_current_state()
+
+    def run_workflow(self, niche: str, num_images: int = 50, num_listings: int = 10,
+                     workflow_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Run complete automation workflow for a given niche.
+
+        Every phase is checkpointed as it finishes. If a workflow_id with an
+        existing checkpoint is passed, completed phases and items are reused.
+
+        Args:
+            niche: Target niche for automation (e.g., "kawaii cats", "minimalist furniture")
+            num_images: Number of images to generate (default: 50)
+            num_listings: Number of Etsy listings to create (default: 10)
+            workflow_id: Optional id to run under (default: a new unique id)
+
+        Returns:
+            Dict containing workflow results and execution details
+        """
+        try:
+            run = self._register(niche, num_images, num_listings, workflow_id)
+        except ValueError as e:
+            return {"workflow_id": workflow_id, "status": "rejected", "error": str(e)}
+        return self._execute_workflow(run, self._prepare_checkpoint(run))
+
+    def submit_workflow(self, niche: str, num_images: int = 50, num_listings: int = 10,
+                        workflow_id: Optional[str] = None) -> WorkflowRun:
+        """
+        Queue a workflow on the bounded executor and return immediately.
+
+        At most max_concurrent_workflows run at once; the rest wait as
+        "pending". Progress can be followed with get_workflow_status().
+
+        Raises:
+            ValueError: If a workflow with the same id is already active
+        """
+        run = self._register(niche, num_images, num_listings, workflow_id)
+        self._executor.submit(self._execute_submitted, run)
+        logger.info("Workflow %s queued for niche: %s", run.workflow_id, niche)
+        return run
+
+    def resume_workflow(self, workflow_id: str) -> Dict[str, Any]:
+        """
+        Resume a workflow from its last checkpoint.
+
+        Completed phases are skipped and completed items within the
+        interrupted phase are reused, so only unfinished work is repeated.
+
+        Args:
+            workflow_id: Id of a previously started workflow
+
+        Returns:
+            Dict containing workflow results and execution details
+        """
+        checkpoint = self.checkpoints.load(workflow_id)
+        if checkpoint is None:
+            return {"error": f"No checkpoint found for workflow {workflow_id}"}
+
+        phases = checkpoint["phases"]
+        if (checkpoint["status"] == "completed" and "result" in phases
+                and all(phase in phases for phase in WORKFLOW_PHASES)):
+            logger.info("Workflow %s already completed, returning checkpointed result", workflow_id)
+            return checkpoint["phases"]["result"]
+
+        params = checkpoint["params"]
+        try:
+            run = self._register(params["niche"], params.get("num_images", 50),
+                                 params.get("num_listings", 10), workflow_id)
+        except ValueError as e:
+            return {"workflow_id": workflow_id, "status": "rejected", "error": str(e)}
+
+        logger.info("Resuming workflow %s (completed phases: %s)", workflow_id, list(checkpoint['phases']))
+        return self._execute_workflow(run, checkpoint)
+
+    def pending_count(self) -> int:
+        """Submitted workflows still waiting for a free executor slot."""
+        with self._lock:
+            return sum(1 for run in self.workflows.values() if run.status == "pending")
+
+    def _register(self, niche: str, num_images: int, num_listings: int,
+                  workflow_id: Optional[str]) -> WorkflowRun:
+        """Create and register a WorkflowRun, refusing ids that are already active."""
+        with self._lock:
+            existing = self.workflows.get(workflow_id) if workflow_id else None
+            if existing and existing.is_active:
+                raise ValueError(f"Workflow {workflow_id} is already {existing.status}")
+
+            run = WorkflowRun(niche, num_images, num_listings, workflow_id, on_change=self.version.bump)
+            self.workflows.pop(run.workflow_id, None)
+            self.workflows[run.workflow_id] = run
+            self._latest_workflow_id = run.workflow_id
+            self._prune_workflows()
+        self.version.bump()
+        publish("workflow.queued", run.workflow_id, niche=niche, num_images=num_images, num_listings=num_listings)
+        return run
+
+    def _prune_workflows(self) -> None:
+        """
+        Forget the oldest finished runs once over HISTORY_HOT_SIZE. Caller holds the lock.
+
+        Their results stay available from execution_history and checkpoints.
+        """
+        excess = len(self.workflows) - HISTORY_HOT_SIZE
+        if excess <= 0:
+            return
+        finished = [wid for wid, run in self.workflows.items() if not run.is_active]
+        for workflow_id in finished[:excess]:
+            del self.workflows[workflow_id]
+
+    def _prepare_checkpoint(self, run: WorkflowRun) -> Optional[Dict[str, Any]]:
+        """Load an existing checkpoint for the run or record a fresh start."""
+        checkpoint = self.checkpoints.load(run.workflow_id)
+        if checkpoint is None:
+            self.checkpoints.start(run.workflow_id, {
+                "niche": run.niche,
+                "num_images": run.num_images,
+                "num_listings": run.num_listings
+            })
+        return checkpoint
+
+    def _execute_submitted(self, run: WorkflowRun) -> Dict[str, Any]:
+        """Executor entry point; exceptions are captured on the run."""
+        try:
+            return self._execute_workflow(run, self._prepare_checkpoint(run))
+        except Exception as e:
+            logger.error("Workflow %s crashed: %s", run.workflow_id, e)
+            result = {"workflow_id": run.workflow_id, "status": "failed", "error": str(e),
+                      "timestamp": datetime.now().isoformat()}
+            run.finish(result)
+            return result
+
+    def _execute_workflow(self, run: WorkflowRun, checkpoint: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Run a workflow with every span it records attributed to its workflow id."""
+        with trace_context(run.workflow_id), span("workflow", "workflow", niche=run.niche):
+            return self._execute_phases(run, checkpoint)
 
-                                      Args:
-                                                  niche: Target niche for automation (e.g., "kawaii cats", "minimalist furniture")
-                                                              num_images: Number of images to generate (default: 50)
-                                                                          num_listings: Number of Etsy listings to create (default: 10)
+    def _execute_phases(self, run: WorkflowRun, checkpoint: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Run all workflow phases, skipping any already present in the checkpoint."""
+        workflow_id = run.workflow_id
+        niche = run.niche
+        num_images = run.num_images
+        num_listings = run.num_listings
+        completed = checkpoint["phases"] if checkpoint else {}
+        items = checkpoint["items"] if checkpoint else {}
+        skipped_phases = [phase for phase in WORKFLOW_PHASES if phase in completed]
 
-                                                                                              Returns:
-                                                                                                          Dict containing workflow results and execution details
-                                                                                                                  """
-              workflow_id = f"workflow_{datetime.now().isoformat()}"
-              logger.info(f"Starting workflow {workflow_id} for niche: {niche}")
+        logger.info("Starting workflow %s for niche: %s", workflow_id, niche)
+        run.mark_running()
+        self.checkpoints.set_status(workflow_id, "running")
 
         try:
-                      # Phase 1: Niche Research
-                      logger.info("Phase 1: Analyzing niche market...")
-                      niche_analysis = self._analyze_niche(niche)
-                      self.workflow_state["niche_analysis"] = niche_analysis
+            # Phase 1: Niche Research
+            logger.info("Phase 1: Analyzing niche market...")
+            niche_analysis = self._run_phase(
+                run, "niche_analysis", completed,
+                lambda: self._analyze_niche(niche)
+            )
 
-            # Phase 2: Art Generation  
-                      logger.info(f"Phase 2: Generating {num_images} unique art variations...")
-                      art_generation = self._generate_art(niche, num_images)
-                      self.workflow_state["generated_art"] = art_generation
+            # Phase 2: Art Generation
+            logger.info("Phase 2: Generating %s unique art variations...", num_images)
+            art_generation = self._run_phase(
+                run, "generated_art", completed,
+                lambda: self._generate_art(
+                    niche, num_images,
+                    completed_items=items.get("generated_art"),
+                    on_item=self._item_recorder(workflow_id, "generated_art")
+                )
+            )
 
             # Phase 3: Listing Creation
-                      logger.info(f"Phase 3: Creating {num_listings} SEO-optimized listings...")
-                      listings = self._create_listings(niche, num_listings, art_generation)
-                      self.workflow_state["listings"] = listings
+            logger.info("Phase 3: Creating %s SEO-optimized listings...", num_listings)
+            listings = self._run_phase(
+                run, "listings", completed,
+                lambda: self._create_listings(
+                    niche, num_listings, art_generation,
+                    completed_items=items.get("listings"),
+                    on_item=self._item_recorder(workflow_id, "listings")
+                )
+            )
 
             # Phase 4: Content Distribution
-                      logger.info("Phase 4: Scheduling TikTok content...")
-                      tiktok_schedule = self._schedule_tiktok_content(niche, num_listings)
-                      self.workflow_state["tiktok_schedule"] = tiktok_schedule
+            logger.info("Phase 4: Scheduling TikTok content...")
+            tiktok_schedule = self._run_phase(
+                run, "tiktok_schedule", completed,
+                lambda: self._schedule_tiktok_content(
+                    niche, num_listings,
+                    completed_items=items.get("tiktok_schedule"),
+                    on_item=self._item_recorder(workflow_id, "tiktok_schedule")
+                )
+            )
 
+            result = WorkflowResult(
+                workflow_id=workflow_id,
+                status="completed",
+                niche=niche,
+                niche_analysis=niche_analysis,
+                images_generated=len(art_generation.get("images", [])),
+                listings_created=len(listings.get("listings", [])),
+                tiktok_posts_scheduled=len(tiktok_schedule.get("posts", [])),
+                resumed=checkpoint is not None,
+                skipped_phases=skipped_phases,
+                timestamp=datetime.now().isoformat()
+            )
+
+            self.checkpoints.save_phase(workflow_id, "result", result)
+            self.checkpoints.set_status(workflow_id, "completed")
+            with self._lock:
+                self.execution_history.append(result)
+            run.finish(result)
+            logger.info("Workflow %s completed successfully", workflow_id)
+            return result
+
+        except Exception as e:
+            logger.error("Workflow %s failed: %s", workflow_id, e)
+            self.checkpoints.set_status(workflow_id, "failed", error=str(e))
+            saved = self.checkpoints.load(workflow_id) or {"phases": {}}
             result = {
-                              "workflow_id": workflow_id,
-                              "status": "completed",
-                              "niche": niche,
-                              "niche_analysis": niche_analysis,
-                              "images_generated": len(art_generation.get("images", [])),
-                              "listings_created": len(listings.get("listings", [])),
-                              "tiktok_posts_scheduled": len(tiktok_schedule.get("posts", [])),
-                              "timestamp": datetime.now().isoformat()
+                "workflow_id": workflow_id,
+                "status": "failed",
+                "error": str(e),
+                "resumable": True,
+                "completed_phases": [phase for phase in WORKFLOW_PHASES if phase in saved["phases"]],
+                "timestamp": datetime.now().isoformat()
             }
-
-            self.execution_history.append(result)
-            logger.info(f"Workflow {workflow_id} completed successfully")
+            run.finish(result)
             return result
 
-except Exception as e:
-            logger.error(f"Workflow {workflow_id} failed: {str(e)}")
+    def _run_phase(self, run: WorkflowRun, phase: str, completed: Dict[str, Any],
+                   execute: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Run a single phase unless its output is already checkpointed.
+
+        Phase outputs with status "failed" are not checkpointed, and the
+        workflow stops there so that a resume retries the phase.
+
+        Raises:
+            PhaseFailed: If the phase output has status "failed"
+        """
+        run.enter_phase(phase)
+        if phase in completed:
+            logger.info("Skipping phase %s: restored from checkpoint", phase)
+            output = completed[phase]
+        else:
+            with span(phase, "phase"):
+                output = execute()
+            if output.get("status") != "failed":
+                self.checkpoints.save_phase(run.workflow_id, phase, output)
+
+        run.record_phase(phase, output)
+        if output.get("status") == "failed":
+            raise PhaseFailed(f"Phase {phase} failed: {output.get('error', 'unknown error')}")
+        return output
+
+    def _item_recorder(self, workflow_id: str, phase: str) -> Callable[[str, Dict[str, Any]], None]:
+        """Build a callback that checkpoints individual items of a phase and announces them."""
+        def record(key: str, data: Dict[str, Any]) -> None:
+            self.checkpoints.save_item(workflow_id, phase, key, data)
+            publish(ITEM_EVENTS[phase], workflow_id, key=key, item_id=data.get("id"))
+        return record
+
+    @coalesce()
+    def _analyze_niche(self, niche: str) -> Dict[str, Any]:
+        """
+        Use GPT-4 to analyze niche market viability and competition.
+        Delegates to NicheDiscoveryAgent in production.
+        Concurrent workflows for the same niche share one analysis call.
+        """
+        prompt = f"""Analyze the "{niche}" niche for Etsy print-on-demand products:
+1. Market viability (1-10)
+2. Competition level (low/medium/high)
+3. Top 5 trending variations
+4. Recommended price range
+5. Key keywords for SEO
+
+Provide structured analysis."""
+
+        try:
+            response = self.router.complete(
+                "niche_analysis",
+                messages=[
+                    {"role": "system", "content": "You are a market research expert for Etsy print-on-demand products."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.7,
+                max_tokens=1000
+            )
+
             return {
-                              "workflow_id": workflow_id,
-                              "status": "failed",
-                              "error": str(e),
-                              "timestamp": datetime.now().isoformat()
+                "niche": niche,
+                "analysis": response.choices[0].message.content,
+                "status": "completed"
             }
+        except Exception as e:
+            logger.error("Niche analysis failed: %s", e)
+            return {"niche": niche, "status": "failed", "error": str(e)}
 
-    def _analyze_niche(self, niche: str) -> Dict[str, Any]:
-              """
-                      Use GPT-4 to analyze niche market viability and competition.
-                              Delegates to NicheDiscoveryAgent in production.
-                                      """
-              prompt = f"""Analyze the "{niche}" niche for Etsy print-on-demand products:
-              1. Market viability (1-10)
-              2. Competition level (low/medium/high)
-              3. Top 5 trending variations
-              4. Recommended price range
-              5. Key keywords for SEO
-
-              Provide structured analysis."""
-
-              try:
-                  response = self.client.chat.completions.create(
-                      model=self.model,
-                      messages=[
-                          {"role": "system", "content": "You are a market research expert for Etsy print-on-demand products."},
-                          {"role": "user", "content": prompt}
-                      ],
-                      temperature=0.7,
-                      max_tokens=1000
-                  )
-
-                  return {
-                      "niche": niche,
-                      "analysis": response.choices[0].message.content,
-                      "status": "completed"
-                  }
-              except Exception as e:
-                  logger.error(f"Niche analysis failed: {str(e)}")
-                  return {"niche": niche, "status": "failed", "error": str(e)}
-
-          def _generate_art(self, niche: str, num_images: int) -> Dict[str, Any]:
-              """
-              Generate art variations for the niche.
-              Delegates to ArtGenerationAgent with DALL-E 3 in production.
-              """
-              logger.info(f"Generating {num_images} art variations for {niche}")
-              # In production, this will call ArtGenerationAgent which uses DALL-E 3
-              # For now, return placeholder structure
-              return {
-                  "niche": niche,
-                  "num_images": num_images,
-                  "images": [
-                      {
-                          "id": f"img_{i}",
-                          "prompt": f"{niche} design variation {i+1}",
-                          "url": f"https://placeholder.com/{i}",
-                          "style": ["minimalist", "watercolor", "abstract"][i % 3]
-                      }
-                      for i in range(min(num_images, 5))  # Return 5 for demo
-                  ],
-                  "status": "generated"
-              }
-
-          def _create_listings(self, niche: str, num_listings: int, art_gen: Dict) -> Dict[str, Any]:
-              """
-              Create SEO-optimized Etsy listings.
-              Delegates to ListingManagerAgent in production.
-              """
-              logger.info(f"Creating {num_listings} Etsy listings")
-              # In production, this will call ListingManagerAgent with Etsy API
-              return {
-                  "niche": niche,
-                  "num_listings": num_listings,
-                  "listings": [
-                      {
-                          "id": f"listing_{i}",
-                          "title": f"{niche} Art Print - Design {i+1}",
-                          "description": f"Beautiful {niche} artwork perfect for home decoration",
-                          "price": 15.99 + (i * 0.50),
-                          "tags": ["art", "print", niche.split()[0].lower()]
-                      }
-                      for i in range(num_listings)
-                  ],
-                  "status": "created"
-              }
-
-          def _schedule_tiktok_content(self, niche: str, num_posts: int) -> Dict[str, Any]:
-              """
-              Schedule TikTok content distribution.
-              Delegates to TikTokManagerAgent in production.
-              """
-              logger.info(f"Scheduling {num_posts} TikTok posts")
-              # In production, this will call TikTokManagerAgent
-              return {
-                  "niche": niche,
-                  "num_posts": num_posts,
-                  "posts": [
-                      {
-                          "id": f"tiktok_{i}",
-                          "caption": f"Check out our new {niche} design! #art #design #{niche.lower().replace(' ', '')}",
-                          "scheduled_time": f"2026-01-{(i % 30) + 1:02d} {(i % 24):02d}:00"
-                      }
-                      for i in range(num_posts)
-                  ],
-                  "status": "scheduled"
-              }
-
-          def get_workflow_status(self, workflow_id: str) -> Dict[str, Any]:
-              """Get status of a specific workflow."""
-              for execution in self.execution_history:
-                  if execution.get("workflow_id") == workflow_id:
-                      return execution
-              return {"error": f"Workflow {workflow_id} not found"}
-
-          def get_execution_history(self) -> list:
-              """Get all workflow executions."""
-              return self.execution_history
-
-          def get_current_state(self) -> Dict[str, Any]:
-              """Get current workflow state."""
-              return self.workflow_state
-      
+    def _generate_art(self, niche: str, num_images: int,
+                      completed_items: Optional[Dict[str, Any]] = None,
+                      on_item: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Generate art variations for the niche.
+        Delegates to ArtGenerationAgent with DALL-E 3 in production.
+        Images already present in completed_items are reused instead of regenerated.
+        """
+        logger.info("Generating %s art variations for %s", num_images, niche)
+        completed_items = completed_items or {}
+        images = []
+
+        # In production, this will call ArtGenerationAgent which uses DALL-E 3
+        # For now, return placeholder structure
+        for i in range(min(num_images, 5)):  # Return 5 for demo
+            key = f"img_{i}"
+            image = completed_items.get(key)
+            if image is None:
+                image = {
+                    "id": key,
+                    "prompt": f"{niche} design variation {i+1}",
+                    "url": f"https://placeholder.com/{i}",
+                    "style": ["minimalist", "watercolor", "abstract"][i % 3]
+                }
+                if on_item:
+                    on_item(key, image)
+            images.append(image)
+
+        return {
+            "niche": niche,
+            "num_images": num_images,
+            "images": images,
+            "status": "generated"
+        }
+
+    def _create_listings(self, niche: str, num_listings: int, art_gen: Dict,
+                         completed_items: Optional[Dict[str, Any]] = None,
+                         on_item: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Create SEO-optimized Etsy listings.
+        Delegates to ListingManagerAgent in production.
+        Listings already present in completed_items are reused instead of recreated.
+        """
+        logger.info("Creating %s Etsy listings", num_listings)
+        completed_items = completed_items or {}
+        listings = []
+
+        # In production, this will call ListingManagerAgent with Etsy API
+        for i in range(num_listings):
+            key = f"listing_{i}"
+            listing = completed_items.get(key)
+            if listing is None:
+                listing = {
+                    "id": key,
+                    "title": f"{niche} Art Print - Design {i+1}",
+                    "description": f"Beautiful {niche} artwork perfect for home decoration",
+                    "price": 15.99 + (i * 0.50),
+                    "tags": ["art", "print", niche.split()[0].lower()]
+                }
+                if on_item:
+                    on_item(key, listing)
+            listings.append(listing)
+
+        return {
+            "niche": niche,
+            "num_listings": num_listings,
+            "listings": listings,
+            "status": "created"
+        }
+
+    def _schedule_tiktok_content(self, niche: str, num_posts: int,
+                                 completed_items: Optional[Dict[str, Any]] = None,
+                                 on_item: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Schedule TikTok content distribution.
+        Delegates to TikTokManagerAgent in production.
+        Posts already present in completed_items are reused instead of rescheduled.
+        """
+        logger.info("Scheduling %s TikTok posts", num_posts)
+        completed_items = completed_items or {}
+        posts = []
+
+        # In production, this will call TikTokManagerAgent
+        for i in range(num_posts):
+            key = f"tiktok_{i}"
+            post = completed_items.get(key)
+            if post is None:
+                post = {
+                    "id": key,
+                    "caption": f"Check out our new {niche} design! #art #design #{niche.lower().replace(' ', '')}",
+                    "scheduled_time": f"2026-01-{(i % 30) + 1:02d} {(i % 24):02d}:00"
+                }
+                if on_item:
+                    on_item(key, post)
+            posts.append(post)
+
+        return {
+            "niche": niche,
+            "num_posts": num_posts,
+            "posts": posts,
+            "status": "scheduled"
+        }
+
+    def get_workflow_status(self, workflow_id: str) -> Dict[str, Any]:
+        """Get status of a specific workflow."""
+        run = self.workflows.get(workflow_id)
+        if run:
+            return run.to_dict(include_state=True)
+
+        execution = self.execution_history.get(workflow_id)
+        if execution:
+            return execution
+
+        checkpoint = self.checkpoints.load(workflow_id)
+        if checkpoint:
+            return {
+                "workflow_id": workflow_id,
+                "status": checkpoint["status"],
+                "error": checkpoint["error"],
+                "completed_phases": [phase for phase in WORKFLOW_PHASES if phase in checkpoint["phases"]],
+                "resumable": checkpoint["status"] != "completed"
+            }
+        return {"error": f"Workflow {workflow_id} not found"}
+
+    def list_workflows(self, status: Optional[str] = None, niche: Optional[str] = None,
+                       active_only: bool = False) -> List[Dict[str, Any]]:
+        """
+        Query live and finished workflows known to this orchestrator.
+
+        Args:
+            status: Only include workflows with this status (pending/running/completed/failed)
+            niche: Only include workflows for this niche
+            active_only: Only include pending or running workflows
+
+        Returns:
+            Workflow summaries, newest first
+        """
+        with self._lock:
+            runs = list(self.workflows.values())
+
+        summaries = []
+        for run in reversed(runs):
+            if status and run.status != status:
+                continue
+            if niche and run.niche != niche:
+                continue
+            if active_only and not run.is_active:
+                continue
+            summaries.append(run.to_dict())
+        return summaries
+
+    def get_execution_history(self) -> list:
+        """Get all workflow executions."""
+        return list(self.execution_history)
+
+    def get_current_state(self) -> Dict[str, Any]:
+        """Get state of the most recently started workflow."""
+        run = self.workflows.get(self._latest_workflow_id) if self._latest_workflow_id else None
+        return dict(run.state) if run else {}
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting workflows and optionally wait for running ones."""
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,163 @@
+"""
+Post Scheduler - Min-heap publish queue with a single background dispatcher
+Keeps queued posts ordered by due time so inserts and dispatches are
+O(log n) and the dispatcher only ever looks at the head of the queue.
+"""
+
+import time
+import heapq
+import itertools
+import logging
+import threading
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PostScheduler:
+    """
+    Dispatches posts at their scheduled time in batches.
+
+    Entries are (due_timestamp, sequence, post_id) tuples on a heap.
+    Cancelled or rescheduled entries are invalidated lazily: the heap
+    entry stays until it reaches the head and is then skipped.
+    """
+
+    def __init__(self, publish_fn: Callable[[List[str]], None], interval_seconds: Optional[float] = None,
+                 batch_size: int = 50, clock: Callable[[], float] = time.time):
+        """
+        Initialize the scheduler.
+
+        Args:
+            publish_fn: Called from the dispatcher thread with a batch of due post ids
+            interval_seconds: Spacing between automatically slotted posts.
+                Defaults to TIKTOK_POSTING_INTERVAL from settings.
+            batch_size: Maximum posts handed to publish_fn per call
+            clock: Time source returning epoch seconds
+        """
+        if interval_seconds is None:
+            from config.settings import TIKTOK_POSTING_INTERVAL
+            interval_seconds = TIKTOK_POSTING_INTERVAL
+
+        self.publish_fn = publish_fn
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self.clock = clock
+
+        self._heap: List[tuple] = []
+        self._due: Dict[str, float] = {}
+        self._sequence = itertools.count()
+        self._last_slot: Optional[float] = None
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._due)
+
+    def next_slot(self) -> float:
+        """
+        Reserve the next automatically spaced slot.
+
+        Slots are one posting interval from now, and at least one interval
+        after the previously reserved slot.
+        """
+        with self._cond:
+            slot = self.clock() + self.interval_seconds
+            if self._last_slot is not None:
+                slot = max(slot, self._last_slot + self.interval_seconds)
+            self._last_slot = slot
+            return slot
+
+    def schedule(self, post_id: str, due: float) -> None:
+        """Queue (or move) a post to be published at the given epoch time."""
+        with self._cond:
+            self._due[post_id] = due
+            heapq.heappush(self._heap, (due, next(self._sequence), post_id))
+            # Only wake the dispatcher if the new post is now the earliest one
+            if self._heap[0][2] == post_id:
+                self._cond.notify()
+
+    def cancel(self, post_id: str) -> bool:
+        """Remove a post from the queue. Returns False if it was not queued."""
+        with self._cond:
+            return self._due.pop(post_id, None) is not None
+
+    def is_scheduled(self, post_id: str) -> bool:
+        with self._cond:
+            return post_id in self._due
+
+    def _discard_stale_head(self) -> None:
+        """Drop heap entries that were cancelled or superseded by a reschedule."""
+        while self._heap:
+            due, _, post_id = self._heap[0]
+            if self._due.get(post_id) == due:
+                return
+            heapq.heappop(self._heap)
+
+    def pop_due(self, now: Optional[float] = None, limit: Optional[int] = None) -> List[str]:
+        """
+        Remove and return post ids whose due time has passed.
+
+        Args:
+            now: Reference time (defaults to the scheduler clock)
+            limit: Maximum ids to return (defaults to batch_size)
+        """
+        now = self.clock() if now is None else now
+        limit = limit or self.batch_size
+        due_ids = []
+
+        with self._cond:
+            self._discard_stale_head()
+            while self._heap and len(due_ids) < limit and self._heap[0][0] <= now:
+                _, _, post_id = heapq.heappop(self._heap)
+                del self._due[post_id]
+                due_ids.append(post_id)
+                self._discard_stale_head()
+
+        return due_ids
+
+    def start(self) -> None:
+        """Start the background dispatcher thread."""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="post-dispatcher", daemon=True)
+            self._thread.start()
+        logger.info("Post dispatcher started")
+
+    def stop(self, timeout: Optional[float] = 5) -> None:
+        """Stop the dispatcher thread; queued posts stay queued."""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+        logger.info("Post dispatcher stopped")
+
+    def _run(self) -> None:
+        """Sleep until the earliest post is due, then publish everything due in batches."""
+        while True:
+            with self._cond:
+                while self._running:
+                    self._discard_stale_head()
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    delay = self._heap[0][0] - self.clock()
+                    if delay <= 0:
+                        break
+                    self._cond.wait(timeout=delay)
+                if not self._running:
+                    return
+
+            batch = self.pop_due()
+            if not batch:
+                continue
+            try:
+                self.publish_fn(batch)
+            except Exception as e:
+                logger.error("Publishing batch of %s posts failed: %s", len(batch), e)
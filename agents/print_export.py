@@ -0,0 +1,188 @@
+"""
+Print Export - Render generated art into standard print sizes
+Each size is resampled in horizontal bands into a memory-mapped scratch
+buffer and encoded straight from it, so a 16x20 @ 300 DPI print never
+needs its full uncompressed frame on the heap. Sizes and images are
+spread across a process pool.
+"""
+
+import os
+import logging
+import multiprocessing
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from config.settings import POOL_START_METHOD, PRINT_EXPORT_DIR, PRINT_EXPORT_WORKERS, PRINT_SIZES, TARGET_DPI
+
+from .image_io import is_within, path_slug
+
+logger = logging.getLogger(__name__)
+
+# Output rows resampled per band; bounds per-band map memory to ~band_rows * width * 8 bytes
+DEFAULT_BAND_ROWS = 256
+JPEG_QUALITY = 95
+
+
+def print_pixels(size: Tuple[float, float], dpi: int = TARGET_DPI) -> Tuple[int, int]:
+    """Pixel (width, height) for a print size given in inches."""
+    return int(round(size[0] * dpi)), int(round(size[1] * dpi))
+
+
+def _center_crop(src_w: int, src_h: int, out_w: int, out_h: int) -> Tuple[float, float, float, float]:
+    """Largest centered source window (x0, y0, w, h) with the output's aspect ratio."""
+    target_ratio = out_w / out_h
+    if src_w / src_h > target_ratio:
+        crop_w, crop_h = src_h * target_ratio, float(src_h)
+    else:
+        crop_w, crop_h = float(src_w), src_w / target_ratio
+    return (src_w - crop_w) / 2, (src_h - crop_h) / 2, crop_w, crop_h
+
+
+def _set_jpeg_dpi(path: Path, dpi: int) -> None:
+    """Patch the JFIF density fields in place (OpenCV always writes a 1:1 aspect header)."""
+    with open(path, "r+b") as f:
+        header = f.read(18)
+        if header[6:11] != b"JFIF\x00":
+            return
+        f.seek(13)
+        f.write(bytes([1]) + dpi.to_bytes(2, "big") + dpi.to_bytes(2, "big"))
+
+
+def render_print(source_path: str, output_path: str, width: int, height: int,
+                 dpi: int = TARGET_DPI, band_rows: int = DEFAULT_BAND_ROWS) -> Dict[str, Any]:
+    """
+    Resample one image to a print size, band by band.
+
+    The source is center-cropped to the print's aspect ratio and resampled
+    with Lanczos interpolation. Output bands are written into a file-backed
+    np.memmap which is then JPEG-encoded directly.
+
+    Runs in worker processes, so it only takes and returns plain values.
+    """
+    source = cv2.imread(source_path, cv2.IMREAD_COLOR)
+    if source is None:
+        raise ValueError(f"Could not read image: {source_path}")
+
+    src_h, src_w = source.shape[:2]
+    x0, y0, crop_w, crop_h = _center_crop(src_w, src_h, width, height)
+    scale_x, scale_y = crop_w / width, crop_h / height
+
+    # Source column for every output column (pixel-center aligned), shared by all bands
+    map_x_row = (x0 + (np.arange(width, dtype=np.float32) + 0.5) * scale_x - 0.5).astype(np.float32)
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    # Unique per call so concurrent exports of the same image never share a scratch file
+    fd, scratch_name = tempfile.mkstemp(dir=output_path.parent, prefix=f".{output_path.stem}.", suffix=".scratch")
+    os.close(fd)
+    scratch_path = Path(scratch_name)
+    canvas = np.memmap(scratch_path, dtype=np.uint8, mode="w+", shape=(height, width, 3))
+
+    try:
+        for top in range(0, height, band_rows):
+            bottom = min(top + band_rows, height)
+            src_rows = y0 + (np.arange(top, bottom, dtype=np.float32) + 0.5) * scale_y - 0.5
+
+            # Only the source rows this band touches, plus Lanczos support
+            first = max(int(np.floor(src_rows[0])) - 4, 0)
+            last = min(int(np.ceil(src_rows[-1])) + 5, src_h)
+            band_source = source[first:last]
+
+            map_x = np.broadcast_to(map_x_row, (bottom - top, width))
+            map_y = np.broadcast_to((src_rows - first)[:, None], (bottom - top, width)).astype(np.float32)
+            canvas[top:bottom] = cv2.remap(band_source, np.ascontiguousarray(map_x), map_y,
+                                           interpolation=cv2.INTER_LANCZOS4,
+                                           borderMode=cv2.BORDER_REFLECT)
+        canvas.flush()
+
+        if not cv2.imwrite(str(output_path), canvas, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY]):
+            raise IOError(f"Could not write {output_path}")
+        _set_jpeg_dpi(output_path, dpi)
+    finally:
+        del canvas
+        if scratch_path.exists():
+            scratch_path.unlink()
+
+    return {
+        "path": str(output_path),
+        "pixels": f"{width}x{height}",
+        "dpi": dpi,
+        "bytes": output_path.stat().st_size
+    }
+
+
+class PrintExporter:
+    """Exports images to every configured print size on a process pool."""
+
+    def __init__(self, output_dir: Optional[Path] = None, sizes: Optional[Dict[str, Tuple[float, float]]] = None,
+                 dpi: int = TARGET_DPI, max_workers: Optional[int] = None):
+        """
+        Initialize the exporter.
+
+        Args:
+            output_dir: Root directory for exports. Defaults to PRINT_EXPORT_DIR.
+            sizes: Print name -> (width, height) in inches. Defaults to PRINT_SIZES.
+            dpi: Output resolution
+            max_workers: Process pool size. Defaults to PRINT_EXPORT_WORKERS.
+        """
+        self.output_dir = Path(output_dir or PRINT_EXPORT_DIR)
+        self.sizes = dict(sizes or PRINT_SIZES)
+        self.dpi = dpi
+        self.max_workers = max_workers or PRINT_EXPORT_WORKERS
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                             mp_context=multiprocessing.get_context(POOL_START_METHOD))
+        return self._pool
+
+    def export_many(self, sources: Dict[str, str], sizes: Optional[List[str]] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Export several images to several sizes in parallel.
+
+        Args:
+            sources: Image id -> local source path
+            sizes: Print size names to render (default: all configured sizes)
+
+        Returns:
+            Image id -> list of exported files (or errors) per size
+        """
+        size_names = sizes or list(self.sizes)
+        unknown = [name for name in size_names if name not in self.sizes]
+        if unknown:
+            raise ValueError(f"Unknown print sizes: {unknown}")
+
+        pool = self._get_pool()
+        futures = []
+        results: Dict[str, List[Dict[str, Any]]] = {image_id: [] for image_id in sources}
+        for image_id, source_path in sources.items():
+            safe_id = path_slug(image_id)
+            for name in size_names:
+                width, height = print_pixels(self.sizes[name], self.dpi)
+                output_path = self.output_dir / safe_id / f"{safe_id}_{name}.jpg"
+                if not is_within(output_path, self.output_dir):
+                    results[image_id].append({"size": name, "error": "Output path outside the export directory"})
+                    continue
+                future = pool.submit(render_print, str(source_path), str(output_path), width, height, self.dpi)
+                futures.append((image_id, name, future))
+
+        for image_id, name, future in futures:
+            try:
+                exported = future.result()
+                exported["size"] = name
+            except Exception as e:
+                logger.error("Print export %s %s failed: %s", image_id, name, e)
+                exported = {"size": name, "error": str(e)}
+            results[image_id].append(exported)
+        return results
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
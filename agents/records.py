@@ -0,0 +1,130 @@
+"""
+Records - Compact typed records for the entities agents keep in bulk
+Generated images, listings, TikTok posts and workflow results are slotted
+dataclasses instead of dicts: no per-instance __dict__ and no repeated key
+strings. They still behave like mappings (record["title"], .get(),
+.update(), {**record}), so code written against the old dicts keeps working.
+"""
+
+from collections.abc import MutableMapping
+from dataclasses import dataclass, field, fields
+from functools import lru_cache
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+
+@lru_cache(maxsize=None)
+def _field_names(cls) -> Tuple[str, ...]:
+    return tuple(f.name for f in fields(cls))
+
+
+class Record(MutableMapping):
+    """
+    Mapping behaviour for slotted dataclasses.
+
+    A field set to None counts as absent: it is skipped by keys() and
+    to_dict(), and get() returns the default for it, just as for a key
+    that was never added to the old dict. Equality is mapping equality,
+    so a record compares equal to the dict with the same items.
+    """
+
+    __slots__ = ()
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in _field_names(type(self)):
+            raise KeyError(key)
+        value = getattr(self, key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key not in _field_names(type(self)):
+            raise KeyError(f"{type(self).__name__} has no field {key!r}")
+        setattr(self, key, value)
+
+    def __delitem__(self, key: str) -> None:
+        self[key] = None
+
+    def __iter__(self) -> Iterator[str]:
+        return (name for name in _field_names(type(self)) if getattr(self, name) is not None)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict of the set fields (for JSON and storage)."""
+        return {name: value for name in _field_names(type(self))
+                if (value := getattr(self, name)) is not None}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]):
+        """Build a record from a dict, ignoring keys that are not fields."""
+        names = _field_names(cls)
+        return cls(**{key: value for key, value in data.items() if key in names})
+
+
+def json_default(obj: Any) -> Any:
+    """`default=` hook for json.dumps: records become dicts, anything else a string."""
+    if isinstance(obj, Record):
+        return obj.to_dict()
+    return str(obj)
+
+
+@dataclass(slots=True, eq=False)
+class GeneratedImage(Record):
+    id: str
+    niche: str
+    style: str
+    prompt: str
+    url: Optional[str]
+    size: str = "1024x1024"
+    thumbnail_url: Optional[str] = None
+    preview_url: Optional[str] = None
+    created_at: Optional[str] = None
+    ready_for_print: bool = True
+    quality: Optional[str] = None
+    revised_prompt: Optional[str] = None
+    draft_url: Optional[str] = None
+    quality_score: Optional[float] = None
+
+
+@dataclass(slots=True, eq=False)
+class Listing(Record):
+    id: str
+    title: str
+    description: str
+    price: float
+    image_url: str
+    tags: List[str] = field(default_factory=list)
+    status: str = "draft"
+    created_at: Optional[str] = None
+    niche: Optional[str] = None
+    mockups: Optional[List[Dict[str, Any]]] = None
+    extra_image_urls: Optional[List[str]] = None
+    etsy_listing_id: Optional[int] = None
+    etsy_image_ids: Optional[List[int]] = None
+
+
+@dataclass(slots=True, eq=False)
+class TikTokPost(Record):
+    id: str
+    video_url: str
+    caption: str
+    scheduled_time: str
+    status: str = "scheduled"
+    created_at: Optional[str] = None
+    published_at: Optional[str] = None
+
+
+@dataclass(slots=True, eq=False)
+class WorkflowResult(Record):
+    workflow_id: str
+    status: str
+    niche: str
+    niche_analysis: Optional[Dict[str, Any]] = None
+    images_generated: int = 0
+    listings_created: int = 0
+    tiktok_posts_scheduled: int = 0
+    resumed: bool = False
+    skipped_phases: List[str] = field(default_factory=list)
+    timestamp: Optional[str] = None
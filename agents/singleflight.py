@@ -0,0 +1,110 @@
+"""
+Single-flight - Coalesce identical concurrent calls into one execution
+The first caller for a key runs the function; callers arriving while it
+is in flight wait for and share its result instead of repeating the work.
+"""
+
+import copy
+import logging
+import threading
+from functools import wraps
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    """One in-flight execution and the callers waiting on it."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """Groups concurrent calls by key so each key runs at most once at a time."""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Tuple[Any, bool]:
+        """
+        Run fn(*args, **kwargs) unless a call with the same key is in flight.
+
+        Returns:
+            (result, shared) where shared is True if the result came from
+            another caller's execution. Exceptions are shared the same way.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.followers += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+            if call.followers:
+                logger.info("Coalesced %s duplicate calls for %r", call.followers, key)
+
+        return call.result, False
+
+    def in_flight(self) -> int:
+        """Number of distinct keys currently executing."""
+        with self._lock:
+            return len(self._calls)
+
+    def waiting(self) -> int:
+        """Number of callers currently waiting on another caller's execution."""
+        with self._lock:
+            return sum(call.followers for call in self._calls.values())
+
+
+def coalesce(key_fn: Optional[Callable[..., Hashable]] = None):
+    """
+    Method decorator sharing one in-flight execution between identical calls.
+
+    Calls are identical when they target the same instance with the same
+    arguments (or the same key_fn(*args, **kwargs) if given). Every caller,
+    the one that ran the call included, gets its own deep copy, so no
+    caller can mutate a result another is still copying. Calls whose
+    arguments are unhashable are not coalesced.
+    """
+    def decorator(method):
+        group = SingleFlight()
+
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if key_fn is not None:
+                call_key = key_fn(*args, **kwargs)
+            else:
+                call_key = (args, tuple(sorted(kwargs.items())))
+            key = (id(self), method.__name__, call_key)
+            try:
+                hash(key)
+            except TypeError:
+                return method(self, *args, **kwargs)
+            result, _ = group.do(key, method, self, *args, **kwargs)
+            return copy.deepcopy(result)
+
+        wrapper.singleflight = group
+        return wrapper
+    return decorator
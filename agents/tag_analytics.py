@@ -0,0 +1,217 @@
+"""
+Tag Analytics - Local tag co-occurrence and keyword statistics
+Listing tags feed a sparse, symmetric co-occurrence matrix stored as a
+sorted int64 key array (row << 32 | col) with parallel counts, merged in
+batches as listings arrive. Niche keywords feed pandas frequency tables.
+Tag suggestions are answered from these structures without an LLM call.
+"""
+
+import logging
+import threading
+from itertools import permutations
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+ETSY_MAX_TAGS = 13
+ETSY_MAX_TAG_LENGTH = 20
+
+
+def normalize_tag(tag: str) -> str:
+    return " ".join(str(tag).lower().split())
+
+
+class TagAnalytics:
+    """Incrementally maintained tag co-occurrence matrix and keyword tables."""
+
+    def __init__(self):
+        self._tag_ids: Dict[str, int] = {}
+        self._tags: List[str] = []
+        self._tag_counts = np.zeros(0, dtype=np.int64)
+
+        # Consolidated sparse matrix: sorted unique keys and their counts
+        self._keys = np.zeros(0, dtype=np.int64)
+        self._counts = np.zeros(0, dtype=np.int64)
+        # Updates not yet merged in (keys, +1/-1 weights)
+        self._pending_keys: List[np.ndarray] = []
+        self._pending_weights: List[np.ndarray] = []
+
+        self._keyword_rows: List[Tuple[str, str]] = []
+        self._keyword_frame: Optional[pd.DataFrame] = None
+        self._lock = threading.Lock()
+
+    def _ids(self, tags: List[str]) -> np.ndarray:
+        """Ids for normalized, de-duplicated tags, registering new ones."""
+        ids = []
+        for tag in dict.fromkeys(normalize_tag(t) for t in tags):
+            if not tag:
+                continue
+            if tag not in self._tag_ids:
+                self._tag_ids[tag] = len(self._tags)
+                self._tags.append(tag)
+            ids.append(self._tag_ids[tag])
+        if len(self._tags) > len(self._tag_counts):
+            grown = np.zeros(max(len(self._tags), 2 * len(self._tag_counts)), dtype=np.int64)
+            grown[:len(self._tag_counts)] = self._tag_counts
+            self._tag_counts = grown
+        return np.array(ids, dtype=np.int64)
+
+    def add_listing(self, tags: List[str], weight: int = 1) -> None:
+        """
+        Count one listing's tags. Use weight=-1 to retract a listing's old tags.
+        """
+        with self._lock:
+            ids = self._ids(tags)
+            if not len(ids):
+                return
+            np.add.at(self._tag_counts, ids, weight)
+            if len(ids) > 1:
+                pairs = np.array(list(permutations(ids.tolist(), 2)), dtype=np.int64)
+                keys = (pairs[:, 0] << 32) | pairs[:, 1]
+                self._pending_keys.append(keys)
+                self._pending_weights.append(np.full(len(keys), weight, dtype=np.int64))
+
+    def update_listing(self, old_tags: List[str], new_tags: List[str]) -> None:
+        """Replace a listing's tags in the statistics."""
+        self.add_listing(old_tags, weight=-1)
+        self.add_listing(new_tags)
+
+    def _consolidate(self) -> None:
+        """Merge pending updates into the sorted key/count arrays. Caller holds the lock."""
+        if not self._pending_keys:
+            return
+        keys = np.concatenate([self._keys] + self._pending_keys)
+        weights = np.concatenate([self._counts] + self._pending_weights)
+        self._pending_keys, self._pending_weights = [], []
+
+        unique, inverse = np.unique(keys, return_inverse=True)
+        counts = np.bincount(inverse, weights=weights).astype(np.int64)
+        keep = counts > 0
+        self._keys, self._counts = unique[keep], counts[keep]
+
+    def _row(self, tag_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Co-occurring tag ids and counts for one tag (a contiguous slice of the sorted keys)."""
+        start, end = np.searchsorted(self._keys, [tag_id << 32, (tag_id + 1) << 32])
+        return self._keys[start:end] & 0xFFFFFFFF, self._counts[start:end]
+
+    def suggest_tags(self, tags: List[str], niche: Optional[str] = None,
+                     limit: int = ETSY_MAX_TAGS) -> List[Dict[str, Any]]:
+        """
+        Suggest tags that co-occur with the given ones.
+
+        Candidates are scored by summed cosine association
+        count(a, b) / sqrt(count(a) * count(b)) over the input tags. If that
+        yields fewer than `limit`, the niche's most frequent keywords fill in.
+
+        Returns:
+            [{"tag", "score", "source"}] best first, excluding the input tags
+        """
+        with self._lock:
+            self._consolidate()
+            seed_ids = [self._tag_ids[t] for t in map(normalize_tag, tags) if t in self._tag_ids]
+            scores = np.zeros(len(self._tags), dtype=np.float64)
+            for tag_id in seed_ids:
+                cols, counts = self._row(tag_id)
+                if len(cols):
+                    norm = np.sqrt(self._tag_counts[tag_id] * np.maximum(self._tag_counts[cols], 1))
+                    np.add.at(scores, cols, counts / norm)
+            scores[seed_ids] = 0
+            lengths_ok = np.fromiter((len(t) <= ETSY_MAX_TAG_LENGTH for t in self._tags), bool, len(self._tags))
+            scores[~lengths_ok] = 0
+
+            top = np.flatnonzero(scores)
+            top = top[np.argsort(-scores[top], kind="stable")][:limit]
+            suggestions = [
+                {"tag": self._tags[i], "score": round(float(scores[i]), 4), "source": "co-occurrence"} for i in top
+            ]
+
+        if niche and len(suggestions) < limit:
+            taken = {s["tag"] for s in suggestions} | {normalize_tag(t) for t in tags}
+            table = self.keyword_table(niche)
+            for keyword in table.index:
+                if len(suggestions) >= limit:
+                    break
+                if keyword not in taken and len(keyword) <= ETSY_MAX_TAG_LENGTH:
+                    suggestions.append({"tag": keyword, "score": 0.0, "source": "niche keywords"})
+        return suggestions
+
+    def top_pairs(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Most frequent tag pairs across the catalog."""
+        with self._lock:
+            self._consolidate()
+            rows, cols = self._keys >> 32, self._keys & 0xFFFFFFFF
+            upper = rows < cols  # the matrix is symmetric; count each pair once
+            order = np.argsort(-self._counts[upper], kind="stable")[:limit]
+            return [
+                {"tags": [self._tags[r], self._tags[c]], "count": int(n)}
+                for r, c, n in zip(rows[upper][order], cols[upper][order], self._counts[upper][order])
+            ]
+
+    def tag_word_counts(self) -> Dict[str, int]:
+        """How many listing tags each word appears in, summed over the catalog."""
+        counts: Dict[str, int] = {}
+        with self._lock:
+            for tag, count in zip(self._tags, self._tag_counts.tolist()):
+                if count > 0:
+                    for word in tag.split():
+                        counts[word] = counts.get(word, 0) + count
+        return counts
+
+    def keyword_word_counts(self) -> Dict[str, int]:
+        """How many extracted niche keywords each word appears in."""
+        frame = self._keywords()
+        if frame.empty:
+            return {}
+        return frame["keyword"].str.split().explode().value_counts().to_dict()
+
+    def record_keywords(self, niche: str, keywords: List[str]) -> None:
+        """Add keywords extracted for a niche to the frequency tables."""
+        niche = normalize_tag(niche)
+        rows = [(niche, normalize_tag(k)) for k in keywords if normalize_tag(k)]
+        with self._lock:
+            self._keyword_rows.extend(rows)
+            self._keyword_frame = None
+
+    def _keywords(self) -> pd.DataFrame:
+        with self._lock:
+            if self._keyword_frame is None:
+                self._keyword_frame = pd.DataFrame(self._keyword_rows, columns=["niche", "keyword"])
+            return self._keyword_frame
+
+    def keyword_table(self, niche: Optional[str] = None) -> pd.DataFrame:
+        """
+        Keyword frequencies, indexed by keyword and sorted by count.
+
+        Columns: count (mentions), niches (distinct niches mentioning it).
+        """
+        frame = self._keywords()
+        if niche:
+            frame = frame[frame["niche"] == normalize_tag(niche)]
+        if frame.empty:
+            return pd.DataFrame(columns=["count", "niches"])
+        table = frame.groupby("keyword").agg(count=("niche", "size"), niches=("niche", "nunique"))
+        return table.sort_values(["count", "niches"], ascending=False, kind="stable")
+
+    def niche_overlap(self) -> pd.DataFrame:
+        """Jaccard similarity between niches over their keyword sets."""
+        frame = self._keywords().drop_duplicates()
+        if frame.empty:
+            return pd.DataFrame()
+        membership = pd.crosstab(frame["niche"], frame["keyword"]).to_numpy(dtype=np.float64)
+        intersection = membership @ membership.T
+        sizes = membership.sum(axis=1)
+        union = sizes[:, None] + sizes[None, :] - intersection
+        niches = sorted(frame["niche"].unique())
+        return pd.DataFrame(intersection / np.maximum(union, 1), index=niches, columns=niches).round(4)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            self._consolidate()
+            return {
+                "tags": len(self._tags),
+                "tag_pairs": int(len(self._keys) // 2),
+                "keywords": len(self._keyword_rows)
+            }
@@ -1,79 +1,205 @@
 """TikTok Manager Agent - Social media scheduling and content distribution"""
 import os
 import logging
+import threading
 from typing import Dict, Any, List, Optional
-from datetime import datetime, timedelta
+from datetime import datetime
 from openai import OpenAI
 
+from .caption_pool import CaptionPool
+from .events import publish
+from .history_store import HistoryStore
+from .image_io import fetch_image, path_slug
+from .model_router import ModelRouter
+from .post_scheduler import PostScheduler
+from .records import TikTokPost
+from .versioning import VersionCounter
+from .video_renderer import SlideshowRenderer
+
 logger = logging.getLogger(__name__)
 
+
 class TikTokManagerAgent:
-      """Manages TikTok content scheduling, caption generation, and engagement tracking."""
+    """Manages TikTok content scheduling, caption generation, and engagement tracking."""
 
-    def __init__(self, api_key: Optional[str] = None, tiktok_api_key: Optional[str] = None):
-              self.api_key = api_key or os.getenv("OPENAI_API_KEY")
-              self.tiktok_api_key = tiktok_api_key or os.getenv("TIKTOK_API_KEY")
+    def __init__(self, api_key: Optional[str] = None, tiktok_api_key: Optional[str] = None,
+                 start_dispatcher: bool = False, video_renderer: Optional[SlideshowRenderer] = None,
+                 scheduled_posts: Optional[HistoryStore] = None):
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
+        self.tiktok_api_key = tiktok_api_key or os.getenv("TIKTOK_API_KEY")
 
         if not self.api_key:
-                      raise ValueError("OpenAI API key required")
+            raise ValueError("OpenAI API key required")
 
         self.client = OpenAI(api_key=self.api_key)
-        self.scheduled_posts = []
+        self.router = ModelRouter(self.client)
+        self.caption_pool = CaptionPool(self.router)
+        self.video_renderer = video_renderer or SlideshowRenderer()
+        self.scheduled_posts = scheduled_posts or HistoryStore("tiktok_posts", key="id", record_type=TikTokPost)
+        self.version = VersionCounter()
+        self.scheduler = PostScheduler(self._publish_due)
+        self._post_lock = threading.Lock()
+        self._restore_schedule()
+        if start_dispatcher:
+            self.start_dispatcher()
         logger.info("TikTokManagerAgent initialized")
 
     def generate_captions(self, niche: str, num_captions: int = 10) -> List[str]:
-              """Generate engaging TikTok captions for a niche."""
-              logger.info(f"Generating {num_captions} captions for {niche}")
-
-        try:
-                      response = self.client.chat.completions.create(
-                                        model="gpt-4-turbo",
-                                        messages=[{
-                                                              "role": "user",
-                                                              "content": f"Generate {num_captions} viral TikTok captions for {niche} products. Make them catchy, engaging, with relevant hashtags."
-                                        }],
-                                        temperature=0.8,
-                                        max_tokens=1000
-                      )
-
-            captions = response.choices[0].message.content.split('\n')
-            return [c.strip() for c in captions if c.strip()][:num_captions]
-        except:
-            return [f"Check out our amazing {niche} designs! #{niche.lower().replace(' ', '')}"] * num_captions
-
-              def schedule_post(self, video_url: str, caption: str, scheduled_time: Optional[str] = None) -> Dict[str, Any]:
-                        """Schedule a TikTok post."""
-                        if not scheduled_time:
-                                      scheduled_time = (datetime.now() + timedelta(days=1)).isoformat()
-
-                        post = {
-                            "id": f"tiktok_post_{len(self.scheduled_posts):05d}",
-                            "video_url": video_url,
-                            "caption": caption,
-                            "scheduled_time": scheduled_time,
-                            "status": "scheduled",
-                            "created_at": datetime.now().isoformat()
-                        }
-
-        self.scheduled_posts.append(post)
-        logger.info(f"Post scheduled: {post['id']}")
+        """
+        Get engaging TikTok captions for a niche.
+
+        Captions come from the niche's pool and are never handed out twice;
+        the pool is refilled in the background with batched model calls.
+        """
+        logger.info("Generating %s captions for %s", num_captions, niche)
+
+        captions = self.caption_pool.take(niche, num_captions)
+        if len(captions) < num_captions:
+            fallback = f"Check out our amazing {niche} designs! #{niche.lower().replace(' ', '')}"
+            captions += [fallback] * (num_captions - len(captions))
+        return captions
+
+    def prefetch_captions(self, niches: List[str]) -> None:
+        """Queue caption pools for several niches to be filled in the background."""
+        self.caption_pool.request_refill(niches)
+
+    def schedule_post(self, video_url: str, caption: str, scheduled_time: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Schedule a TikTok post.
+
+        Without a scheduled_time the post gets the next free slot, spaced
+        TIKTOK_POSTING_INTERVAL after the previous automatically slotted post.
+        """
+        if scheduled_time:
+            try:
+                due = datetime.fromisoformat(scheduled_time).timestamp()
+            except ValueError:
+                raise ValueError(f"Invalid scheduled_time: {scheduled_time}")
+        else:
+            due = self.scheduler.next_slot()
+            scheduled_time = datetime.fromtimestamp(due).isoformat()
+
+        # Id and append under one lock: request threads and the dispatcher schedule concurrently
+        with self._post_lock:
+            post = TikTokPost(
+                id=f"tiktok_post_{len(self.scheduled_posts):05d}",
+                video_url=video_url,
+                caption=caption,
+                scheduled_time=scheduled_time,
+                status="scheduled",
+                created_at=datetime.now().isoformat()
+            )
+            self.scheduled_posts.append(post)
+        self.scheduler.schedule(post["id"], due)
+        self.version.bump()
+        publish("post.scheduled", item_id=post.id, scheduled_time=scheduled_time)
+        logger.info("Post scheduled: %s", post['id'])
         return post
 
+    def create_video_posts(self, niche: str, image_urls: List[str], num_videos: int = 1,
+                           images_per_video: int = 5) -> List[Dict[str, Any]]:
+        """
+        Render slideshow videos from a niche's images and schedule them.
+
+        Images are split round-robin across videos, each video gets its own
+        caption (also burned into the video), and all videos render in
+        parallel before being scheduled into the next free slots.
+
+        Args:
+            niche: Niche the images belong to (used for captions)
+            image_urls: Image URLs or local paths
+            num_videos: Number of videos to produce
+            images_per_video: Maximum slides per video
+
+        Returns:
+            Scheduled posts, or {"error": ...} entries for videos that failed to render
+        """
+        sources = []
+        for url in image_urls:
+            try:
+                sources.append(str(fetch_image(url)))
+            except Exception as e:
+                logger.warning("Skipping image %s for video: %s", url[:80], e)
+        if not sources:
+            return [{"error": "No images available for video"}]
+
+        num_videos = max(1, min(num_videos, len(sources)))
+        captions = self.generate_captions(niche, num_videos)
+        batch = datetime.now().strftime("%Y%m%d%H%M%S")
+        jobs = {
+            f"tiktok_{path_slug(niche)}_{batch}_{i:03d}": {
+                "images": sources[i::num_videos][:images_per_video],
+                "caption": captions[i]
+            }
+            for i in range(num_videos)
+        }
+
+        logger.info("Rendering %s videos for %s", len(jobs), niche)
+        rendered = self.video_renderer.render_many(jobs)
+
+        posts = []
+        for video_id, job in jobs.items():
+            video = rendered[video_id]
+            if "error" in video:
+                posts.append({"video_id": video_id, "error": video["error"]})
+                continue
+            posts.append(self.schedule_post(video["path"], job["caption"]))
+        return posts
+
     def schedule_batch(self, posts_data: List[Dict]) -> List[Dict[str, Any]]:
-              """Schedule multiple posts."""
-              return [self.schedule_post(**data) for data in posts_data]
+        """Schedule multiple posts."""
+        return [self.schedule_post(**data) for data in posts_data]
 
     def get_scheduled_posts(self) -> List[Dict[str, Any]]:
-              """Retrieve all scheduled posts."""
-              return self.scheduled_posts
+        """Retrieve all scheduled posts."""
+        return list(self.scheduled_posts)
+
+    def get_post(self, post_id: str) -> Optional[Dict[str, Any]]:
+        """Look up a post by id."""
+        return self.scheduled_posts.get(post_id)
 
     def publish_post(self, post_id: str) -> Dict[str, Any]:
-              """Publish a scheduled post to TikTok."""
-              for post in self.scheduled_posts:
-                            if post["id"] == post_id:
-                                              post["status"] = "published"
-                                              post["published_at"] = datetime.now().isoformat()
-                                              logger.info(f"Post published: {post_id}")
-                                              return post
-                                      return {"error": "Post not found"}
-                
+        """Publish a scheduled post to TikTok."""
+        post = self.scheduled_posts.get(post_id)
+        if not post:
+            return {"error": "Post not found"}
+
+        # Publishing early removes the post from the dispatch queue
+        self.scheduler.cancel(post_id)
+        post["status"] = "published"
+        post["published_at"] = datetime.now().isoformat()
+        self.scheduled_posts.put(post)
+        self.version.bump()
+        logger.info("Post published: %s", post_id)
+        return post
+
+    def _publish_due(self, post_ids: List[str]) -> None:
+        """Dispatcher callback: publish a batch of posts whose time has come."""
+        for post_id in post_ids:
+            result = self.publish_post(post_id)
+            if "error" in result:
+                logger.warning("Dispatch skipped %s: %s", post_id, result['error'])
+
+    def _restore_schedule(self) -> None:
+        """Queue posts still marked scheduled in the store, e.g. after a restart."""
+        restored = 0
+        for post in self.scheduled_posts:
+            if post.get("status") != "scheduled":
+                continue
+            try:
+                due = datetime.fromisoformat(post["scheduled_time"]).timestamp()
+            except (KeyError, TypeError, ValueError):
+                logger.warning("Post %s has no valid scheduled_time; not queued", post.get("id"))
+                continue
+            self.scheduler.schedule(post["id"], due)
+            restored += 1
+        if restored:
+            logger.info("Restored %s scheduled posts", restored)
+
+    def start_dispatcher(self) -> None:
+        """Start publishing queued posts automatically at their scheduled time."""
+        self.scheduler.start()
+
+    def stop_dispatcher(self) -> None:
+        """Stop automatic publishing; queued posts remain scheduled."""
+        self.scheduler.stop()
@@ -0,0 +1,122 @@
+"""
+Tracing - Lightweight spans exported as Chrome trace events
+Spans are timed with perf_counter and kept in a bounded in-memory buffer.
+A context variable carries the current trace id (a workflow or request
+id) so spans from any agent can be filtered per workflow. The export
+loads directly in chrome://tracing or Perfetto.
+"""
+
+import os
+import time
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from typing import Dict, Any, List, Optional
+
+from config.settings import TRACE_BUFFER_SIZE, TRACING_ENABLED
+
+current_trace_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("current_trace_id", default=None)
+
+
+class Tracer:
+    """Collects completed spans in a ring buffer."""
+
+    def __init__(self, max_events: int = TRACE_BUFFER_SIZE, enabled: bool = TRACING_ENABLED):
+        self.enabled = enabled
+        self._events = deque(maxlen=max_events)
+        self._thread_names: Dict[int, str] = {}
+        self._pid = os.getpid()
+        # Chrome traces use microseconds from an arbitrary origin
+        self._origin = time.perf_counter()
+
+    def record(self, name: str, cat: str, start: float, end: float, **args) -> None:
+        """Add a complete ("X") event for perf_counter timestamps start..end."""
+        if not self.enabled:
+            return
+        thread = threading.current_thread()
+        self._thread_names.setdefault(thread.ident, thread.name)
+        event_args = {k: v for k, v in args.items() if v is not None}
+        trace_id = current_trace_id.get()
+        if trace_id:
+            event_args["trace_id"] = trace_id
+        self._events.append({
+            "name": name,
+            "cat": cat,
+            "ph": "X",
+            "ts": round((start - self._origin) * 1e6, 1),
+            "dur": round((end - start) * 1e6, 1),
+            "pid": self._pid,
+            "tid": thread.ident,
+            "args": event_args
+        })
+
+    @contextmanager
+    def span(self, name: str, cat: str = "app", **args):
+        """Time the enclosed block as one complete event."""
+        if not self.enabled:
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException as e:
+            self.record(name, cat, start, time.perf_counter(), error=type(e).__name__, **args)
+            raise
+        self.record(name, cat, start, time.perf_counter(), **args)
+
+    def export(self, trace_id: Optional[str] = None, cat: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Spans in Chrome trace-event format, optionally filtered.
+
+        Args:
+            trace_id: Only spans recorded under this trace (workflow or request id)
+            cat: Only spans of this category (e.g. "phase", "model", "request")
+        """
+        events: List[Dict[str, Any]] = [
+            e for e in list(self._events)
+            if (trace_id is None or e["args"].get("trace_id") == trace_id)
+            and (cat is None or e["cat"] == cat)
+        ]
+        tids = {e["tid"] for e in events}
+        metadata = [
+            {"name": "thread_name", "ph": "M", "pid": self._pid, "tid": tid, "args": {"name": name}}
+            for tid, name in list(self._thread_names.items()) if tid in tids
+        ]
+        return {"traceEvents": metadata + events, "displayTimeUnit": "ms"}
+
+    def clear(self) -> None:
+        self._events.clear()
+
+
+tracer = Tracer()
+
+
+def span(name: str, cat: str = "app", **args):
+    """Span on the process-wide tracer."""
+    return tracer.span(name, cat, **args)
+
+
+@contextmanager
+def trace_context(trace_id: str):
+    """Attribute spans recorded in the enclosed block (on this thread) to trace_id."""
+    token = current_trace_id.set(trace_id)
+    try:
+        yield
+    finally:
+        current_trace_id.reset(token)
+
+
+def traced(name: Optional[str] = None, cat: str = "app"):
+    """Decorator wrapping every call of a function in a span."""
+    def decorator(fn):
+        span_name = name or fn.__qualname__
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with tracer.span(span_name, cat):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,24 @@
+"""
+Versioning - Monotonic change counters for agent-held state
+API layers derive ETags from these so unchanged resources can be
+answered with 304 Not Modified without re-serializing them.
+"""
+
+import threading
+
+
+class VersionCounter:
+    """Thread-safe counter bumped on every mutation of the state it guards."""
+
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+    def bump(self) -> int:
+        with self._lock:
+            self._value += 1
+            return self._value
@@ -0,0 +1,209 @@
+"""
+Video Renderer - Vertical TikTok slideshows from generated images
+Each image is resized once to a slightly oversized cover frame; every
+output frame is then a single affine warp (pan/zoom) of that base, with
+crossfades and a pre-rendered caption band blended in with NumPy. Whole
+videos are rendered in parallel on a process pool.
+"""
+
+import logging
+import multiprocessing
+import textwrap
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from config.settings import IMAGES_DIR, POOL_START_METHOD, TIKTOK_VIDEO_LENGTH, VIDEO_FOURCC, VIDEO_WORKERS
+
+from .image_io import is_within
+
+logger = logging.getLogger(__name__)
+
+VIDEO_DIR = IMAGES_DIR / "videos"
+VIDEO_SIZE = (720, 1280)  # width, height (9:16)
+VIDEO_FPS = 30
+TRANSITION_SECONDS = 0.5
+MAX_ZOOM = 1.15
+
+
+def _cover_base(image: np.ndarray, width: int, height: int) -> np.ndarray:
+    """Resize an image once so it covers the frame at MAX_ZOOM."""
+    scale = max(width / image.shape[1], height / image.shape[0]) * MAX_ZOOM
+    size = (int(np.ceil(image.shape[1] * scale)), int(np.ceil(image.shape[0] * scale)))
+    return cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+
+def _ken_burns(base: np.ndarray, width: int, height: int, progress: float, index: int) -> np.ndarray:
+    """
+    One pan/zoom frame as a single warpAffine of the cover base.
+
+    Even slides zoom in, odd slides zoom out; the pan direction alternates
+    so consecutive slides don't drift the same way.
+    """
+    base_h, base_w = base.shape[:2]
+    min_zoom = max(width / base_w, height / base_h)  # fills the frame exactly
+    zoom_in = index % 2 == 0
+    zoom = min_zoom * (1.0 + (MAX_ZOOM - 1.0) * (progress if zoom_in else 1.0 - progress))
+
+    # Visible window in base coordinates, panned across the spare margin
+    view_w, view_h = width / zoom, height / zoom
+    direction = 1.0 if index % 4 < 2 else -1.0
+    pan = 0.5 + direction * (progress - 0.5) * 0.8
+    x0 = (base_w - view_w) * pan
+    y0 = (base_h - view_h) * 0.5
+
+    matrix = np.array([[zoom, 0.0, -x0 * zoom], [0.0, zoom, -y0 * zoom]], dtype=np.float32)
+    return cv2.warpAffine(base, matrix, (width, height), flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REFLECT)
+
+
+def _caption_overlay(caption: str, width: int, height: int) -> Tuple[int, np.ndarray, np.ndarray]:
+    """
+    Pre-render the caption band once per video.
+
+    Returns:
+        (top row, premultiplied overlay, inverse alpha) for blending into the lower band
+    """
+    # OpenCV's Hershey fonts only cover ASCII; emoji and accents are dropped
+    text = caption.encode("ascii", "ignore").decode().strip()
+    lines = textwrap.wrap(text, width=26)[:4]
+    font, scale, thickness = cv2.FONT_HERSHEY_DUPLEX, 1.1, 2
+    line_height = int(cv2.getTextSize("Ag", font, scale, thickness)[0][1] * 1.9)
+    band_h = line_height * max(len(lines), 1) + 48
+    top = int(height * 0.72)
+
+    color = np.zeros((band_h, width, 3), dtype=np.uint8)
+    alpha = np.full((band_h, width), 0.45 if lines else 0.0, dtype=np.float32)
+    text_mask = np.zeros((band_h, width), dtype=np.uint8)
+    for i, line in enumerate(lines):
+        text_w = cv2.getTextSize(line, font, scale, thickness)[0][0]
+        origin = ((width - text_w) // 2, 24 + line_height * (i + 1) - line_height // 3)
+        cv2.putText(color, line, origin, font, scale, (255, 255, 255), thickness, cv2.LINE_AA)
+        cv2.putText(text_mask, line, origin, font, scale, 255, thickness, cv2.LINE_AA)
+    alpha = np.maximum(alpha, text_mask.astype(np.float32) / 255.0)[..., None]
+
+    visible = height - top
+    return top, (color.astype(np.float32) * alpha)[:visible], (1.0 - alpha)[:visible]
+
+
+def render_slideshow(image_paths: List[str], caption: str, output_path: str,
+                     duration: float = TIKTOK_VIDEO_LENGTH, fps: int = VIDEO_FPS,
+                     size: Tuple[int, int] = VIDEO_SIZE, fourcc: str = VIDEO_FOURCC) -> Dict[str, Any]:
+    """
+    Render one vertical slideshow video.
+
+    Runs in worker processes, so it only takes and returns plain values.
+    """
+    width, height = size
+    bases = []
+    for path in image_paths:
+        image = cv2.imread(path, cv2.IMREAD_COLOR)
+        if image is None:
+            logger.warning("Skipping unreadable image %s", path)
+            continue
+        bases.append(_cover_base(image, width, height))
+    if not bases:
+        raise ValueError("No readable images for slideshow")
+
+    total_frames = int(round(duration * fps))
+    slide_frames = total_frames / len(bases)
+    fade_frames = min(int(TRANSITION_SECONDS * fps), int(slide_frames // 2))
+    band_top, overlay, inverse_alpha = _caption_overlay(caption, width, height)
+    band = slice(band_top, band_top + overlay.shape[0])
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    writer = cv2.VideoWriter(str(output_path), cv2.VideoWriter_fourcc(*fourcc), fps, (width, height))
+    if not writer.isOpened():
+        raise IOError(f"Could not open video writer for {output_path} ({fourcc})")
+
+    try:
+        for n in range(total_frames):
+            index = min(int(n / slide_frames), len(bases) - 1)
+            local = n - index * slide_frames
+            # Each slide's motion spans its own frames plus the fade into the next one;
+            # slides after the first already moved through fade_frames while fading in
+            span = slide_frames + fade_frames
+            progress = (local + fade_frames) / span if index else local / span
+            frame = _ken_burns(bases[index], width, height, progress, index)
+
+            frames_left = slide_frames - local
+            if fade_frames and index + 1 < len(bases) and frames_left <= fade_frames:
+                t = 1.0 - frames_left / fade_frames
+                incoming = _ken_burns(bases[index + 1], width, height, (fade_frames - frames_left) / span, index + 1)
+                frame = cv2.addWeighted(frame, 1.0 - t, incoming, t, 0.0)
+
+            frame[band] = (frame[band] * inverse_alpha + overlay).astype(np.uint8)
+            writer.write(frame)
+    finally:
+        writer.release()
+
+    return {
+        "path": str(output_path),
+        "frames": total_frames,
+        "duration": total_frames / fps,
+        "images": len(bases)
+    }
+
+
+class SlideshowRenderer:
+    """Renders batches of TikTok slideshows, one video per worker process."""
+
+    def __init__(self, output_dir: Optional[Path] = None, duration: float = TIKTOK_VIDEO_LENGTH,
+                 fps: int = VIDEO_FPS, max_workers: Optional[int] = None):
+        """
+        Initialize the renderer.
+
+        Args:
+            output_dir: Where videos are written. Defaults to IMAGES_DIR/videos.
+            duration: Video length in seconds. Defaults to TIKTOK_VIDEO_LENGTH.
+            fps: Frame rate
+            max_workers: Process pool size. Defaults to VIDEO_WORKERS.
+        """
+        self.output_dir = Path(output_dir or VIDEO_DIR)
+        self.duration = duration
+        self.fps = fps
+        self.max_workers = max_workers or VIDEO_WORKERS
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                             mp_context=multiprocessing.get_context(POOL_START_METHOD))
+        return self._pool
+
+    def render_many(self, jobs: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Render several videos in parallel.
+
+        Args:
+            jobs: Video id -> {"images": [local paths], "caption": str}
+
+        Returns:
+            Video id -> render result, or {"error": ...} if that video failed
+        """
+        results = {}
+        pool = self._get_pool()
+        futures = {}
+        for video_id, job in jobs.items():
+            output_path = self.output_dir / f"{video_id}.mp4"
+            if not is_within(output_path, self.output_dir):
+                results[video_id] = {"error": f"Invalid video id: {video_id}"}
+                continue
+            futures[video_id] = pool.submit(render_slideshow, [str(p) for p in job["images"]], job.get("caption", ""),
+                                            str(output_path), self.duration, self.fps)
+
+        for video_id, future in futures.items():
+            try:
+                results[video_id] = future.result()
+            except Exception as e:
+                logger.error("Video render failed for %s: %s", video_id, e)
+                results[video_id] = {"error": str(e)}
+        return results
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
@@ -0,0 +1,101 @@
+"""
+Workflow Run - Isolated state for a single orchestrator workflow execution
+"""
+
+import uuid
+import threading
+from typing import Dict, Any, Optional, Callable
+from datetime import datetime
+
+from .events import publish
+
+
+def new_workflow_id() -> str:
+    """Generate a unique, timestamp-prefixed workflow id."""
+    return f"workflow_{datetime.now().strftime('%Y%m%dT%H%M%S')}_{uuid.uuid4().hex[:8]}"
+
+
+class WorkflowRun:
+    """
+    Holds the state of one workflow so concurrent workflows never share data.
+
+    Status moves pending -> running -> completed/failed. Phase outputs are
+    kept in `state` keyed by phase name.
+    """
+
+    def __init__(self, niche: str, num_images: int, num_listings: int, workflow_id: Optional[str] = None,
+                 on_change: Optional[Callable[[], Any]] = None):
+        self.workflow_id = workflow_id or new_workflow_id()
+        self.niche = niche
+        self.num_images = num_images
+        self.num_listings = num_listings
+        self.status = "pending"
+        self.current_phase: Optional[str] = None
+        self.state: Dict[str, Any] = {}
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.now().isoformat()
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+        self._lock = threading.Lock()
+        self._on_change = on_change
+
+    def _changed(self) -> None:
+        if self._on_change:
+            self._on_change()
+
+    @property
+    def is_active(self) -> bool:
+        """Whether the workflow is queued or running."""
+        return self.status in ("pending", "running")
+
+    def mark_running(self) -> None:
+        with self._lock:
+            self.status = "running"
+            self.started_at = datetime.now().isoformat()
+        self._changed()
+        publish("workflow.started", self.workflow_id, niche=self.niche)
+
+    def enter_phase(self, phase: str) -> None:
+        with self._lock:
+            self.current_phase = phase
+        self._changed()
+        publish("phase.started", self.workflow_id, phase=phase)
+
+    def record_phase(self, phase: str, output: Dict[str, Any]) -> None:
+        with self._lock:
+            self.state[phase] = output
+        self._changed()
+        publish("phase.finished", self.workflow_id, phase=phase)
+
+    def finish(self, result: Dict[str, Any]) -> None:
+        """Mark the workflow finished with its final result."""
+        with self._lock:
+            self.result = result
+            self.status = result.get("status", "completed")
+            self.error = result.get("error")
+            self.current_phase = None
+            self.finished_at = datetime.now().isoformat()
+        self._changed()
+        publish("workflow.finished", self.workflow_id, status=self.status, error=self.error)
+
+    def to_dict(self, include_state: bool = False) -> Dict[str, Any]:
+        """Serialize the workflow for API responses."""
+        with self._lock:
+            data = {
+                "workflow_id": self.workflow_id,
+                "niche": self.niche,
+                "num_images": self.num_images,
+                "num_listings": self.num_listings,
+                "status": self.status,
+                "current_phase": self.current_phase,
+                "completed_phases": list(self.state),
+                "error": self.error,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at
+            }
+            if include_state:
+                data["state"] = dict(self.state)
+                data["result"] = self.result
+            return data
@@ -1,5 +1,5 @@
 """Flask backend API for Etsy Automation System with Vue.js frontend"""
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, render_template, jsonify, request, send_file
 from flask_cors import CORS
 import os
 import logging
@@ -8,29 +8,64 @@ from datetime import datetime
 # Import agents
 from agents.orchestrator import OrchestratorAgent
 from agents.niche_discovery import NicheDiscoveryAgent
+from agents.niche_ranker import NicheRanker
 from agents.art_generation import ArtGenerationAgent
 from agents.listing_manager import ListingManagerAgent
 from agents.tiktok_manager import TikTokManagerAgent
-
-logging.basicConfig(level=logging.INFO)
+from agents.catalog_export import CatalogExporter
+from agents.derivative_cache import DerivativeCache, fingerprint
+from agents.events import event_bus
+from agents.image_io import is_allowed_image_url
+from agents.mockups import MockupRenderer
+from agents.model_router import latency_registry
+from agents.tag_analytics import TagAnalytics
+from agents.tracing import tracer
+from config.logging_config import setup_logging
+from config.settings import (MAX_PENDING_WORKFLOWS, NICHE_RANK_TOP_K, PROFILE_TOKEN, PROFILING_ENABLED,
+                             ROUTE_LIMITS)
+from web.admission import AdmissionController
+from web.http_cache import Compression, conditional
+from web.json_provider import FastJSONProvider
+from web.profiling import RequestProfiler
+from web.sse import event_stream, sse_response
+
+setup_logging()
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__, template_folder='templates', static_folder='static')
+app.json = FastJSONProvider(app)
 CORS(app)
+Compression(app)
+RequestProfiler(app, enabled=PROFILING_ENABLED, token=PROFILE_TOKEN)
 
 # Initialize agents
 orchestrator = OrchestratorAgent()
-niche_agent = NicheDiscoveryAgent()
+tag_analytics = TagAnalytics()
+niche_agent = NicheDiscoveryAgent(tag_analytics=tag_analytics)
+niche_ranker = NicheRanker(niche_agent, tag_analytics)
 art_agent = ArtGenerationAgent()
-listing_agent = ListingManagerAgent()
-tiktok_agent = TikTokManagerAgent()
+listing_agent = ListingManagerAgent(mockup_renderer=MockupRenderer(), tag_analytics=tag_analytics)
+tiktok_agent = TikTokManagerAgent(start_dispatcher=True)
+derivatives = DerivativeCache()
+catalog_exporter = CatalogExporter()
+admission = AdmissionController()
+
+def admit(name, methods=None, **gate_options):
+    """Admission gate for an expensive route group configured in ROUTE_LIMITS"""
+    limits = ROUTE_LIMITS[name]
+    return admission.limit(name, limits["concurrent"], limits["queue"], methods=methods, **gate_options)
 
 @app.route('/')
 def index():
     """Serve the main dashboard HTML"""
     return render_template('index.html')
 
+def system_version():
+    """Combined version of all agent stores, used as the /api/status ETag"""
+    return ".".join(str(agent.version.value) for agent in (orchestrator, art_agent, listing_agent, tiktok_agent))
+
 @app.route('/api/status')
+@conditional('status', system_version)
 def get_status():
     """Get system status"""
     return jsonify({
@@ -46,6 +81,7 @@ def get_status():
     })
 
 @app.route('/api/workflow', methods=['POST'])
+@admit('workflow', backlog=orchestrator.pending_count, max_backlog=MAX_PENDING_WORKFLOWS)
 def start_workflow():
     """Start automation workflow for a niche"""
     try:
@@ -57,15 +93,56 @@ def start_workflow():
         if not niche:
             return jsonify({"error": "Niche is required"}), 400
 
-        logger.info(f"Starting workflow for niche: {niche}")
+        if data.get('async'):
+            run = orchestrator.submit_workflow(niche, num_images, num_listings)
+            return jsonify({**run.to_dict(), "events_url": f"/api/events?workflow_id={run.workflow_id}"}), 202
+
+        logger.info("Starting workflow for niche: %s", niche)
         result = orchestrator.run_workflow(niche, num_images, num_listings)
 
         return jsonify(result)
     except Exception as e:
-        logger.error(f"Workflow failed: {str(e)}")
+        logger.error("Workflow failed: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/workflows')
+@conditional('workflows', lambda: orchestrator.version.value)
+def list_workflows():
+    """List live and finished workflows, optionally filtered by status or niche"""
+    try:
+        workflows = orchestrator.list_workflows(
+            status=request.args.get('status'),
+            niche=request.args.get('niche'),
+            active_only=request.args.get('active') == 'true'
+        )
+        return jsonify({"workflows": workflows})
+    except Exception as e:
+        logger.error("Failed to list workflows: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/workflows/<workflow_id>')
+def get_workflow(workflow_id):
+    """Get the status and phase outputs of a single workflow"""
+    result = orchestrator.get_workflow_status(workflow_id)
+    if "error" in result and "status" not in result:
+        return jsonify(result), 404
+    return jsonify(result)
+
+@app.route('/api/workflow/<workflow_id>/resume', methods=['POST'])
+@admit('workflow', backlog=orchestrator.pending_count, max_backlog=MAX_PENDING_WORKFLOWS)
+def resume_workflow(workflow_id):
+    """Resume a failed or interrupted workflow from its last checkpoint"""
+    try:
+        result = orchestrator.resume_workflow(workflow_id)
+        if "error" in result and "status" not in result:
+            return jsonify(result), 404
+        return jsonify(result)
+    except Exception as e:
+        logger.error("Workflow resume failed: %s", e)
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/niche/analyze', methods=['POST'])
+@admit('niche_analysis')
 def analyze_niche():
     """Analyze a niche"""
     try:
@@ -75,12 +152,53 @@ def analyze_niche():
         if not niche:
             return jsonify({"error": "Niche is required"}), 400
 
-        logger.info(f"Analyzing niche: {niche}")
+        logger.info("Analyzing niche: %s", niche)
         result = niche_agent.analyze_niche(niche)
 
         return jsonify(result)
     except Exception as e:
-        logger.error(f"Niche analysis failed: {str(e)}")
+        logger.error("Niche analysis failed: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/niche/related')
+def get_related_niches():
+    """Find analyzed niches and keywords similar to a niche"""
+    niche = request.args.get('niche')
+    if not niche:
+        return jsonify({"error": "Niche is required"}), 400
+
+    limit = min(request.args.get('limit', 5, type=int), 50)
+    result = niche_agent.related_niches(niche, limit)
+    if result.get("status") == "failed":
+        return jsonify(result), 502
+    return jsonify(result)
+
+@app.route('/api/niche/rank', methods=['POST'])
+@admit('niche_analysis')
+def rank_niches():
+    """Screen candidate niches locally and run the full analysis on the top K"""
+    try:
+        data = request.json or {}
+        candidates = data.get('candidates')
+        if not candidates or not isinstance(candidates, list):
+            return jsonify({"error": "candidates must be a non-empty list of niches"}), 400
+        if len(candidates) > 5000:
+            return jsonify({"error": "At most 5000 candidates per request"}), 400
+
+        sales = data.get('sales')
+        if sales is not None and not (
+                isinstance(sales, dict)
+                and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in sales.values())):
+            return jsonify({"error": "sales must be an object mapping tags to numbers"}), 400
+        try:
+            top_k = max(0, min(int(data.get('top_k', NICHE_RANK_TOP_K)), 50))
+        except (TypeError, ValueError):
+            return jsonify({"error": "top_k must be an integer"}), 400
+
+        result = niche_ranker.rank([str(c) for c in candidates], top_k=top_k, sales=sales)
+        return jsonify(result)
+    except Exception as e:
+        logger.error("Niche ranking failed: %s", e)
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/trending-niches')
@@ -90,10 +208,11 @@ def get_trending_niches():
         trending = niche_agent.get_trending_niches(limit=10)
         return jsonify({"niches": trending})
     except Exception as e:
-        logger.error(f"Failed to get trending niches: {str(e)}")
+        logger.error("Failed to get trending niches: %s", e)
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/images/generate', methods=['POST'])
+@admit('image_generation')
 def generate_images():
     """Generate art images"""
     try:
@@ -104,40 +223,193 @@ def generate_images():
         if not niche:
             return jsonify({"error": "Niche is required"}), 400
 
-        logger.info(f"Generating {num_images} images for {niche}")
-        result = art_agent.generate_images(niche, num_images)
+        logger.info("Generating %s images for %s", num_images, niche)
+        result = art_agent.generate_images(niche, num_images, two_tier=data.get('two_tier'))
 
         return jsonify(result)
     except Exception as e:
-        logger.error(f"Image generation failed: {str(e)}")
+        logger.error("Image generation failed: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/images/<image_id>/<size>')
+def get_image_derivative(image_id, size):
+    """Serve a cached WebP thumbnail or preview of a generated image"""
+    image = art_agent.get_image(image_id)
+    if not image:
+        return jsonify({"error": "Image not found"}), 404
+    if size not in derivatives.sizes:
+        return jsonify({"error": f"Unknown size: {size}"}), 404
+
+    try:
+        path = derivatives.get(image_id, image["url"], size)
+    except Exception as e:
+        logger.error("Derivative %s for %s failed: %s", size, image_id, e)
+        return jsonify({"error": str(e)}), 502
+
+    response = send_file(path, mimetype="image/webp", max_age=31536000, conditional=True)
+    if request.args.get('v') == fingerprint(image["url"]):
+        # Versioned URLs always name the same bytes; ids alone are reused on regeneration
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    else:
+        response.headers["Cache-Control"] = "no-cache"
+    return response
+
+@app.route('/api/images/export', methods=['POST'])
+@admit('print_export')
+def export_images():
+    """Render generated images into print-size files"""
+    try:
+        data = request.json or {}
+        image_ids = data.get('image_ids', [])
+        sizes = data.get('sizes')
+
+        if not image_ids:
+            return jsonify({"error": "image_ids is required"}), 400
+
+        logger.info("Exporting %s images for print", len(image_ids))
+        exports = art_agent.export_batch(image_ids, sizes)
+
+        return jsonify({"exports": exports, "total": len(exports)})
+    except Exception as e:
+        logger.error("Print export failed: %s", e)
         return jsonify({"error": str(e)}), 500
 
+def resolve_listing_image(data):
+    """
+    Validate the image of a listing create/update body in place.
+
+    `image_id` names a generated image and is swapped for its URL; an
+    `image_url` must be http(s) on an allowed host. Local paths and other
+    hosts are refused, since the server fetches the image for mockups and
+    uploads it to Etsy. Returns an error message, or None if acceptable.
+    """
+    image_id = data.pop('image_id', None)
+    if image_id is not None:
+        image = art_agent.get_image(str(image_id))
+        if not image:
+            return "Unknown image id"
+        data['image_url'] = image['url']
+    elif 'image_url' in data and not is_allowed_image_url(data['image_url']):
+        return "image_url must be an http(s) URL on an allowed image host; or pass image_id"
+    return None
+
 @app.route('/api/listings', methods=['GET', 'POST'])
+@admit('listing_creation', methods=['POST'])
+@conditional('listings', lambda: listing_agent.version.value)
 def manage_listings():
     """Get or create listings"""
     try:
         if request.method == 'GET':
+            query = request.args.get('q', '').strip()
+            if query:
+                limit = min(request.args.get('limit', 20, type=int), 100)
+                offset = request.args.get('offset', 0, type=int)
+                listings = listing_agent.search_listings(query, limit, offset)
+                return jsonify({"listings": listings, "query": query, "count": len(listings)})
             listings = listing_agent.get_listings()
             return jsonify({"listings": listings})
         else:
-            data = request.json
+            data = request.json or {}
+            error = resolve_listing_image(data)
+            if error:
+                return jsonify({"error": error}), 400
             result = listing_agent.create_listing(**data)
             return jsonify(result)
     except Exception as e:
-        logger.error(f"Listing management failed: {str(e)}")
+        logger.error("Listing management failed: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/listings/similar')
+def get_similar_listings():
+    """Find listings similar to free text (?q=) or to another listing (?listing_id=)"""
+    query = request.args.get('q')
+    listing_id = request.args.get('listing_id')
+    if not query and not listing_id:
+        return jsonify({"error": "q or listing_id is required"}), 400
+
+    try:
+        limit = min(request.args.get('limit', 10, type=int), 100)
+        listings = listing_agent.similar_listings(query=query, listing_id=listing_id, limit=limit)
+        return jsonify({"listings": listings, "count": len(listings)})
+    except Exception as e:
+        logger.error("Similar listing lookup failed: %s", e)
+        return jsonify({"error": str(e)}), 502
+
+@app.route('/api/listings/<listing_id>', methods=['PATCH'])
+def update_listing(listing_id):
+    """Update a listing's title, description, price, tags or image"""
+    try:
+        data = request.json or {}
+        error = resolve_listing_image(data)
+        if error:
+            return jsonify({"error": error}), 400
+        result = listing_agent.update_listing(listing_id, **data)
+
+        if result.get("error") == "Listing not found":
+            return jsonify(result), 404
+        if "error" in result:
+            return jsonify(result), 400
+        return jsonify(result)
+    except Exception as e:
+        logger.error("Listing update failed: %s", e)
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/listings/<listing_id>/publish', methods=['POST'])
+@admit('publishing')
 def publish_listing(listing_id):
     """Publish a listing"""
     try:
         result = listing_agent.publish_listing(listing_id)
         return jsonify(result)
     except Exception as e:
-        logger.error(f"Listing publish failed: {str(e)}")
+        logger.error("Listing publish failed: %s", e)
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/listings/publish', methods=['POST'])
+@admit('publishing')
+def bulk_publish_listings():
+    """Publish several listings with overlapping uploads"""
+    try:
+        data = request.json
+        listing_ids = data.get('listing_ids')
+
+        if not listing_ids:
+            return jsonify({"error": "listing_ids is required"}), 400
+
+        results = listing_agent.bulk_publish(listing_ids)
+        return jsonify({"results": results})
+    except Exception as e:
+        logger.error("Bulk publish failed: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/tags/suggest')
+def suggest_tags():
+    """Suggest listing tags from catalog co-occurrence and niche keywords"""
+    tags = [t for t in request.args.get('tags', '').split(',') if t.strip()]
+    niche = request.args.get('niche')
+    limit = min(request.args.get('limit', 13, type=int), 50)
+
+    if not tags and not niche:
+        return jsonify({"error": "tags or niche is required"}), 400
+
+    suggestions = tag_analytics.suggest_tags(tags, niche=niche, limit=limit)
+    return jsonify({"suggestions": suggestions, "count": len(suggestions)})
+
+@app.route('/api/analytics/tags')
+def get_tag_analytics():
+    """Catalog tag statistics, top tag pairs and keyword frequencies"""
+    niche = request.args.get('niche')
+    keywords = tag_analytics.keyword_table(niche).head(50)
+    overlap = tag_analytics.niche_overlap()
+    return jsonify({
+        "stats": tag_analytics.stats(),
+        "top_pairs": tag_analytics.top_pairs(),
+        "keywords": keywords.reset_index().to_dict(orient="records"),
+        "niche_overlap": overlap.to_dict() if not niche else {}
+    })
+
 @app.route('/api/tiktok/posts', methods=['GET', 'POST'])
+@conditional('tiktok-posts', lambda: tiktok_agent.version.value)
 def manage_tiktok_posts():
     """Get or create TikTok posts"""
     try:
@@ -149,10 +421,47 @@ def manage_tiktok_posts():
             result = tiktok_agent.schedule_post(**data)
             return jsonify(result)
     except Exception as e:
-        logger.error(f"TikTok post management failed: {str(e)}")
+        logger.error("TikTok post management failed: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/tiktok/videos', methods=['POST'])
+@admit('video_rendering')
+def create_tiktok_videos():
+    """Render slideshow videos from images and schedule them"""
+    try:
+        data = request.json or {}
+        niche = data.get('niche')
+        image_ids = data.get('image_ids')
+        image_urls = data.get('image_urls')
+
+        if not niche:
+            return jsonify({"error": "Niche is required"}), 400
+        # Only generated images are rendered: arbitrary paths or URLs would let
+        # clients read server files or make the server fetch internal hosts
+        if image_ids:
+            images = [art_agent.get_image(str(image_id)) for image_id in image_ids]
+            if not all(images):
+                return jsonify({"error": "Unknown image id"}), 400
+            image_urls = [img["url"] for img in images]
+        elif image_urls:
+            known = {img["url"] for img in art_agent.get_generated_images()}
+            if not all(url in known for url in image_urls):
+                return jsonify({"error": "image_urls must be generated images; pass image_ids"}), 400
+        else:
+            image_urls = [img["url"] for img in art_agent.get_generated_images(niche)]
+
+        posts = tiktok_agent.create_video_posts(
+            niche, image_urls,
+            num_videos=data.get('num_videos', 1),
+            images_per_video=data.get('images_per_video', 5)
+        )
+        return jsonify({"posts": posts, "total": len(posts)})
+    except Exception as e:
+        logger.error("TikTok video creation failed: %s", e)
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/tiktok/captions', methods=['POST'])
+@admit('captions')
 def generate_captions():
     """Generate TikTok captions"""
     try:
@@ -166,17 +475,88 @@ def generate_captions():
         captions = tiktok_agent.generate_captions(niche, num_captions)
         return jsonify({"captions": captions})
     except Exception as e:
-        logger.error(f"Caption generation failed: {str(e)}")
+        logger.error("Caption generation failed: %s", e)
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/admission')
+def get_admission_stats():
+    """Rate limiting and load shedding counters per route group"""
+    return jsonify(admission.stats())
+
+@app.route('/api/models')
+def get_model_routing():
+    """Get the task-to-model routing table and observed latency per model"""
+    return jsonify({
+        "routes": niche_agent.router.describe(),
+        "latency": latency_registry.snapshot()
+    })
+
+@app.route('/api/catalog/export', methods=['POST'])
+@admit('catalog_export')
+def export_catalog():
+    """Export listings, images or posts to Etsy CSV, CSV or Parquet"""
+    data = request.json or {}
+    entity = data.get('entity', 'listings')
+    sources = {
+        "listings": listing_agent.listings,
+        "images": art_agent.generated_images,
+        "posts": tiktok_agent.scheduled_posts
+    }
+    if entity not in sources:
+        return jsonify({"error": f"entity must be one of {sorted(sources)}"}), 400
+    try:
+        result = catalog_exporter.export(
+            sources[entity], entity,
+            fmt=data.get('format', 'csv'),
+            columns=data.get('columns'),
+            niche=data.get('niche'),
+            status=data.get('status')
+        )
+        result["download_url"] = f"/api/catalog/exports/{result.pop('file')}"
+        result.pop("path")
+        return jsonify(result)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.error("Catalog export failed: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/catalog/exports/<name>')
+def download_catalog_export(name):
+    """Download a finished catalog export"""
+    path = catalog_exporter.output_dir / name
+    if path.name != name or name.startswith(".") or not path.is_file():
+        return jsonify({"error": "Export not found"}), 404
+    return send_file(path, as_attachment=True)
+
+@app.route('/api/trace')
+def get_trace():
+    """Recorded spans in Chrome trace-event format (open in chrome://tracing or Perfetto)"""
+    trace = tracer.export(
+        trace_id=request.args.get('workflow_id') or request.args.get('trace_id'),
+        cat=request.args.get('cat')
+    )
+    return jsonify(trace)
+
+@app.route('/api/events')
+def stream_events():
+    """Stream workflow progress as server-sent events, optionally for one workflow"""
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        return jsonify({"error": "Last-Event-ID must be an integer"}), 400
+    return sse_response(event_stream(event_bus, last_event_id, request.args.get('workflow_id')))
+
 @app.route('/api/workflow/history')
+@conditional('workflow-history', lambda: orchestrator.version.value)
 def get_workflow_history():
     """Get workflow execution history"""
     try:
         history = orchestrator.get_execution_history()
         return jsonify({"history": history})
     except Exception as e:
-        logger.error(f"Failed to get history: {str(e)}")
+        logger.error("Failed to get history: %s", e)
         return jsonify({"error": str(e)}), 500
 
 if __name__ == '__main__':
@@ -196,38 +576,37 @@ batch_agent = BatchGeneratorAgent()
 @app.route('/api/bundles/generate', methods=['POST'])
 def generate_bundle():
     """Generate a batch of themed images"""
-        try:
-                data = request.get_json()
-                        theme = data.get('theme')
-                                count = data.get('count', 50)
-                                        
-                                                if not theme:
-                                                            return jsonify({'error': 'Theme is required'}), 400
-                                                                    
-                                                                            # Generate batch
-                                                                                    result = batch_agent.generate_batch(theme, count)
-                                                                                            
-                                                                                                    return jsonify(result), 200 if result['status'] == 'success' else 400
-                                                                                                            
-                                                                                                                except Exception as e:
-                                                                                                                        logger.error(f"Error generating bundle: {str(e)}")
-                                                                                                                                return jsonify({'error': str(e)}), 500
-
-                                                                                                                                @app.route('/api/bundles/<batch_id>/status', methods=['GET'])
-                                                                                                                                def get_bundle_status(batch_id):
-                                                                                                                                    """Get status of a batch generation"""
-                                                                                                                                        try:
-                                                                                                                                                result = batch_agent.get_batch_status(batch_id)
-                                                                                                                                                        return jsonify(result), 200
-                                                                                                                                                            except Exception as e:
-                                                                                                                                                                    logger.error(f"Error getting bundle status: {str(e)}")
-                                                                                                                                                                            return jsonify({'error': str(e)}), 500
-
-                                                                                                                                                                            @app.route('/api/bundles/themes', methods=['GET'])
-                                                                                                                                                                            def get_available_themes():
-                                                                                                                                                                                """Get list of available bundle themes"""
-                                                                                                                                                                                    return jsonify({
-                                                                                                                                                                                            'themes': list(batch_agent.theme_templates.keys()),
-                                                                                                                                                                                                    'description': 'Available themes for bundle generation'
-                                                                                                                                                                                                        }), 200
-                                                                                                                                                                                                        
\ No newline at end of file
+    try:
+        data = request.get_json()
+        theme = data.get('theme')
+        count = data.get('count', 50)
+
+        if not theme:
+            return jsonify({'error': 'Theme is required'}), 400
+
+        # Generate batch
+        result = batch_agent.generate_batch(theme, count)
+
+        return jsonify(result), 200 if result['status'] == 'success' else 400
+
+    except Exception as e:
+        logger.error("Error generating bundle: %s", e)
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/bundles/<batch_id>/status', methods=['GET'])
+def get_bundle_status(batch_id):
+    """Get status of a batch generation"""
+    try:
+        result = batch_agent.get_batch_status(batch_id)
+        return jsonify(result), 200
+    except Exception as e:
+        logger.error("Error getting bundle status: %s", e)
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/bundles/themes', methods=['GET'])
+def get_available_themes():
+    """Get list of available bundle themes"""
+    return jsonify({
+        'themes': list(batch_agent.theme_templates.keys()),
+        'description': 'Available themes for bundle generation'
+    }), 200
@@ -0,0 +1,195 @@
+"""
+Logging setup - non-blocking, structured, rotated
+Application threads only put records on an in-memory queue; a single
+listener thread formats them (JSON by default) and writes them to a
+size-rotated file and the console. High-volume per-item lines can be
+sampled before they are ever queued. Process-pool workers put their
+records on a queue drained by the parent, so one process owns the file.
+"""
+
+import os
+import json
+import queue
+import atexit
+import logging
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from config.settings import (LOG_BACKUP_COUNT, LOG_DIR, LOG_FORMAT, LOG_JSON, LOG_LEVEL, LOG_MAX_BYTES,
+                             LOG_SAMPLE_RATE)
+
+# Attributes every LogRecord has; anything else came from `extra=` and is emitted as a field
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+_SAFE_ARG_TYPES = (str, int, float, bool, type(None))
+
+_listener: Optional[QueueListener] = None
+_listener_pid: Optional[int] = None
+_handlers: List[logging.Handler] = []
+_setup_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with the message, context and any `extra=` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "thread": record.threadName,
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and key != "sample" and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep 1 in `rate` of the records logged with extra={"sample": True}.
+
+    Sampling is per call site (logger + message template), so a noisy
+    per-item line never crowds out a different one. Kept records carry
+    `sampled_every` so readers can scale counts back up.
+    """
+
+    def __init__(self, rate: int = LOG_SAMPLE_RATE):
+        super().__init__()
+        self.rate = max(1, rate)
+        self._counts: Dict[tuple, int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, "sample", False) or self.rate == 1:
+            return True
+        key = (record.name, record.msg)
+        count = self._counts.get(key, 0)
+        self._counts[key] = count + 1
+        if count % self.rate:
+            return False
+        record.sampled_every = self.rate
+        return True
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler that leaves %-formatting to the listener thread.
+
+    The stock handler renders every message on the calling thread. Here
+    records whose args are all immutable scalars are queued as-is; only
+    records with other argument types (which could change before the
+    listener runs) are rendered eagerly.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = logging.makeLogRecord(vars(record))
+        args = record.args
+        if args and not (isinstance(args, tuple) and all(isinstance(a, _SAFE_ARG_TYPES) for a in args)):
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def setup_logging(level: str = LOG_LEVEL, log_file: Optional[Path] = None, json_format: bool = LOG_JSON,
+                  console: bool = True) -> QueueListener:
+    """
+    Route all logging through a background listener. Safe to call more than once.
+
+    A forked child (e.g. a process-pool worker) inherits the configuration
+    but not the listener thread, so calling this again there starts its own.
+
+    Args:
+        level: Root log level
+        log_file: Rotating log file. Defaults to LOG_DIR/etsy_automation.log.
+        json_format: Emit JSON lines instead of LOG_FORMAT text
+        console: Also write to stdout
+
+    Returns:
+        The running QueueListener
+    """
+    global _listener, _listener_pid, _handlers
+    with _setup_lock:
+        if _listener is not None and _listener_pid == os.getpid():
+            return _listener
+
+        formatter = JsonFormatter() if json_format else logging.Formatter(LOG_FORMAT)
+        handlers = []
+        file_handler = RotatingFileHandler(log_file or LOG_DIR / "etsy_automation.log",
+                                           maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT,
+                                           encoding="utf-8")
+        handlers.append(file_handler)
+        if console:
+            handlers.append(logging.StreamHandler())
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        log_queue = queue.SimpleQueue()
+        queue_handler = DeferredQueueHandler(log_queue)
+        queue_handler.addFilter(SamplingFilter())
+
+        root = logging.getLogger()
+        for existing in list(root.handlers):
+            root.removeHandler(existing)
+        root.addHandler(queue_handler)
+        root.setLevel(level)
+
+        _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        _listener_pid = os.getpid()
+        _handlers = handlers
+        atexit.register(shutdown_logging)
+        return _listener
+
+
+def setup_worker_logging(log_queue, level: str = LOG_LEVEL) -> None:
+    """
+    Process-pool initializer that sends every record to the parent process.
+
+    Workers never open the log file themselves; several RotatingFileHandlers
+    on one file would interleave writes and rotate it out from under each
+    other. The parent drains `log_queue` with `start_worker_listener`.
+
+    Args:
+        log_queue: multiprocessing queue shared with the parent
+        level: Root log level in the worker
+    """
+    queue_handler = DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter())
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+
+def start_worker_listener(log_queue) -> QueueListener:
+    """
+    Write records queued by `setup_worker_logging` workers through this process's handlers.
+
+    Returns:
+        The running listener; stop() it once the workers have exited
+    """
+    setup_logging()
+    listener = QueueListener(log_queue, *_handlers, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    with _setup_lock:
+        if _listener is not None and _listener_pid == os.getpid():
+            _listener.stop()
+            _listener = None
@@ -10,9 +10,15 @@ DATA_DIR = BASE_DIR / "data"
 LOG_DIR = BASE_DIR / "logs"
 IMAGES_DIR = DATA_DIR / "images"
 DATABASE_DIR = DATA_DIR / "database"
+CHECKPOINT_DIR = DATA_DIR / "checkpoints"
+PRINT_EXPORT_DIR = DATA_DIR / "exports"
+EMBEDDING_DIR = DATA_DIR / "embeddings"
+HISTORY_DIR = DATA_DIR / "history"
+CATALOG_EXPORT_DIR = DATA_DIR / "catalog_exports"
 
 # Create directories
-for directory in [DATA_DIR, LOG_DIR, IMAGES_DIR, DATABASE_DIR]:
+for directory in [DATA_DIR, LOG_DIR, IMAGES_DIR, DATABASE_DIR, CHECKPOINT_DIR, PRINT_EXPORT_DIR, EMBEDDING_DIR,
+                  HISTORY_DIR, CATALOG_EXPORT_DIR]:
       directory.mkdir(exist_ok=True)
 
 # API Keys
@@ -28,14 +34,49 @@ DATABASE_URL = f"sqlite:///{DATABASE_DIR}/etsy_automation.db"
 
 # Models
 GPT_MODEL = "gpt-4-turbo"
+FAST_GPT_MODEL = os.getenv("FAST_GPT_MODEL", "gpt-4o-mini")
+VISION_MODEL = os.getenv("VISION_MODEL", "gpt-4o")
+# Quality classes used by the model router; cheap tasks go to the "fast" tier
+MODEL_TIERS = {
+      "quality": os.getenv("QUALITY_GPT_MODEL", GPT_MODEL),
+      "fast": FAST_GPT_MODEL,
+      "vision": VISION_MODEL
+}
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+# Point at a local OpenAI-compatible server to build and query embeddings offline
+EMBEDDING_BASE_URL = os.getenv("EMBEDDING_BASE_URL")
 DALLE_MODEL = "dall-e-3"
-VISION_MODEL = "gpt-4-vision"
 
 # Image Generation
 IMAGE_SIZE = "1024x1024"
 IMAGE_QUALITY = "hd"
+# Hosts (and their subdomains) that client-supplied listing image URLs may point at
+ALLOWED_IMAGE_HOSTS = [h.strip().lower() for h in
+                       os.getenv("ALLOWED_IMAGE_HOSTS", "oaidalleapiprodscus.blob.core.windows.net").split(",")
+                       if h.strip()]
+# Two-tier mode: standard-quality drafts are screened and only survivors regenerated in HD
+TWO_TIER_GENERATION = os.getenv("TWO_TIER_GENERATION", "false").lower() == "true"
+DRAFT_QUALITY = "standard"
+DRAFT_VISION_CHECK = os.getenv("DRAFT_VISION_CHECK", "false").lower() == "true"
+# Drafts whose dHashes differ in at most this many of 64 bits count as duplicates
+DRAFT_DEDUPE_DISTANCE = int(os.getenv("DRAFT_DEDUPE_DISTANCE", "6"))
+DRAFT_SCREEN_WORKERS = int(os.getenv("DRAFT_SCREEN_WORKERS", "8"))
 TARGET_DPI = 300
 BATCH_SIZE = 50
+# Print sizes in inches (width, height), rendered at TARGET_DPI
+PRINT_SIZES = {
+      "5x7": (5, 7),
+      "8x10": (8, 10),
+      "11x14": (11, 14),
+      "16x20": (16, 20)
+}
+PRINT_EXPORT_WORKERS = int(os.getenv("PRINT_EXPORT_WORKERS", str(os.cpu_count() or 1)))
+# Image worker pools start clean processes rather than forking the threaded web server
+POOL_START_METHOD = os.getenv("POOL_START_METHOD", "spawn" if os.name == "nt" else "forkserver")
+# Rows buffered per chunk when exporting the catalog to CSV/Parquet
+CATALOG_EXPORT_CHUNK_ROWS = int(os.getenv("CATALOG_EXPORT_CHUNK_ROWS", "10000"))
+DERIVATIVE_CACHE_MAX_BYTES = int(os.getenv("DERIVATIVE_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+MOCKUP_WORKERS = int(os.getenv("MOCKUP_WORKERS", str(os.cpu_count() or 1)))
 
 # Etsy
 ETSY_BASE_URL = "https://api.etsy.com/v3"
@@ -46,6 +87,9 @@ ETSY_DEFAULT_PRICE = 24.99
 TIKTOK_BASE_URL = "https://open.tiktok.com/v1"
 TIKTOK_VIDEO_LENGTH = 15
 TIKTOK_POSTING_INTERVAL = 86400
+# mp4v works with stock OpenCV wheels; use avc1 where an H.264 encoder is available
+VIDEO_FOURCC = os.getenv("VIDEO_FOURCC", "mp4v")
+VIDEO_WORKERS = int(os.getenv("VIDEO_WORKERS", str(os.cpu_count() or 1)))
 
 # Scheduling
 SCHEDULER_TIMEZONE = "UTC"
@@ -58,7 +102,51 @@ BACKOFF_FACTOR = 2
 TIMEOUT_SECONDS = 30
 MIN_IMAGE_QUALITY_SCORE = 0.7
 MAX_CONCURRENT_UPLOADS = 5
+MAX_CONCURRENT_WORKFLOWS = int(os.getenv("MAX_CONCURRENT_WORKFLOWS", "4"))
+
+# Admission control for expensive API routes
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+# Per-client token bucket shared by the limited routes: sustained requests per minute and burst size
+CLIENT_RATE_PER_MINUTE = float(os.getenv("CLIENT_RATE_PER_MINUTE", "30"))
+CLIENT_BURST = int(os.getenv("CLIENT_BURST", "10"))
+# Route group -> requests handled at once and requests allowed to wait for a slot
+ROUTE_LIMITS = {
+      "workflow": {"concurrent": MAX_CONCURRENT_WORKFLOWS, "queue": MAX_CONCURRENT_WORKFLOWS * 2},
+      "image_generation": {"concurrent": 2, "queue": 4},
+      "niche_analysis": {"concurrent": 4, "queue": 8},
+      "print_export": {"concurrent": 2, "queue": 4},
+      "publishing": {"concurrent": 2, "queue": 4},
+      "video_rendering": {"concurrent": 1, "queue": 2},
+      "catalog_export": {"concurrent": 2, "queue": 4},
+      "listing_creation": {"concurrent": 4, "queue": 8},
+      "captions": {"concurrent": 4, "queue": 8}
+}
+# Seconds a queued request waits for a slot before being shed
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "30"))
+# Async workflow submissions are shed once this many are waiting for the executor
+MAX_PENDING_WORKFLOWS = int(os.getenv("MAX_PENDING_WORKFLOWS", "20"))
+# Niche ranking: candidates sent on to the full GPT analysis, and how long and how many analyses are reused
+NICHE_RANK_TOP_K = int(os.getenv("NICHE_RANK_TOP_K", "5"))
+NICHE_ANALYSIS_CACHE_TTL = int(os.getenv("NICHE_ANALYSIS_CACHE_TTL", str(24 * 3600)))
+NICHE_ANALYSIS_CACHE_SIZE = int(os.getenv("NICHE_ANALYSIS_CACHE_SIZE", "1000"))
+# Records per agent history kept in memory; older ones spill to HISTORY_DIR
+HISTORY_HOT_SIZE = int(os.getenv("HISTORY_HOT_SIZE", "1000"))
 
 # Logging
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+LOG_JSON = os.getenv("LOG_JSON", "true").lower() == "true"
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+# Keep 1 in N of the per-item lines logged with extra={"sample": True}
+LOG_SAMPLE_RATE = int(os.getenv("LOG_SAMPLE_RATE", "20"))
+
+# Tracing and profiling
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "true").lower() == "true"
+TRACE_BUFFER_SIZE = int(os.getenv("TRACE_BUFFER_SIZE", "50000"))
+# Workflow progress events replayable after a reconnect, and SSE keepalive interval
+EVENT_BUFFER_SIZE = int(os.getenv("EVENT_BUFFER_SIZE", "5000"))
+EVENT_HEARTBEAT_SECONDS = int(os.getenv("EVENT_HEARTBEAT_SECONDS", "15"))
+# Per-request cProfile dumps (X-Profile header / ?profile=1); off unless explicitly enabled
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN")
@@ -1,31 +1,192 @@
 """
 Etsy Print Art Automation System - Main Entry Point
 Complete AI-powered automation for Etsy print-on-demand business
+
+Usage:
+    python main.py                                 # startup banner
+    python main.py run niches.csv --workers 8      # bulk pipeline run
+    python main.py run niches.jsonl --dry-run      # show what would run
+
+Bulk input is a CSV with a "niche" column or a JSONL file of objects with
+a "niche" key; optional num_images / num_listings override the defaults
+per row. Finished niches are recorded in a manifest next to the input, so
+rerunning the same command after an interruption only runs what is left,
+and interrupted workflows resume from their checkpoints.
 """
-import os
-import logging
+import csv
 import sys
+import json
+import hashlib
+import logging
+import argparse
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import datetime
 from pathlib import Path
-from dotenv import load_dotenv
+from typing import Dict, Any, List, Optional
 
-# Load environment
-load_dotenv()
-
-# Setup logging
-logging.basicConfig(
-      level=os.getenv("LOG_LEVEL", "INFO"),
-      format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-      handlers=[
-                logging.FileHandler("logs/etsy_automation.log"),
-                logging.StreamHandler(sys.stdout)
-      ]
-)
+from config.logging_config import setup_logging, setup_worker_logging, start_worker_listener
+from config.settings import LOG_LEVEL, POOL_START_METHOD
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_IMAGES = 50
+DEFAULT_LISTINGS = 10
+
+_orchestrator = None
+_orchestrator_lock = threading.Lock()
+
+
+def load_jobs(path: Path, num_images: int = DEFAULT_IMAGES, num_listings: int = DEFAULT_LISTINGS) -> List[Dict[str, Any]]:
+    """
+    Read niches from a CSV or JSONL file into job dicts.
+
+    Each job gets a workflow id derived from its parameters, so the same
+    row always maps to the same checkpoint. Duplicate rows are dropped.
+
+    Raises:
+        ValueError: If the file type is unsupported or a row has no niche
+    """
+    suffix = path.suffix.lower()
+    with open(path, newline="", encoding="utf-8") as f:
+        if suffix == ".csv":
+            rows = list(csv.DictReader(f))
+        elif suffix in (".jsonl", ".ndjson"):
+            rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            raise ValueError(f"Unsupported input type {suffix!r}; use .csv or .jsonl")
+
+    jobs: Dict[str, Dict[str, Any]] = {}
+    for line_no, row in enumerate(rows, 1):
+        niche = " ".join(str(row.get("niche") or "").split())
+        if not niche:
+            raise ValueError(f"{path.name} row {line_no}: missing niche")
+        job = {
+            "niche": niche,
+            "num_images": int(row.get("num_images") or num_images),
+            "num_listings": int(row.get("num_listings") or num_listings)
+        }
+        digest = hashlib.sha1(json.dumps(job, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+        job["workflow_id"] = f"cli_{niche.lower().replace(' ', '_')[:40]}_{digest}"
+        jobs.setdefault(job["workflow_id"], job)
+    return list(jobs.values())
+
+
+def read_manifest(path: Path) -> Dict[str, Dict[str, Any]]:
+    """Latest manifest entry per workflow id."""
+    entries: Dict[str, Dict[str, Any]] = {}
+    if not path.exists():
+        return entries
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # A run killed mid-write leaves a partial last line
+                continue
+            entries[entry["workflow_id"]] = entry
+    return entries
+
+
+def _run_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one workflow. Top-level so process pools can pickle it."""
+    global _orchestrator
+    with _orchestrator_lock:
+        if _orchestrator is None:
+            from agents.orchestrator import OrchestratorAgent
+            _orchestrator = OrchestratorAgent()
+    try:
+        result = _orchestrator.run_workflow(job["niche"], job["num_images"], job["num_listings"],
+                                            workflow_id=job["workflow_id"])
+    except Exception as e:
+        result = {"status": "failed", "error": str(e)}
+    return {
+        "workflow_id": job["workflow_id"],
+        "niche": job["niche"],
+        "status": result.get("status", "failed"),
+        "error": result.get("error"),
+        "finished_at": datetime.now().isoformat()
+    }
+
 
-def main():
-      """Main application entry point"""
+def run_bulk(input_path: Path, workers: int = 4, use_processes: bool = False, dry_run: bool = False,
+             manifest_path: Optional[Path] = None, num_images: int = DEFAULT_IMAGES,
+             num_listings: int = DEFAULT_LISTINGS, retry_failed: bool = True) -> Dict[str, Any]:
+    """
+    Run the full workflow for every niche in a CSV/JSONL file.
+
+    Args:
+        input_path: CSV or JSONL file of niches
+        workers: Workflows run in parallel
+        use_processes: Use a process pool instead of threads
+        dry_run: Only report which niches would run
+        manifest_path: Resume manifest. Defaults to <input>.manifest.jsonl.
+        num_images: Default images per niche
+        num_listings: Default listings per niche
+        retry_failed: Rerun niches whose last attempt failed
+
+    Returns:
+        Summary counts and the per-niche outcomes of this run
+    """
+    from tqdm import tqdm
+
+    jobs = load_jobs(input_path, num_images, num_listings)
+    manifest_path = manifest_path or input_path.with_name(input_path.name + ".manifest.jsonl")
+    done = read_manifest(manifest_path)
+    skip = {"completed"} if retry_failed else {"completed", "failed"}
+    pending = [job for job in jobs if done.get(job["workflow_id"], {}).get("status") not in skip]
+    summary = {"total": len(jobs), "skipped": len(jobs) - len(pending), "pending": len(pending),
+               "completed": 0, "failed": 0, "manifest": str(manifest_path), "results": []}
+
+    if dry_run or not pending:
+        summary["results"] = [{"workflow_id": job["workflow_id"], "niche": job["niche"], "status": "pending"}
+                              for job in pending]
+        return summary
+
+    workers = max(1, workers)
+    log_listener = None
+    if use_processes:
+        # Workers forward their records to this process, the only writer of the log file
+        context = multiprocessing.get_context(POOL_START_METHOD)
+        log_queue = context.Queue()
+        log_listener = start_worker_listener(log_queue)
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=setup_worker_logging,
+                                   initargs=(log_queue, LOG_LEVEL))
+    else:
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bulk")
+    try:
+        with pool, \
+                open(manifest_path, "a", encoding="utf-8") as manifest, \
+                tqdm(total=len(jobs), initial=summary["skipped"], unit="niche", desc=input_path.name) as progress:
+            futures = {pool.submit(_run_job, job): job for job in pending}
+            try:
+                for future in as_completed(futures):
+                    try:
+                        outcome = future.result()
+                    except Exception as e:
+                        # Worker process died; the workflow's checkpoint lets the next run resume it
+                        job = futures[future]
+                        outcome = {"workflow_id": job["workflow_id"], "niche": job["niche"], "status": "failed",
+                                   "error": str(e), "finished_at": datetime.now().isoformat()}
+                    manifest.write(json.dumps(outcome) + "\n")
+                    manifest.flush()
+                    summary["completed" if outcome["status"] == "completed" else "failed"] += 1
+                    summary["results"].append(outcome)
+                    progress.set_postfix(failed=summary["failed"])
+                    progress.update()
+            except KeyboardInterrupt:
+                # Drop queued niches; only the workflows already running are waited for
+                pool.shutdown(wait=False, cancel_futures=True)
+                raise
+    finally:
+        if log_listener is not None:
+            log_listener.stop()
+    return summary
+
+
+def banner():
+    """Print the startup banner"""
 
     logger.info("=" * 80)
     logger.info("🚀 ETSY AUTOMATION SYSTEM STARTING")
@@ -38,5 +199,55 @@ def main():
     logger.info("Press CTRL+C to stop\n")
 
 
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Etsy print art automation")
+    commands = parser.add_subparsers(dest="command")
+
+    run = commands.add_parser("run", help="Run the full pipeline for every niche in a CSV or JSONL file")
+    run.add_argument("input", type=Path, help="CSV with a 'niche' column, or JSONL of {\"niche\": ...}")
+    run.add_argument("-w", "--workers", type=int, default=4, help="Workflows run in parallel (default: 4)")
+    run.add_argument("--processes", action="store_true", help="Use a process pool instead of threads")
+    run.add_argument("--images", type=int, default=DEFAULT_IMAGES, help="Images per niche unless set per row")
+    run.add_argument("--listings", type=int, default=DEFAULT_LISTINGS, help="Listings per niche unless set per row")
+    run.add_argument("--manifest", type=Path, help="Resume manifest (default: <input>.manifest.jsonl)")
+    run.add_argument("--no-retry-failed", action="store_true", help="Skip niches whose last attempt failed")
+    run.add_argument("--dry-run", action="store_true", help="List the niches that would run and exit")
+    run.add_argument("-v", "--verbose", action="store_true", help="Also log to the console")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Main application entry point"""
+    args = build_parser().parse_args(argv)
+
+    if args.command != "run":
+        setup_logging()
+        banner()
+        return 0
+
+    # Logs go to the rotating file; the console belongs to the progress bar
+    setup_logging(console=args.verbose)
+    try:
+        summary = run_bulk(args.input, workers=args.workers, use_processes=args.processes, dry_run=args.dry_run,
+                           manifest_path=args.manifest, num_images=args.images, num_listings=args.listings,
+                           retry_failed=not args.no_retry_failed)
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    except KeyboardInterrupt:
+        print("interrupted; run again to resume the remaining niches", file=sys.stderr)
+        return 130
+
+    if args.dry_run:
+        for entry in summary["results"]:
+            print(f"would run  {entry['niche']}  ({entry['workflow_id']})")
+    print(f"{summary['total']} niches: {summary['skipped']} already done, {summary['completed']} completed, "
+          f"{summary['failed']} failed" + (" (dry run)" if args.dry_run else ""))
+    for entry in summary["results"]:
+        if entry["status"] == "failed":
+            print(f"failed  {entry['niche']}: {entry.get('error')}", file=sys.stderr)
+    return 1 if summary["failed"] else 0
+
+
 if __name__ == "__main__":
-      main()
+    sys.exit(main())
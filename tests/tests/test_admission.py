@@ -0,0 +1,153 @@
+"""
+Tests for admission control on expensive routes
+"""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+from flask import Flask, jsonify
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from web.admission import AdmissionController, RouteGate, TokenBucket
+
+
+class TestTokenBucket:
+    """Tests for TokenBucket"""
+
+    def test_burst_then_refill(self):
+        bucket = TokenBucket(rate=2.0, burst=3)
+        now = bucket.updated
+        assert [bucket.take(now) for _ in range(3)] == [0.0, 0.0, 0.0]
+        assert bucket.take(now) == pytest.approx(0.5)
+        assert bucket.take(now + 0.5) == 0.0
+
+
+class TestRouteGate:
+    """Tests for RouteGate"""
+
+    def test_sheds_when_queue_full(self):
+        gate = RouteGate("test", max_concurrent=1, max_queue=0)
+        assert gate.acquire() is None
+        assert gate.acquire() >= 1
+        gate.release(0.1)
+        assert gate.acquire() is None
+        assert gate.stats()["shed"] == 1
+
+    def test_queued_request_gets_released_slot(self):
+        gate = RouteGate("test", max_concurrent=1, max_queue=1, queue_timeout=5)
+        assert gate.acquire() is None
+        result = []
+        waiter = threading.Thread(target=lambda: result.append(gate.acquire()))
+        waiter.start()
+        while gate.stats()["waiting"] == 0:
+            time.sleep(0.001)
+        gate.release(0.1)
+        waiter.join(5)
+        assert result == [None]
+
+    def test_queue_timeout_sheds(self):
+        gate = RouteGate("test", max_concurrent=1, max_queue=1, queue_timeout=0.01)
+        gate.acquire()
+        assert gate.acquire() is not None
+        assert gate.stats()["waiting"] == 0
+
+    def test_backlog_sheds(self):
+        gate = RouteGate("test", max_concurrent=4, max_queue=4, backlog=lambda: 10, max_backlog=10)
+        gate.avg_seconds = 30
+        assert gate.acquire() == 83  # (0 waiting + 1 + 10 backlog) * 30s / 4 slots
+        assert gate.stats()["active"] == 0
+
+
+@pytest.fixture
+def app():
+    """App with one gated slow route and one open route."""
+    app = Flask(__name__)
+    admission = AdmissionController(enabled=True, rate_per_minute=60, burst=3)
+    release = threading.Event()
+
+    @app.route('/slow')
+    @admission.limit('slow', max_concurrent=1, max_queue=0)
+    def slow():
+        release.wait(5)
+        return jsonify({"ok": True})
+
+    @app.route('/items', methods=['GET', 'POST'])
+    @admission.limit('items', max_concurrent=1, max_queue=0, methods=['POST'])
+    def items():
+        return jsonify({"ok": True})
+
+    @app.route('/fast')
+    def fast():
+        return jsonify({"ok": True})
+
+    app.admission = admission
+    app.release = release
+    return app
+
+
+class TestAdmissionController:
+    """Tests for the limit decorator"""
+
+    def test_rate_limit_per_client(self, app):
+        app.release.set()
+        client = app.test_client()
+        statuses = [client.get('/slow').status_code for _ in range(4)]
+        assert statuses == [200, 200, 200, 429]
+        other = client.get('/slow', environ_base={"REMOTE_ADDR": "10.0.0.2"})
+        assert other.status_code == 200
+
+    def test_overload_sheds_with_retry_after(self, app):
+        client = app.test_client()
+        first = threading.Thread(target=lambda: client.get('/slow'))
+        first.start()
+        while app.admission.gates['slow'].stats()['active'] == 0:
+            time.sleep(0.001)
+
+        shed = client.get('/slow', environ_base={"REMOTE_ADDR": "10.0.0.3"})
+        assert shed.status_code == 429
+        assert int(shed.headers["Retry-After"]) >= 1
+        assert client.get('/fast').status_code == 200
+
+        app.release.set()
+        first.join(5)
+        assert app.admission.stats()["routes"]["slow"]["shed"] == 1
+
+    def test_shed_requests_keep_rate_budget(self, app):
+        client = app.test_client()
+        first = threading.Thread(target=lambda: client.get('/slow'))
+        first.start()
+        while app.admission.gates['slow'].stats()['active'] == 0:
+            time.sleep(0.001)
+
+        for _ in range(5):
+            assert client.get('/slow', environ_base={"REMOTE_ADDR": "10.0.0.3"}).status_code == 429
+        app.release.set()
+        first.join(5)
+
+        statuses = [client.get('/slow', environ_base={"REMOTE_ADDR": "10.0.0.3"}).status_code for _ in range(3)]
+        assert statuses == [200, 200, 200]
+        assert app.admission.rate_limited == 0
+
+    def test_rate_limited_request_frees_its_slot(self, app):
+        app.release.set()
+        client = app.test_client()
+        statuses = [client.get('/slow').status_code for _ in range(4)]
+        assert statuses == [200, 200, 200, 429]
+        stats = app.admission.stats()["routes"]["slow"]
+        assert stats["active"] == 0
+        assert stats["admitted"] == 3
+
+    def test_unlisted_methods_pass_through(self, app):
+        client = app.test_client()
+        assert [client.get('/items').status_code for _ in range(5)] == [200] * 5
+        assert [client.post('/items').status_code for _ in range(4)][-1] == 429
+        assert app.admission.stats()["routes"]["items"]["admitted"] == 3
+
+    def test_disabled_is_passthrough(self):
+        admission = AdmissionController(enabled=False)
+        view = lambda: "ok"
+        assert admission.limit('x', 1, 0)(view) is view
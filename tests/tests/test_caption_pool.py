@@ -0,0 +1,91 @@
+"""
+Tests for the per-niche TikTok caption pool
+"""
+
+import os
+import re
+import sys
+import json
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from agents.caption_pool import MAX_CAPTIONS_PER_CALL, CaptionPool, clean_caption, plan_batches
+
+
+class StubRouter:
+    """Answers caption requests with numbered captions; optionally truncates large ones."""
+
+    def __init__(self, truncate_above=None):
+        self.truncate_above = truncate_above
+        self.requests = []
+
+    def complete(self, task, messages, **kwargs):
+        wanted = {m.group(1): int(m.group(2))
+                  for m in re.finditer(r"^- (.+): (\d+) captions$", messages[-1]["content"], re.MULTILINE)}
+        self.requests.append(wanted)
+        total = sum(wanted.values())
+        if self.truncate_above is not None and total > self.truncate_above:
+            return SimpleNamespace(choices=[SimpleNamespace(
+                message=SimpleNamespace(content='{"captions": {"cats": ["cut off'), finish_reason="length")])
+        offset = len(self.requests) * 1000
+        captions = {niche.upper(): [f"{i + 1}. {niche} caption {offset + i} #etsy" for i in range(count)]
+                    for niche, count in wanted.items()}
+        return SimpleNamespace(choices=[SimpleNamespace(
+            message=SimpleNamespace(content=json.dumps({"captions": captions})), finish_reason="stop")])
+
+
+class TestCaptionPool:
+    """Tests for CaptionPool"""
+
+    def test_clean_caption(self):
+        assert clean_caption('2) "Cute cats #art"') == "Cute cats #art"
+        assert clean_caption("Captions:") is None
+
+    def test_plan_batches_splits_large_niches(self):
+        batches = plan_batches({"cats": 100, "dogs": 40}, limit=65)
+        assert batches == [{"cats": 65}, {"cats": 35, "dogs": 30}, {"dogs": 10}]
+        assert all(sum(b.values()) <= 65 for b in batches)
+
+    def test_refill_then_take(self):
+        router = StubRouter()
+        pool = CaptionPool(router, target_size=5, low_watermark=0)
+        assert pool.refill(["cats", "dogs"]) == 10
+        assert len(router.requests) == 1
+
+        taken = pool.take("cats", 3)
+        assert len(taken) == 3
+        assert taken[0].startswith("cats caption")
+        assert pool.available("cats") == 2
+        assert not set(taken) & set(pool.take("cats", 2))
+
+    def test_take_refills_synchronously_when_short(self):
+        pool = CaptionPool(StubRouter(), target_size=2, low_watermark=0)
+        assert len(pool.take("cats", 4)) == 4
+
+    def test_large_refill_is_batched(self):
+        router = StubRouter()
+        niches = [f"niche {i}" for i in range(6)]
+        pool = CaptionPool(router, target_size=30, low_watermark=0)
+        assert pool.refill(niches) == 180
+        assert len(router.requests) > 1
+        assert all(sum(r.values()) <= MAX_CAPTIONS_PER_CALL for r in router.requests)
+
+    def test_truncated_response_retried_smaller(self):
+        router = StubRouter(truncate_above=10)
+        pool = CaptionPool(router, target_size=20, low_watermark=0)
+        assert pool.refill(["cats"]) == 20
+        assert sum(router.requests[0].values()) == 20
+        assert all(sum(r.values()) <= 10 for r in router.requests[1:])
+
+    def test_unrecoverable_truncation_adds_nothing(self):
+        pool = CaptionPool(StubRouter(truncate_above=0), target_size=3, low_watermark=0)
+        assert pool.refill(["cats"]) == 0
+        assert pool.available("cats") == 0
+
+    def test_seen_captions_are_bounded(self):
+        pool = CaptionPool(StubRouter(), target_size=20, low_watermark=0, seen_limit=15)
+        pool.refill(["cats"])
+        pool.take("cats", 20)
+        pool.refill(["cats"])
+        assert len(pool._seen["cats"]) == 15
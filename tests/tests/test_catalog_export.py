@@ -0,0 +1,113 @@
+"""
+Tests for the chunked catalog exporter
+"""
+
+import os
+import sys
+import csv
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from agents.catalog_export import CatalogExporter, ETSY_CSV_COLUMNS, etsy_row, matches
+from agents.records import Listing
+
+
+def make_listing(i, niche="kawaii cats", status="draft"):
+    return Listing(id=f"listing_{i:05d}", title=f"Print {i}", description="A print", price=10.0 + i,
+                   image_url=f"https://example.com/{i}.png", tags=["kawaii cats", "print"], status=status,
+                   created_at="2026-01-07", niche=niche)
+
+
+def read_csv(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+@pytest.fixture
+def exporter(tmp_path):
+    return CatalogExporter(output_dir=tmp_path, chunk_size=3)
+
+
+class TestCatalogExport:
+    """Tests for CatalogExporter"""
+
+    def test_csv_written_in_chunks(self, exporter):
+        result = exporter.export((make_listing(i) for i in range(7)), "listings", filename="all.csv")
+        assert result["rows"] == 7
+        assert result["chunks"] == 3
+        rows = read_csv(result["path"])
+        assert [row["id"] for row in rows] == [f"listing_{i:05d}" for i in range(7)]
+        assert rows[0]["tags"] == "kawaii cats,print"
+
+    def test_etsy_csv_columns(self, exporter):
+        listing = make_listing(1)
+        listing["extra_image_urls"] = ["https://example.com/mockup.png"]
+        result = exporter.export([listing], "listings", fmt="etsy_csv")
+        row = read_csv(result["path"])[0]
+        assert list(row) == list(ETSY_CSV_COLUMNS)
+        assert row["SKU"] == "listing_00001"
+        assert row["IMAGE1"] == "https://example.com/1.png"
+        assert row["IMAGE2"] == "https://example.com/mockup.png"
+        assert row["IMAGE3"] == ""
+
+    def test_filters_and_projection(self, exporter):
+        records = [make_listing(0), make_listing(1, status="published"), make_listing(2, niche="dogs")]
+        result = exporter.export(records, "listings", columns=["id", "price"], niche="Kawaii Cats",
+                                 status="published")
+        assert read_csv(result["path"]) == [{"id": "listing_00001", "price": "11.0"}]
+
+    def test_niche_falls_back_to_tags(self):
+        listing = make_listing(0, niche=None)
+        assert matches(listing, niche="kawaii cats")
+        assert not matches(listing, niche="dogs")
+
+    def test_empty_export_has_header(self, exporter):
+        result = exporter.export([], "posts", columns=["id", "status"], filename="posts.csv")
+        assert result["rows"] == 0
+        with open(result["path"], encoding="utf-8") as f:
+            assert f.read().strip() == "id,status"
+
+    def test_etsy_row_caps_images(self):
+        listing = make_listing(0)
+        listing["extra_image_urls"] = [f"https://example.com/m{i}.png" for i in range(20)]
+        row = etsy_row(listing)
+        assert row["IMAGE10"] == "https://example.com/m8.png"
+        assert "IMAGE11" not in row
+
+    @pytest.mark.parametrize("kwargs", [
+        {"entity": "orders"},
+        {"entity": "listings", "fmt": "xlsx"},
+        {"entity": "images", "fmt": "etsy_csv"},
+        {"entity": "listings", "columns": ["id", "bogus"]},
+    ])
+    def test_bad_input(self, exporter, kwargs):
+        with pytest.raises(ValueError):
+            exporter.export([], **kwargs)
+
+    def test_failed_export_leaves_no_file(self, exporter, tmp_path):
+        def broken():
+            yield make_listing(0)
+            raise RuntimeError("store closed")
+
+        with pytest.raises(RuntimeError):
+            exporter.export(broken(), "listings", filename="broken.csv")
+        assert list(tmp_path.iterdir()) == []
+
+    def test_concurrent_default_names_are_unique(self, exporter, tmp_path):
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(lambda i: exporter.export([make_listing(i)], "listings"), range(4)))
+        assert len({r["file"] for r in results}) == 4
+        assert sorted(p.name for p in tmp_path.iterdir()) == sorted(r["file"] for r in results)
+
+    def test_parquet_row_groups(self, exporter):
+        pq = pytest.importorskip("pyarrow.parquet")
+        result = exporter.export((make_listing(i) for i in range(7)), "listings", fmt="parquet")
+        parquet = pq.ParquetFile(result["path"])
+        assert parquet.metadata.num_rows == 7
+        assert parquet.num_row_groups == 3
+        table = parquet.read(columns=["id", "tags", "price"])
+        assert table.column("tags")[0].as_py() == ["kawaii cats", "print"]
+        assert table.column("price")[6].as_py() == 16.0
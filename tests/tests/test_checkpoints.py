@@ -0,0 +1,134 @@
+"""
+Unit tests for workflow checkpointing and resume
+"""
+
+import pytest
+import sys
+import os
+from unittest.mock import patch
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from agents.checkpoints import CheckpointStore
+from agents.orchestrator import OrchestratorAgent
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Checkpoint store in a temporary directory"""
+    return CheckpointStore(tmp_path, fsync=False)
+
+
+@pytest.fixture
+def orchestrator(store):
+    """Orchestrator with a test API key and temporary checkpoints"""
+    return OrchestratorAgent(api_key="test-key", checkpoint_store=store)
+
+
+def analysis_ok(niche):
+    return {"niche": niche, "analysis": "ok", "status": "completed"}
+
+
+class TestCheckpointStore:
+    """Test checkpoint log replay"""
+
+    def test_load_missing(self, store):
+        """Unknown workflows have no checkpoint"""
+        assert store.load("workflow_missing") is None
+
+    def test_replay_records(self, store):
+        """Phases, items and status are folded in order"""
+        store.start("wf", {"niche": "cats"})
+        store.save_item("wf", "generated_art", "img_0", {"id": "img_0"})
+        store.save_phase("wf", "niche_analysis", {"status": "completed"})
+        store.set_status("wf", "failed", error="boom")
+
+        state = store.load("wf")
+        assert state["params"] == {"niche": "cats"}
+        assert state["items"]["generated_art"]["img_0"] == {"id": "img_0"}
+        assert "niche_analysis" in state["phases"]
+        assert state["status"] == "failed"
+        assert state["error"] == "boom"
+
+    def test_torn_write_is_ignored(self, store, tmp_path):
+        """A partial trailing record does not break replay"""
+        store.start("wf", {"niche": "cats"})
+        with open(tmp_path / "wf.jsonl", "a") as f:
+            f.write('{"type": "phase", "pha')
+
+        assert store.load("wf")["params"] == {"niche": "cats"}
+
+
+class TestWorkflowResume:
+    """Test orchestrator resume behaviour"""
+
+    def test_resume_skips_completed_work(self, orchestrator):
+        """A failure in phase 3 resumes without repeating phases 1-2 or finished listings"""
+        calls = {"analysis": 0}
+
+        def count_analysis(niche):
+            calls["analysis"] += 1
+            return analysis_ok(niche)
+
+        original_create = orchestrator._create_listings
+
+        def fail_after_two(niche, num_listings, art_gen, completed_items=None, on_item=None):
+            def record_then_fail(key, data):
+                on_item(key, data)
+                if key == "listing_1":
+                    raise RuntimeError("Etsy unavailable")
+            return original_create(niche, num_listings, art_gen, completed_items, record_then_fail)
+
+        with patch.object(orchestrator, "_analyze_niche", side_effect=count_analysis), \
+                patch.object(orchestrator, "_create_listings", side_effect=fail_after_two):
+            failed = orchestrator.run_workflow("kawaii cats", num_images=3, num_listings=4,
+                                               workflow_id="workflow_test")
+
+        assert failed["status"] == "failed"
+        assert failed["completed_phases"] == ["niche_analysis", "generated_art"]
+
+        with patch.object(orchestrator, "_analyze_niche", side_effect=count_analysis), \
+                patch.object(orchestrator, "_generate_art") as generate_art:
+            resumed = orchestrator.resume_workflow("workflow_test")
+
+        assert resumed["status"] == "completed"
+        assert resumed["skipped_phases"] == ["niche_analysis", "generated_art"]
+        assert resumed["listings_created"] == 4
+        assert calls["analysis"] == 1
+        generate_art.assert_not_called()
+
+    def test_failed_phase_fails_workflow_and_resume_retries_it(self, orchestrator, store):
+        """A phase returning status failed stops the workflow; resume re-runs that phase"""
+        with patch.object(orchestrator, "_analyze_niche",
+                          return_value={"niche": "cats", "status": "failed", "error": "rate limited"}), \
+                patch.object(orchestrator, "_generate_art") as generate_art:
+            failed = orchestrator.run_workflow("cats", num_images=1, num_listings=1,
+                                               workflow_id="workflow_phase_failed")
+
+        assert failed["status"] == "failed"
+        assert failed["resumable"]
+        assert "rate limited" in failed["error"]
+        assert failed["completed_phases"] == []
+        assert store.load("workflow_phase_failed")["status"] == "failed"
+        generate_art.assert_not_called()
+
+        with patch.object(orchestrator, "_analyze_niche", side_effect=analysis_ok) as analyze:
+            resumed = orchestrator.resume_workflow("workflow_phase_failed")
+
+        analyze.assert_called_once_with("cats")
+        assert resumed["status"] == "completed"
+        assert resumed["skipped_phases"] == []
+        assert resumed["niche_analysis"]["analysis"] == "ok"
+
+    def test_resume_completed_returns_result(self, orchestrator):
+        """Resuming a finished workflow returns the stored result"""
+        with patch.object(orchestrator, "_analyze_niche", side_effect=analysis_ok):
+            result = orchestrator.run_workflow("cats", num_images=1, num_listings=1,
+                                               workflow_id="workflow_done")
+
+        assert orchestrator.resume_workflow("workflow_done") == result
+
+    def test_resume_unknown_workflow(self, orchestrator):
+        """Unknown workflow ids report an error"""
+        assert "error" in orchestrator.resume_workflow("workflow_nope")
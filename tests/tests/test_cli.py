@@ -0,0 +1,87 @@
+"""
+Tests for the bulk CLI runner in main.py
+"""
+
+import os
+import sys
+import json
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import main
+
+
+def fake_job(job):
+    status = "failed" if "broken" in job["niche"] else "completed"
+    return {"workflow_id": job["workflow_id"], "niche": job["niche"], "status": status,
+            "error": "boom" if status == "failed" else None, "finished_at": "now"}
+
+
+@pytest.fixture
+def csv_input(tmp_path):
+    path = tmp_path / "niches.csv"
+    path.write_text("niche,num_images\nkawaii cats,3\nretro cars,\nbroken niche,\nkawaii  cats,3\n")
+    return path
+
+
+class TestLoadJobs:
+    """Tests for reading niche files"""
+
+    def test_csv_rows_and_defaults(self, csv_input):
+        jobs = main.load_jobs(csv_input, num_images=10, num_listings=2)
+        assert [j["niche"] for j in jobs] == ["kawaii cats", "retro cars", "broken niche"]
+        assert jobs[0]["num_images"] == 3
+        assert jobs[1]["num_images"] == 10
+
+    def test_workflow_ids_are_stable(self, csv_input):
+        assert main.load_jobs(csv_input) == main.load_jobs(csv_input)
+
+    def test_jsonl(self, tmp_path):
+        path = tmp_path / "niches.jsonl"
+        path.write_text(json.dumps({"niche": "boho", "num_listings": 4}) + "\n\n")
+        assert main.load_jobs(path)[0]["num_listings"] == 4
+
+    def test_missing_niche(self, tmp_path):
+        path = tmp_path / "bad.csv"
+        path.write_text("niche\n\n,\n")
+        with pytest.raises(ValueError):
+            main.load_jobs(path)
+
+    def test_unsupported_type(self, tmp_path):
+        path = tmp_path / "niches.txt"
+        path.write_text("boho\n")
+        with pytest.raises(ValueError):
+            main.load_jobs(path)
+
+
+class TestRunBulk:
+    """Tests for manifest-based resumption"""
+
+    def test_dry_run_runs_nothing(self, csv_input):
+        with patch.object(main, "_run_job") as run_job:
+            summary = main.run_bulk(csv_input, dry_run=True)
+        run_job.assert_not_called()
+        assert summary["pending"] == 3
+        assert not csv_input.with_name("niches.csv.manifest.jsonl").exists()
+
+    def test_resume_skips_completed(self, csv_input):
+        with patch.object(main, "_run_job", side_effect=fake_job):
+            first = main.run_bulk(csv_input, workers=2)
+        assert (first["completed"], first["failed"]) == (2, 1)
+
+        with patch.object(main, "_run_job", side_effect=fake_job) as run_job:
+            second = main.run_bulk(csv_input, workers=2)
+        assert second["skipped"] == 2
+        assert [call.args[0]["niche"] for call in run_job.call_args_list] == ["broken niche"]
+
+        with patch.object(main, "_run_job", side_effect=fake_job) as run_job:
+            main.run_bulk(csv_input, retry_failed=False)
+        run_job.assert_not_called()
+
+    def test_partial_manifest_line_ignored(self, tmp_path):
+        manifest = tmp_path / "m.jsonl"
+        manifest.write_text(json.dumps({"workflow_id": "a", "status": "completed"}) + "\n{\"workflow_id\": \"b\", \"sta")
+        assert list(main.read_manifest(manifest)) == ["a"]
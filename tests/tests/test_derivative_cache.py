@@ -0,0 +1,82 @@
+"""
+Unit tests for the WebP derivative cache
+"""
+
+import pytest
+import sys
+import os
+
+import cv2
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from agents.derivative_cache import DerivativeCache
+
+
+@pytest.fixture
+def source(tmp_path):
+    """Noisy 512x384 test image (noise keeps WebP files from being tiny)"""
+    path = tmp_path / "source.png"
+    cv2.imwrite(str(path), (np.random.default_rng(0).random((384, 512, 3)) * 255).astype(np.uint8))
+    return str(path)
+
+
+class TestDerivativeCache:
+    """Test generation, reuse and eviction"""
+
+    def test_generates_resized_webp(self, source, tmp_path):
+        cache = DerivativeCache(cache_dir=tmp_path / "cache", sizes={"thumb": 64})
+        path = cache.get("img_1", source, "thumb")
+
+        assert path.suffix == ".webp"
+        image = cv2.imread(str(path))
+        assert image.shape[:2] == (48, 64)
+        assert cache.stats()["misses"] == 1
+
+    def test_second_request_is_a_hit(self, source, tmp_path):
+        cache = DerivativeCache(cache_dir=tmp_path / "cache", sizes={"thumb": 64})
+        first = cache.get("img_1", source, "thumb")
+        mtime = first.stat().st_mtime_ns
+
+        assert cache.get("img_1", source, "thumb") == first
+        assert first.stat().st_mtime_ns == mtime
+        assert cache.stats()["hits"] == 1
+
+    def test_evicts_least_recently_used(self, source, tmp_path):
+        cache = DerivativeCache(cache_dir=tmp_path / "cache", sizes={"thumb": 128})
+        a = cache.get("img_a", source, "thumb")
+        cache.max_bytes = a.stat().st_size * 2 + 1
+        b = cache.get("img_b", source, "thumb")
+        cache.get("img_a", source, "thumb")  # touch a so b is now oldest
+        c = cache.get("img_c", source, "thumb")
+
+        assert a.exists() and c.exists()
+        assert not b.exists()
+        # Evicted derivatives are regenerated on demand
+        assert cache.get("img_b", source, "thumb").exists()
+
+    def test_reindexes_existing_files(self, source, tmp_path):
+        DerivativeCache(cache_dir=tmp_path / "cache", sizes={"thumb": 64}).get("img_1", source, "thumb")
+        reopened = DerivativeCache(cache_dir=tmp_path / "cache", sizes={"thumb": 64})
+
+        assert reopened.stats()["entries"] == 1
+        reopened.get("img_1", source, "thumb")
+        assert reopened.stats()["hits"] == 1
+
+    def test_new_source_for_reused_id_is_a_new_derivative(self, source, tmp_path):
+        cache = DerivativeCache(cache_dir=tmp_path / "cache", sizes={"thumb": 64})
+        other = tmp_path / "regenerated.png"
+        cv2.imwrite(str(other), np.zeros((64, 32, 3), dtype=np.uint8))
+
+        first = cache.get("img_1", source, "thumb")
+        second = cache.get("img_1", str(other), "thumb")
+
+        assert first != second
+        assert cv2.imread(str(second)).shape[:2] == (64, 32)
+
+    def test_unknown_size(self, source, tmp_path):
+        cache = DerivativeCache(cache_dir=tmp_path / "cache")
+        with pytest.raises(ValueError):
+            cache.get("img_1", source, "huge")
@@ -0,0 +1,126 @@
+"""
+Tests for draft screening and two-tier image generation
+"""
+
+import os
+import sys
+
+import cv2
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from agents.art_generation import ArtGenerationAgent
+from agents.draft_screen import DraftScreener, dhash, hamming, quality_metrics
+
+
+def make_art(seed):
+    rng = np.random.default_rng(seed)
+    image = np.full((1024, 1024, 3), 235, np.uint8)
+    for _ in range(12):
+        color = tuple(int(c) for c in rng.integers(0, 255, 3))
+        center = tuple(int(c) for c in rng.integers(100, 900, 2))
+        cv2.circle(image, center, int(rng.integers(30, 200)), color, -1, cv2.LINE_AA)
+    return image
+
+
+@pytest.fixture
+def drafts(tmp_path):
+    """Two distinct sharp drafts, a resized copy of the first, and a blurred one."""
+    images = {
+        "a": make_art(1),
+        "b": make_art(2),
+        "a_copy": cv2.resize(make_art(1), (768, 768)),
+        "blurry": cv2.GaussianBlur(make_art(3), (0, 0), 8),
+    }
+    result = []
+    for name, image in images.items():
+        path = tmp_path / f"{name}.png"
+        cv2.imwrite(str(path), image)
+        result.append({"name": name, "url": str(path)})
+    return result
+
+
+class TestQualityMetrics:
+    """Tests for the local quality score and perceptual hash"""
+
+    def test_sharp_beats_blurred(self):
+        art = make_art(0)
+        assert quality_metrics(art)["score"] > 0.9
+        assert quality_metrics(cv2.GaussianBlur(art, (0, 0), 8))["score"] < 0.7
+
+    def test_blank_image_scores_low(self):
+        assert quality_metrics(np.full((256, 256, 3), 255, np.uint8))["score"] == 0.0
+
+    def test_dhash_matches_resized_copy(self):
+        art = make_art(0)
+        assert hamming(dhash(art), dhash(cv2.resize(art, (300, 300)))) <= 2
+        assert hamming(dhash(art), dhash(make_art(5))) > 10
+
+
+class TestDraftScreener:
+    """Tests for DraftScreener"""
+
+    def test_rejects_low_quality_and_duplicates(self, drafts):
+        accepted, rejected = DraftScreener(workers=2).screen(drafts)
+        assert [d["name"] for d in accepted] == ["a", "b"]
+        reasons = {d["name"]: d["reason"] for d in rejected}
+        assert reasons == {"a_copy": "duplicate", "blurry": "low_quality"}
+
+    def test_unavailable_draft(self, tmp_path):
+        accepted, rejected = DraftScreener().screen([{"url": str(tmp_path / "missing.png")}])
+        assert accepted == []
+        assert rejected[0]["reason"] == "unavailable"
+
+    def test_vision_check_runs_on_survivors_only(self, drafts):
+        reviewed = []
+
+        def vision_check(url, subject):
+            reviewed.append(url)
+            return not url.endswith("b.png")
+
+        accepted, rejected = DraftScreener(vision_check=vision_check).screen(drafts, "circles")
+        assert sorted(os.path.basename(u) for u in reviewed) == ["a.png", "b.png"]
+        assert [d["name"] for d in accepted] == ["a"]
+        assert {d["name"]: d["reason"] for d in rejected}["b"] == "vision"
+
+
+class TestTwoTierGeneration:
+    """Tests for draft-then-HD generation in ArtGenerationAgent"""
+
+    def test_only_survivors_regenerated_in_hd(self, drafts, monkeypatch):
+        agent = ArtGenerationAgent(api_key="test-key", screener=DraftScreener(workers=2))
+        draft_urls = iter(d["url"] for d in drafts)
+        calls = []
+
+        def fake_dalle(prompt, quality="hd"):
+            calls.append((quality, prompt))
+            if quality == "standard":
+                return {"url": next(draft_urls), "revised_prompt": f"revised: {prompt}"}
+            return {"url": f"https://example.com/hd/{len(calls)}.png", "revised_prompt": prompt}
+
+        monkeypatch.setattr(agent, "_call_dalle3", fake_dalle)
+        result = agent.generate_images("circles", num_images=4, two_tier=True)
+
+        assert result["status"] == "completed"
+        assert [q for q, _ in calls] == ["standard"] * 4 + ["hd"] * 2
+        assert all(prompt.startswith("revised: ") for q, prompt in calls if q == "hd")
+        assert result["drafts"]["accepted"] == 2
+        assert len(result["drafts"]["rejected"]) == 2
+
+        first = result["images"][0]
+        assert first["quality"] == "hd"
+        assert first["draft_url"] == drafts[0]["url"]
+        assert first["quality_score"] > 0.9
+        assert agent.get_image(first["id"])["draft_url"] == drafts[0]["url"]
+
+    def test_direct_mode_skips_drafts(self, monkeypatch):
+        agent = ArtGenerationAgent(api_key="test-key")
+        qualities = []
+        monkeypatch.setattr(agent, "_call_dalle3",
+                            lambda prompt, quality="hd": qualities.append(quality) or {"url": "u", "revised_prompt": prompt})
+        result = agent.generate_images("circles", num_images=3, two_tier=False)
+        assert qualities == ["hd"] * 3
+        assert "drafts" not in result
+        assert "draft_url" not in result["images"][0]
@@ -0,0 +1,115 @@
+"""
+Unit tests for the memory-mapped embedding index
+"""
+
+import pytest
+import sys
+import os
+from types import SimpleNamespace
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from agents.embedding_index import EmbeddingIndex
+from agents.niche_discovery import NicheDiscoveryAgent
+
+
+class FakeEmbeddings:
+    """Deterministic bag-of-letters embeddings standing in for the API"""
+
+    def __init__(self):
+        self.calls = 0
+        self.embeddings = self
+
+    def create(self, model, input):
+        self.calls += 1
+        data = []
+        for text in input:
+            vector = np.zeros(26)
+            for ch in text.lower():
+                if ch.isalpha():
+                    vector[ord(ch) - 97] += 1
+            data.append(SimpleNamespace(embedding=vector.tolist()))
+        return SimpleNamespace(data=data)
+
+
+@pytest.fixture
+def client():
+    return FakeEmbeddings()
+
+
+@pytest.fixture
+def index(client, tmp_path):
+    index = EmbeddingIndex("niches", client, model="fake", index_dir=tmp_path)
+    index.add({"cats": "kawaii cats", "kittens": "kawaii kittens", "mountains": "mountain landscape"})
+    return index
+
+
+class TestEmbeddingIndex:
+    """Test storage, persistence and top-k search"""
+
+    def test_similar(self, index):
+        results = index.similar("cats", k=2)
+        assert [key for key, _ in results] == ["kittens", "mountains"]
+        assert results[0][1] > results[1][1]
+
+    def test_texts_are_embedded_once(self, index, client):
+        calls = client.calls
+        assert index.add({"cats": "kawaii cats"}) == 0
+        assert client.calls == calls
+
+    def test_changed_text_is_reembedded_in_place(self, index):
+        assert index.add({"mountains": "kawaii cat mountains"}) == 1
+        assert len(index) == 3
+        assert index.similar("cats", k=1)[0][0] in ("kittens", "mountains")
+        assert np.isclose(np.linalg.norm(index.vector("mountains")), 1.0)
+
+    def test_persists_across_instances(self, index, client, tmp_path):
+        reopened = EmbeddingIndex("niches", client, model="fake", index_dir=tmp_path)
+        assert len(reopened) == 3
+        assert reopened.similar("cats", k=1)[0][0] == "kittens"
+        assert (tmp_path / "niches.f32").stat().st_size == 3 * 26 * 4
+
+    def test_model_change_rebuilds(self, index, client, tmp_path):
+        reopened = EmbeddingIndex("niches", client, model="other", index_dir=tmp_path)
+        assert len(reopened) == 0
+
+    def test_query_text(self, index):
+        results = index.search(index.query_vector("mountain"), k=1)
+        assert results[0][0] == "mountains"
+
+    def test_writers_in_other_processes_are_picked_up(self, index, client, tmp_path):
+        """A second writer on the same files appends after, not over, the first one's rows"""
+        other = EmbeddingIndex("niches", client, model="fake", index_dir=tmp_path)
+        other.add({"owls": "night owls"})
+        index.add({"frogs": "green frogs"})
+
+        reopened = EmbeddingIndex("niches", client, model="fake", index_dir=tmp_path)
+        assert sorted(reopened.keys) == ["cats", "frogs", "kittens", "mountains", "owls"]
+        assert (tmp_path / "niches.f32").stat().st_size == 5 * 26 * 4
+        assert reopened.similar("owls", k=5)
+
+
+class TestRelatedNiches:
+    """Test NicheDiscoveryAgent.related_niches lookups"""
+
+    def test_lookup_does_not_add_to_index(self, index, client, tmp_path):
+        agent = NicheDiscoveryAgent(api_key="test-key")
+        agent.niche_index = index
+        agent.keyword_index = EmbeddingIndex("keywords", client, model="fake", index_dir=tmp_path)
+
+        result = agent.related_niches("kawaii kitty", limit=2)
+
+        assert result["status"] == "completed"
+        assert result["related_niches"][0]["niche"] in ("cats", "kittens")
+        assert len(index) == 3
+        assert "kawaii kitty" not in index.keys
+
+    def test_known_niche_excludes_itself(self, index, client, tmp_path):
+        agent = NicheDiscoveryAgent(api_key="test-key")
+        agent.niche_index = index
+        agent.keyword_index = EmbeddingIndex("keywords", client, model="fake", index_dir=tmp_path)
+        related = [r["niche"] for r in agent.related_niches("cats", limit=2)["related_niches"]]
+        assert "cats" not in related
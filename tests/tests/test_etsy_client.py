@@ -0,0 +1,207 @@
+"""
+Tests for the Etsy v3 client against a local stand-in server
+"""
+
+import pytest
+import sys
+import os
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from agents.etsy_client import EtsyClient, EtsyAPIError, EtsyUploadError
+from agents.listing_manager import ListingManagerAgent
+
+
+class FakeEtsy:
+    """Shared state for the stand-in Etsy server"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = []
+        self.active_uploads = 0
+        self.peak_uploads = 0
+        self.throttle_next = 0
+        self.next_listing_id = 1000
+
+
+def make_handler(state):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _reply(self, status, body, headers=None):
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _handle(self):
+            length = int(self.headers.get("Content-Length", 0))
+            self.rfile.read(length)
+            with state.lock:
+                state.requests.append((self.command, self.path, self.headers.get("x-api-key")))
+                if state.throttle_next:
+                    state.throttle_next -= 1
+                    return self._reply(429, {"error": "slow down"}, {"Retry-After": "0"})
+
+            if self.command == "GET" and self.path.startswith("/img/"):
+                payload = b"\x89PNG fake"
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                return self.wfile.write(payload)
+
+            if self.command == "GET" and self.path.startswith("/missing/"):
+                return self._reply(404, {"error": "not found"})
+
+            if self.path.endswith("/images"):
+                with state.lock:
+                    state.active_uploads += 1
+                    state.peak_uploads = max(state.peak_uploads, state.active_uploads)
+                time.sleep(0.05)
+                with state.lock:
+                    state.active_uploads -= 1
+                return self._reply(201, {"listing_image_id": len(state.requests)})
+
+            if self.command == "POST":
+                with state.lock:
+                    state.next_listing_id += 1
+                    listing_id = state.next_listing_id
+                return self._reply(201, {"listing_id": listing_id, "state": "draft"})
+
+            return self._reply(200, {"state": "active"})
+
+        do_GET = do_POST = do_PATCH = _handle
+
+    return Handler
+
+
+@pytest.fixture
+def fake_etsy():
+    """Run the stand-in server on an ephemeral port"""
+    state = FakeEtsy()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(state))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    state.url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield state
+    server.shutdown()
+
+
+@pytest.fixture
+def etsy_client(fake_etsy):
+    client = EtsyClient("test-key", access_token="token", base_url=fake_etsy.url,
+                        max_concurrent_uploads=2, requests_per_second=1000, backoff_factor=0)
+    yield client
+    client.close()
+
+
+class TestEtsyClient:
+    """Test request handling"""
+
+    def test_retries_after_429(self, fake_etsy, etsy_client):
+        """Rate-limited requests are retried"""
+        fake_etsy.throttle_next = 2
+        assert etsy_client.create_draft_listing("shop", {"title": "t"})["state"] == "draft"
+        assert len(fake_etsy.requests) == 3
+        assert fake_etsy.requests[0][2] == "test-key"
+
+    def test_gives_up_after_max_retries(self, fake_etsy, etsy_client):
+        """Persistent throttling raises EtsyAPIError"""
+        fake_etsy.throttle_next = 100
+        with pytest.raises(EtsyAPIError):
+            etsy_client.create_draft_listing("shop", {"title": "t"})
+
+    def test_uploads_respect_limits(self, fake_etsy, etsy_client):
+        """Uploads run concurrently but never above the cap or image limit"""
+        sources = [f"{fake_etsy.url}/img/{i}.png" for i in range(12)]
+        results = etsy_client.upload_listing_images("shop", 1, sources)
+        assert len(results) == 10
+        assert fake_etsy.peak_uploads == 2
+
+    def test_image_downloads_carry_no_credentials(self, fake_etsy, etsy_client):
+        """Source images are fetched without the API key"""
+        etsy_client.upload_listing_image("shop", 1, f"{fake_etsy.url}/img/0.png")
+        download, upload = fake_etsy.requests
+        assert download[:2] == ("GET", "/img/0.png") and download[2] is None
+        assert upload[2] == "test-key"
+
+    def test_local_files_only_from_image_dirs(self, fake_etsy, tmp_path):
+        """Local sources are read only from the configured image directories"""
+        allowed = tmp_path / "images"
+        allowed.mkdir()
+        (allowed / "mockup.jpg").write_bytes(b"jpeg")
+        (tmp_path / "secret.txt").write_text("secret")
+        client = EtsyClient("test-key", base_url=fake_etsy.url, local_dirs=[allowed])
+        try:
+            assert client.load_image(str(allowed / "mockup.jpg")) == b"jpeg"
+            for source in (str(tmp_path / "secret.txt"), str(allowed / ".." / "secret.txt"), "/etc/passwd"):
+                with pytest.raises(EtsyAPIError):
+                    client.load_image(source)
+        finally:
+            client.close()
+
+    def test_partial_upload_failure_keeps_successes(self, fake_etsy, etsy_client):
+        """A failed download raises EtsyUploadError with the other uploads' responses"""
+        sources = [f"{fake_etsy.url}/img/0.png", f"{fake_etsy.url}/missing/1.png", f"{fake_etsy.url}/img/2.png"]
+        with pytest.raises(EtsyUploadError) as excinfo:
+            etsy_client.upload_listing_images("shop", 1, sources)
+        results = excinfo.value.results
+        assert results[1] is None
+        assert results[0] and results[2]
+
+
+class TestBulkPublish:
+    """Test ListingManagerAgent publishing through the client"""
+
+    def test_bulk_publish(self, fake_etsy, etsy_client):
+        """Every listing is drafted, gets its image and is activated"""
+        agent = ListingManagerAgent(api_key="test-key", shop_id="shop", etsy_client=etsy_client)
+        agent._optimize_title = lambda title: title
+        ids = [
+            agent.create_listing(f"Print {i}", "desc", 19.99, f"{fake_etsy.url}/img/{i}.png", ["art"])["id"]
+            for i in range(6)
+        ]
+
+        results = agent.bulk_publish(ids)
+
+        assert all(r["status"] == "published" for r in results)
+        assert len({r["etsy_listing_id"] for r in results}) == 6
+        assert all(len(r["etsy_image_ids"]) == 1 for r in results)
+        assert fake_etsy.peak_uploads <= 2
+
+    def test_failed_image_marks_publish_failed_and_retry_fills_gap(self, fake_etsy, etsy_client):
+        """Uploaded images survive a failed publish; the retry uploads only the missing one"""
+        agent = ListingManagerAgent(api_key="test-key", shop_id="shop", etsy_client=etsy_client)
+        agent._optimize_title = lambda title: title
+        listing_id = agent.create_listing("Print", "desc", 19.99, f"{fake_etsy.url}/img/0.png", ["art"])["id"]
+        listing = agent.listings.get(listing_id)
+        listing["extra_image_urls"] = [f"{fake_etsy.url}/missing/1.png"]
+        agent.listings.put(listing)
+
+        failed = agent.publish_listing(listing_id)
+        assert "error" in failed
+        stored = agent.listings.get(listing_id)
+        assert stored["status"] == "publish_failed"
+        assert stored["etsy_image_ids"][0] is not None and stored["etsy_image_ids"][1] is None
+
+        stored["extra_image_urls"] = [f"{fake_etsy.url}/img/1.png"]
+        agent.listings.put(stored)
+        fake_etsy.requests.clear()
+        published = agent.publish_listing(listing_id)
+
+        assert published["status"] == "published"
+        assert all(published["etsy_image_ids"])
+        uploads = [r for r in fake_etsy.requests if r[1].endswith("/images")]
+        assert len(uploads) == 1
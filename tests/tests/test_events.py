@@ -0,0 +1,130 @@
+"""
+Tests for the workflow event bus and its SSE stream
+"""
+
+import os
+import sys
+import json
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from agents.events import EventBus, event_bus
+from agents.orchestrator import OrchestratorAgent
+from agents.checkpoints import CheckpointStore
+from agents.tracing import trace_context
+from web.sse import event_stream
+
+
+def parse(frames):
+    """Decode SSE frames into (event type, payload) pairs, skipping control frames."""
+    events = []
+    for frame in frames:
+        fields = dict(line.split(": ", 1) for line in frame.strip().splitlines() if not line.startswith(":"))
+        if "event" in fields:
+            events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+class TestEventBus:
+    """Tests for EventBus"""
+
+    def test_ids_and_replay(self):
+        bus = EventBus()
+        for i in range(5):
+            bus.publish("tick", "wf_1", n=i)
+        events, cursor, complete = bus.since(3)
+        assert [e["id"] for e in events] == [4, 5]
+        assert cursor == 5
+        assert complete
+
+    def test_workflow_from_trace_context(self):
+        bus = EventBus()
+        with trace_context("wf_ctx"):
+            event = bus.publish("tick")
+        assert event["workflow_id"] == "wf_ctx"
+
+    def test_filter_by_workflow(self):
+        bus = EventBus()
+        bus.publish("tick", "wf_1")
+        bus.publish("tick", "wf_2")
+        events, cursor, _ = bus.since(0, "wf_2")
+        assert [e["workflow_id"] for e in events] == ["wf_2"]
+        assert cursor == 2
+
+    def test_truncated_buffer_is_incomplete(self):
+        bus = EventBus(max_events=3)
+        for i in range(10):
+            bus.publish("tick")
+        events, _, complete = bus.since(2)
+        assert [e["id"] for e in events] == [8, 9, 10]
+        assert not complete
+        assert bus.since(7)[2]
+
+    def test_id_ahead_of_bus_replays_all(self):
+        bus = EventBus()
+        bus.publish("tick")
+        events, _, complete = bus.since(500)
+        assert [e["id"] for e in events] == [1]
+        assert not complete
+
+    def test_wait_wakes_on_publish(self):
+        bus = EventBus()
+        timer = threading.Timer(0.05, bus.publish, args=("tick",))
+        timer.start()
+        assert bus.wait(0, timeout=5)
+        assert not bus.wait(bus.last_id, timeout=0.01)
+
+
+class TestEventStream:
+    """Tests for the SSE generator"""
+
+    def test_resume_from_last_event_id(self):
+        bus = EventBus()
+        for i in range(4):
+            bus.publish("tick", "wf_1", n=i)
+        frames = event_stream(bus, last_event_id=2, max_events=2)
+        assert next(frames).startswith("retry:")
+        assert [data["data"]["n"] for _, data in parse(frames)] == [2, 3]
+
+    def test_reset_when_events_were_dropped(self):
+        bus = EventBus(max_events=2)
+        for i in range(5):
+            bus.publish("tick")
+        events = parse(event_stream(bus, last_event_id=1, max_events=2))
+        assert events[0][0] == "reset"
+        assert [data["id"] for _, data in events[1:]] == [4, 5]
+
+    def test_live_events_and_keepalive(self):
+        bus = EventBus()
+        bus.publish("old")
+        frames = event_stream(bus, heartbeat=0.01, max_events=1)
+        next(frames)
+        assert next(frames) == ": keepalive\n\n"
+        bus.publish("new")
+        assert parse(frames) == [("new", bus.since(1)[0][0])]
+
+
+class TestWorkflowEvents:
+    """Workflow runs publish their progress"""
+
+    @pytest.fixture
+    def orchestrator(self, tmp_path):
+        agent = OrchestratorAgent(api_key="test-key", checkpoint_store=CheckpointStore(tmp_path, fsync=False))
+        agent._analyze_niche = lambda niche: {"niche": niche, "status": "completed"}
+        yield agent
+        agent.shutdown()
+
+    def test_phase_and_item_events(self, orchestrator):
+        start = event_bus.last_id
+        result = orchestrator.run_workflow("kawaii cats", num_images=2, num_listings=1)
+        events, _, _ = event_bus.since(start, result["workflow_id"])
+        types = [e["type"] for e in events]
+
+        assert types[:3] == ["workflow.queued", "workflow.started", "phase.started"]
+        assert types[-1] == "workflow.finished"
+        assert types.count("image.generated") == 2
+        assert types.count("listing.created") == 1
+        assert events[-1]["data"]["status"] == "completed"
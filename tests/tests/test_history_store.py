@@ -0,0 +1,106 @@
+"""
+Tests for the bounded spill-to-disk history store
+"""
+
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from agents.history_store import HistoryStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    history = HistoryStore("test", key="id", hot_size=3, spill_dir=tmp_path)
+    yield history
+    history.close()
+
+
+def record(i):
+    return {"id": f"rec_{i:03d}", "n": i}
+
+
+class TestHistoryStore:
+    """Tests for HistoryStore"""
+
+    def test_hot_tail_is_bounded(self, store):
+        store.extend(record(i) for i in range(10))
+        stats = store.stats()
+        assert stats["hot"] == 3
+        assert stats["spilled"] == 7
+        assert len(store) == 10
+
+    def test_reads_span_memory_and_disk(self, store):
+        store.extend(record(i) for i in range(10))
+        assert [r["n"] for r in store] == list(range(10))
+        assert store[0]["n"] == 0
+        assert store[-1]["n"] == 9
+        assert [r["n"] for r in store.tail(4)] == [6, 7, 8, 9]
+        with pytest.raises(IndexError):
+            store[10]
+
+    def test_get_by_key(self, store):
+        store.extend(record(i) for i in range(10))
+        assert store.get("rec_001")["n"] == 1
+        assert store.get("rec_009")["n"] == 9
+        assert store.get("missing") is None
+        assert "rec_002" in store
+
+    def test_put_writes_back_spilled_record(self, store):
+        store.extend(record(i) for i in range(10))
+        spilled = store.get("rec_001")
+        spilled["status"] = "published"
+        store.put(spilled)
+        assert store.get("rec_001")["status"] == "published"
+        assert store[1]["status"] == "published"
+        assert len(store) == 10
+
+    def test_put_replaces_hot_record(self, store):
+        store.append(record(1))
+        store.put({"id": "rec_001", "n": 100})
+        assert store.get("rec_001")["n"] == 100
+        assert [r["n"] for r in store] == [100]
+
+    def test_put_unknown_key(self, store):
+        with pytest.raises(KeyError):
+            store.put(record(1))
+
+    def test_newest_duplicate_key_wins(self, store):
+        store.append({"id": "dup", "n": 1})
+        store.extend(record(i) for i in range(3))
+        store.append({"id": "dup", "n": 2})
+        store.extend(record(i) for i in range(3, 6))
+        assert store.get("dup")["n"] == 2
+
+    def test_concurrent_appends(self, store):
+        threads = [threading.Thread(target=store.extend, args=([record(t * 100 + i) for i in range(50)],))
+                   for t in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(store) == 200
+        assert len({r["id"] for r in store}) == 200
+
+    def test_close_removes_segment(self, tmp_path):
+        history = HistoryStore("closing", key="id", hot_size=1, spill_dir=tmp_path)
+        history.extend(record(i) for i in range(3))
+        assert history.segment_path.exists()
+        history.close()
+        assert not history.segment_path.exists()
+        assert not history.keys_path.exists()
+
+    def test_same_name_stores_do_not_share_files(self, tmp_path):
+        first = HistoryStore("shared", key="id", hot_size=1, spill_dir=tmp_path)
+        second = HistoryStore("shared", key="id", hot_size=1, spill_dir=tmp_path)
+        first.extend(record(i) for i in range(3))
+        second.extend(record(i + 100) for i in range(3))
+
+        assert first.segment_path != second.segment_path
+        assert [r["n"] for r in first] == [0, 1, 2]
+        assert first.get("rec_000")["n"] == 0
+        assert [r["n"] for r in second] == [100, 101, 102]
@@ -0,0 +1,89 @@
+"""
+Tests for version-based ETags and response compression
+"""
+
+import gzip
+import os
+import sys
+
+import pytest
+from flask import Flask, jsonify
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from web import http_cache
+from web.http_cache import Compression, conditional
+
+
+@pytest.fixture
+def app():
+    """App with one versioned resource and compression enabled."""
+    app = Flask(__name__)
+    app.state = {"version": 0, "calls": 0}
+    Compression(app, min_size=100)
+
+    @app.route('/items', methods=['GET', 'POST'])
+    @conditional('items', lambda: app.state["version"])
+    def items():
+        app.state["calls"] += 1
+        return jsonify({"items": ["x" * 20] * 50})
+
+    return app
+
+
+class TestConditional:
+    """Tests for the conditional decorator"""
+
+    def test_not_modified_skips_view(self, app):
+        client = app.test_client()
+        first = client.get('/items')
+        etag = first.headers["ETag"]
+        assert first.status_code == 200
+        assert first.headers["Cache-Control"] == "no-cache"
+
+        again = client.get('/items', headers={"If-None-Match": etag})
+        assert again.status_code == 304
+        assert again.headers["ETag"] == etag
+        assert app.state["calls"] == 1
+
+    def test_version_change_invalidates(self, app):
+        client = app.test_client()
+        etag = client.get('/items').headers["ETag"]
+        app.state["version"] += 1
+        changed = client.get('/items', headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.headers["ETag"] != etag
+
+    def test_tags_differ_across_processes(self, app, monkeypatch):
+        client = app.test_client()
+        etag = client.get('/items').headers["ETag"]
+        monkeypatch.setattr(http_cache, "PROCESS_EPOCH", "restarted")
+        assert client.get('/items', headers={"If-None-Match": etag}).status_code == 200
+
+    def test_post_is_not_conditional(self, app):
+        response = app.test_client().post('/items', headers={"If-None-Match": "*"})
+        assert response.status_code == 200
+        assert "ETag" not in response.headers
+
+
+class TestCompression:
+    """Tests for Compression"""
+
+    def test_gzip_when_accepted(self, app):
+        response = app.test_client().get('/items', headers={"Accept-Encoding": "gzip"})
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["Vary"]
+        assert b'"items"' in gzip.decompress(response.get_data())
+
+    def test_identity_without_accept_encoding(self, app):
+        response = app.test_client().get('/items')
+        assert "Content-Encoding" not in response.headers
+        assert b'"items"' in response.get_data()
+
+    def test_small_responses_untouched(self, app):
+        @app.route('/small')
+        def small():
+            return jsonify({"ok": True})
+
+        response = app.test_client().get('/small', headers={"Accept-Encoding": "gzip"})
+        assert "Content-Encoding" not in response.headers
@@ -0,0 +1,32 @@
+"""
+Tests for image source validation helpers
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from agents.image_io import is_allowed_image_url, is_within, path_slug
+
+
+class TestImageSources:
+    """Tests for URL, path and name checks on client-supplied images"""
+
+    def test_allowed_hosts(self):
+        hosts = ["images.example.com"]
+        assert is_allowed_image_url("https://images.example.com/a.png", hosts)
+        assert is_allowed_image_url("https://cdn.images.example.com/a.png", hosts)
+        assert not is_allowed_image_url("https://evil.com/?images.example.com", hosts)
+        assert not is_allowed_image_url("https://notimages.example.com/a.png", hosts)
+        assert not is_allowed_image_url("file:///etc/passwd", hosts)
+        assert not is_allowed_image_url("/etc/passwd", hosts)
+
+    def test_is_within(self, tmp_path):
+        assert is_within(tmp_path / "a" / "b.jpg", tmp_path)
+        assert not is_within(tmp_path / ".." / "b.jpg", tmp_path)
+
+    def test_path_slug(self):
+        assert path_slug("kawaii cats") == "kawaii_cats"
+        assert path_slug("../../tmp/pwned") == "tmp_pwned"
+        assert path_slug("..") == "untitled"
@@ -0,0 +1,70 @@
+"""
+Unit tests for full-text listing search
+"""
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from agents.listing_index import ListingIndex, build_match_query
+from agents.listing_manager import ListingManagerAgent
+
+
+@pytest.fixture
+def agent():
+    agent = ListingManagerAgent(api_key="test-key")
+    agent._optimize_title = lambda title: title
+    agent.create_listing("Kawaii Cat Wall Print", "Cute cat artwork for nurseries", 19.99, "cat.png", ["kawaii", "cat"])
+    agent.create_listing("Watercolor Mountain Poster", "Soft watercolor landscape", 24.99, "mtn.png", ["landscape"])
+    agent.create_listing("Minimalist Line Art", "Line drawing with a small cat", 14.99, "line.png", ["minimalist"])
+    # Filler so common terms keep a positive IDF
+    for i in range(3):
+        agent.create_listing(f"Abstract Shapes {i}", "Bold geometric design", 9.99, f"abs{i}.png", ["abstract"])
+    return agent
+
+
+class TestBuildMatchQuery:
+    """Test user input sanitising"""
+
+    def test_quotes_terms_and_keeps_prefix(self):
+        assert build_match_query('water* "cat" OR') == '"water"* "cat" "OR"'
+
+    def test_empty(self):
+        assert build_match_query("  --  ") == ""
+
+
+class TestListingSearch:
+    """Test ranking, prefix queries and index maintenance"""
+
+    def test_title_matches_rank_first(self, agent):
+        results = agent.search_listings("cat")
+        assert [r["id"] for r in results] == ["listing_00000", "listing_00002"]
+        assert results[0]["score"] > results[1]["score"]
+
+    def test_prefix_and_stemming(self, agent):
+        assert [r["id"] for r in agent.search_listings("water*")] == ["listing_00001"]
+        assert [r["id"] for r in agent.search_listings("drawings")] == ["listing_00002"]
+
+    def test_tags_are_searchable(self, agent):
+        assert [r["id"] for r in agent.search_listings("landscape")] == ["listing_00001"]
+
+    def test_update_reindexes(self, agent):
+        agent.update_listing("listing_00001", title="Botanical Fern Poster", tags=["botanical"])
+
+        assert agent.search_listings("fern")[0]["id"] == "listing_00001"
+        assert agent.search_listings("mountain") == []
+        assert agent.search_index.count() == 6
+
+    def test_update_rejects_unknown_fields(self, agent):
+        assert "error" in agent.update_listing("listing_00000", status="published")
+        assert agent.update_listing("missing", title="x") == {"error": "Listing not found"}
+
+    def test_remove(self):
+        index = ListingIndex()
+        index.upsert({"id": "a", "title": "sunset", "description": "", "tags": []})
+        index.remove("a")
+        assert index.search("sunset") == []
+        assert index.count() == 0
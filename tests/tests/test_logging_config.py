@@ -0,0 +1,123 @@
+"""
+Tests for queue-backed structured logging
+"""
+
+import os
+import sys
+import json
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from config import logging_config
+from config.logging_config import (DeferredQueueHandler, JsonFormatter, SamplingFilter, setup_worker_logging,
+                                   start_worker_listener)
+
+
+def make_record(msg, args=(), **extra):
+    record = logging.LogRecord("agents.test", logging.INFO, __file__, 1, msg, args, None)
+    for key, value in extra.items():
+        setattr(record, key, value)
+    return record
+
+
+class TestSamplingFilter:
+    """Tests for per-call-site sampling"""
+
+    def test_unmarked_records_always_pass(self):
+        sampler = SamplingFilter(rate=10)
+        assert all(sampler.filter(make_record("hello %s", ("x",))) for _ in range(25))
+
+    def test_marked_records_are_sampled(self):
+        sampler = SamplingFilter(rate=10)
+        kept = [r for r in (make_record("item %d", (i,), sample=True) for i in range(25)) if sampler.filter(r)]
+        assert len(kept) == 3
+        assert all(r.sampled_every == 10 for r in kept)
+
+    def test_call_sites_are_sampled_independently(self):
+        sampler = SamplingFilter(rate=10)
+        assert sampler.filter(make_record("a %d", (1,), sample=True))
+        assert sampler.filter(make_record("b %d", (1,), sample=True))
+
+
+class TestJsonFormatter:
+    """Tests for JSON line output"""
+
+    def test_message_and_extras(self):
+        record = make_record("workflow %s done", ("wf-1",), workflow_id="wf-1", sample=True)
+        entry = json.loads(JsonFormatter().format(record))
+        assert entry["msg"] == "workflow wf-1 done"
+        assert entry["level"] == "INFO"
+        assert entry["workflow_id"] == "wf-1"
+        assert "sample" not in entry
+
+    def test_exception_text(self):
+        try:
+            raise RuntimeError("boom")
+        except RuntimeError:
+            record = logging.LogRecord("x", logging.ERROR, __file__, 1, "failed", (), sys.exc_info())
+        entry = json.loads(JsonFormatter().format(record))
+        assert "RuntimeError: boom" in entry["exc"]
+
+
+class TestDeferredQueueHandler:
+    """Tests for listener-side formatting"""
+
+    @pytest.fixture
+    def handler(self):
+        import queue
+        return DeferredQueueHandler(queue.SimpleQueue())
+
+    def test_scalar_args_are_deferred(self, handler):
+        prepared = handler.prepare(make_record("image %d of %s", (3, "cats")))
+        assert prepared.msg == "image %d of %s"
+        assert prepared.args == (3, "cats")
+        assert prepared.getMessage() == "image 3 of cats"
+
+    def test_mutable_args_are_rendered_eagerly(self, handler):
+        tags = ["a"]
+        prepared = handler.prepare(make_record("tags %s", (tags,)))
+        tags.append("b")
+        assert prepared.msg == "tags ['a']"
+        assert prepared.args is None
+
+    def test_original_record_untouched(self, handler):
+        record = make_record("tags %s", (["a"],))
+        handler.prepare(record)
+        assert record.msg == "tags %s"
+
+
+class CaptureHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class TestWorkerLogging:
+    """Tests for forwarding process-pool worker records to the parent"""
+
+    def test_worker_records_reach_parent_handlers(self, monkeypatch):
+        capture = CaptureHandler()
+        monkeypatch.setattr(logging_config, "_listener", object())
+        monkeypatch.setattr(logging_config, "_listener_pid", os.getpid())
+        monkeypatch.setattr(logging_config, "_handlers", [capture])
+
+        context = multiprocessing.get_context("spawn")
+        log_queue = context.Queue()
+        listener = start_worker_listener(log_queue)
+        try:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context, initializer=setup_worker_logging,
+                                     initargs=(log_queue, "INFO")) as pool:
+                pool.submit(logging.getLogger("agents.worker").warning, "image %d of %s", 3, "cats").result()
+        finally:
+            listener.stop()
+
+        assert [r.getMessage() for r in capture.records] == ["image 3 of cats"]
+        assert capture.records[0].process != os.getpid()
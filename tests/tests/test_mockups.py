@@ -0,0 +1,82 @@
+"""
+Unit tests for the product mockup renderer
+"""
+
+import pytest
+import sys
+import os
+
+import cv2
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from agents.mockups import MockupRenderer, composite, load_template, MOCKUP_SIZE
+
+
+@pytest.fixture
+def art_path(tmp_path):
+    """Solid red test artwork"""
+    art = np.zeros((128, 128, 3), dtype=np.uint8)
+    art[..., 2] = 255
+    path = tmp_path / "art.png"
+    cv2.imwrite(str(path), art)
+    return path
+
+
+class TestComposite:
+    """Test warping and blending onto a template"""
+
+    def test_art_lands_inside_quad(self):
+        template = load_template("framed_print")
+        art = np.zeros((64, 64, 3), dtype=np.uint8)
+        art[..., 2] = 255
+
+        out = composite(template, art)
+
+        assert out.shape == (MOCKUP_SIZE, MOCKUP_SIZE, 3)
+        center = template.quad.mean(axis=0).astype(int)
+        b, g, r = out[center[1], center[0]]
+        assert r > 180 and b < 40 and g < 40
+        # Outside the art region the scene is untouched
+        assert np.array_equal(out[5, 5], template.background[5, 5])
+
+    def test_templates_are_cached(self):
+        assert load_template("canvas") is load_template("canvas")
+
+    def test_unknown_template(self):
+        with pytest.raises(ValueError):
+            load_template("mug")
+
+
+class TestMockupRenderer:
+    """Test batch rendering on the process pool"""
+
+    def test_render_many(self, art_path, tmp_path):
+        renderer = MockupRenderer(output_dir=tmp_path / "mockups", templates=["framed_print", "canvas"], max_workers=2)
+        try:
+            results = renderer.render_many({"listing_1": str(art_path), "listing_2": str(tmp_path / "missing.png")})
+        finally:
+            renderer.close()
+
+        assert [m["template"] for m in results["listing_1"]] == ["framed_print", "canvas"]
+        assert all(os.path.exists(m["path"]) for m in results["listing_1"])
+        assert results["listing_2"] == []
+
+    def test_same_stem_sources_do_not_collide(self, art_path, tmp_path):
+        other_dir = tmp_path / "other"
+        other_dir.mkdir()
+        other_path = other_dir / art_path.name
+        cv2.imwrite(str(other_path), np.zeros((300, 200, 3), np.uint8))
+
+        renderer = MockupRenderer(output_dir=tmp_path / "mockups", templates=["canvas"], max_workers=2)
+        try:
+            results = renderer.render_many({"listing_1": str(art_path), "listing_2": str(other_path)})
+        finally:
+            renderer.close()
+
+        paths = [results[key][0]["path"] for key in ("listing_1", "listing_2")]
+        assert paths[0] != paths[1]
+        assert all(os.path.exists(p) for p in paths)
+        assert not list((tmp_path / "mockups").rglob(".*.jpg"))
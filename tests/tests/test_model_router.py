@@ -0,0 +1,92 @@
+"""
+Tests for task-aware model routing and latency tracking
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from agents.model_router import LatencyRegistry, LatencyStats, ModelRouter
+
+TIERS = {"quality": "big-model", "fast": "small-model", "vision": "eye-model"}
+
+
+class StubClient:
+    """OpenAI-shaped client recording the model of each completion."""
+
+    def __init__(self, fail=False):
+        self.models = []
+        self.fail = fail
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, **kwargs):
+        self.models.append(model)
+        if self.fail:
+            raise RuntimeError("upstream error")
+        return SimpleNamespace(choices=[])
+
+
+@pytest.fixture
+def registry():
+    return LatencyRegistry()
+
+
+class TestModelRouter:
+    """Tests for ModelRouter"""
+
+    def test_task_resolves_through_tier(self, registry):
+        router = ModelRouter(StubClient(), tiers=TIERS, registry=registry)
+        assert router.model_for("niche_analysis") == "big-model"
+        assert router.model_for("captions") == "small-model"
+        assert router.model_for("draft_review") == "eye-model"
+
+    def test_unknown_task_falls_back_to_quality(self, registry):
+        client = StubClient()
+        router = ModelRouter(client, tiers=TIERS, registry=registry)
+        assert router.model_for("something_new") == "big-model"
+        router.complete("something_new", [{"role": "user", "content": "hi"}])
+        assert client.models == ["big-model"]
+
+    def test_override_wins(self, registry):
+        router = ModelRouter(StubClient(), tiers=TIERS, registry=registry)
+        router.set_model("captions", "pinned-model")
+        assert router.model_for("captions") == "pinned-model"
+        assert router.describe()["captions"]["model"] == "pinned-model"
+
+    def test_complete_records_latency_and_errors(self, registry):
+        ModelRouter(StubClient(), tiers=TIERS, registry=registry).complete("captions", [])
+        with pytest.raises(RuntimeError):
+            ModelRouter(StubClient(fail=True), tiers=TIERS, registry=registry).complete("captions", [])
+
+        stats = registry.snapshot()["small-model"]
+        assert stats["calls"] == 2
+        assert stats["errors"] == 1
+        assert stats["p50_ms"] is not None
+
+
+class TestLatencyRegistry:
+    """Tests for LatencyRegistry snapshots"""
+
+    def test_percentiles(self, registry):
+        for ms in range(1, 101):
+            registry.record("m", ms / 1000)
+        registry.record("m", 5.0, ok=False)
+
+        stats = registry.snapshot()["m"]
+        assert stats["calls"] == 101
+        assert stats["errors"] == 1
+        assert stats["avg_ms"] == 50.5
+        assert stats["p50_ms"] == 51.0
+        assert stats["p95_ms"] == 96.0
+
+    def test_over_target_counted(self, registry):
+        registry.record("m", 3.0, over_target=True)
+        assert registry.snapshot()["m"]["over_target"] == 1
+
+    def test_empty_model_has_no_percentiles(self):
+        summary = LatencyStats().summary()
+        assert summary["p50_ms"] is None and summary["avg_ms"] is None
@@ -0,0 +1,109 @@
+"""
+Tests for cascade niche ranking and viability parsing
+"""
+
+import os
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from agents.niche_discovery import parse_competition, parse_viability
+from agents.niche_ranker import NicheRanker
+from agents.tag_analytics import TagAnalytics
+
+VIABILITY = {"kawaii cats": 9, "cat portraits": 4, "retro cars": 7}
+
+
+def fake_analysis(niche):
+    return {"niche": niche, "market_viability": VIABILITY.get(niche, 6), "competition_level": "medium",
+            "trending_keywords": [], "status": "completed"}
+
+
+@pytest.fixture
+def analytics():
+    tags = TagAnalytics()
+    for _ in range(5):
+        tags.add_listing(["cat", "kawaii", "cat art"])
+    tags.add_listing(["retro", "car"])
+    tags.record_keywords("cats", ["kawaii cat print", "cat portraits"])
+    return tags
+
+
+@pytest.fixture
+def ranker(analytics):
+    agent = MagicMock()
+    agent.analyze_niche.side_effect = fake_analysis
+    return NicheRanker(agent, analytics)
+
+
+class TestViabilityParsing:
+    """Tests for extracting scores from market analysis text"""
+
+    @pytest.mark.parametrize("text,expected", [
+        ("**Market Viability Score: 8/10**", 8.0),
+        ("1. Market Viability Score (1-10): 6.5", 6.5),
+        ("Market viability: I'd rate it 7 out of 10", 7.0),
+        ("No score given", None),
+    ])
+    def test_parse_viability(self, text, expected):
+        assert parse_viability(text) == expected
+
+    def test_parse_competition(self):
+        assert parse_competition("3. Competition Level: **Moderate**") == "medium"
+        assert parse_competition("nothing here") == "unknown"
+
+
+class TestNicheRanker:
+    """Tests for NicheRanker"""
+
+    def test_screen_uses_local_signals(self, ranker):
+        screened = ranker.screen(["underwater basket weaving", "kawaii cats", "retro cars"])
+        assert [s["niche"] for s in screened][0] == "kawaii cats"
+        assert screened[-1]["local_score"] == 0
+        ranker.niche_agent.analyze_niche.assert_not_called()
+
+    def test_sales_signal(self, ranker):
+        before = {s["niche"]: s for s in ranker.screen(["kawaii cats", "retro cars"])}
+        after = {s["niche"]: s for s in ranker.screen(["kawaii cats", "retro cars"], sales={"retro car": 500})}
+        assert after["retro cars"]["signals"]["sales"] == 1.0
+        assert after["retro cars"]["local_score"] > before["retro cars"]["local_score"]
+
+    def test_only_top_k_analyzed(self, ranker):
+        candidates = ["kawaii cats", "cat portraits", "retro cars"] + [f"niche {i}" for i in range(200)]
+        result = ranker.rank(candidates, top_k=2)
+        assert result["candidates"] == 203
+        assert ranker.niche_agent.analyze_niche.call_count == 2
+        assert [r["stage"] for r in result["ranking"][:3]] == ["analyzed", "analyzed", "screened"]
+
+    def test_analyzed_reordered_by_viability(self, ranker):
+        result = ranker.rank(["kawaii cats", "cat portraits"], top_k=2)
+        assert result["ranking"][0]["niche"] == "kawaii cats"
+        assert result["ranking"][0]["is_viable"]
+        assert not result["ranking"][1]["is_viable"]
+
+    def test_analyses_are_cached(self, ranker):
+        ranker.rank(["kawaii cats", "retro cars"], top_k=2)
+        result = ranker.rank(["kawaii cats", "retro cars"], top_k=2)
+        assert result["cache_hits"] == 2
+        assert ranker.niche_agent.analyze_niche.call_count == 2
+
+    def test_failed_analysis_not_cached(self, ranker):
+        ranker.niche_agent.analyze_niche.side_effect = lambda n: {"niche": n, "status": "failed", "error": "boom"}
+        result = ranker.rank(["kawaii cats"], top_k=1)
+        assert result["ranking"][0]["error"] == "boom"
+        ranker.rank(["kawaii cats"], top_k=1)
+        assert ranker.niche_agent.analyze_niche.call_count == 2
+
+    def test_cache_evicts_least_recently_used(self, analytics):
+        agent = MagicMock()
+        agent.analyze_niche.side_effect = fake_analysis
+        ranker = NicheRanker(agent, analytics, cache_size=2)
+        for niche in ["kawaii cats", "retro cars", "kawaii cats", "cat portraits"]:
+            ranker.rank([niche], top_k=1)
+
+        assert len(ranker._analyses) == 2
+        assert ranker.rank(["kawaii cats"], top_k=1)["cache_hits"] == 1
+        assert ranker.rank(["retro cars"], top_k=1)["cache_hits"] == 0
@@ -0,0 +1,82 @@
+"""
+Unit tests for concurrent OrchestratorAgent workflows
+"""
+
+import pytest
+import sys
+import os
+import threading
+import time
+from unittest.mock import patch
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from agents.checkpoints import CheckpointStore
+from agents.orchestrator import OrchestratorAgent
+
+
+@pytest.fixture
+def orchestrator(tmp_path):
+    """Orchestrator running at most two workflows at once"""
+    agent = OrchestratorAgent(api_key="test-key",
+                              checkpoint_store=CheckpointStore(tmp_path, fsync=False),
+                              max_concurrent_workflows=2)
+    yield agent
+    agent.shutdown(wait=True)
+
+
+class TestConcurrentWorkflows:
+    """Test workflow isolation and the bounded executor"""
+
+    def test_ids_are_unique(self, orchestrator):
+        """Workflows started at the same moment get distinct ids"""
+        with patch.object(orchestrator, "_analyze_niche", return_value={"status": "completed"}):
+            ids = {orchestrator.run_workflow("cats", 1, 1)["workflow_id"] for _ in range(20)}
+        assert len(ids) == 20
+
+    def test_submitted_workflows_are_isolated_and_bounded(self, orchestrator):
+        """Each workflow keeps its own state and no more than two run at once"""
+        release = threading.Event()
+        lock = threading.Lock()
+        running = {"now": 0, "peak": 0}
+
+        def slow_analysis(niche):
+            with lock:
+                running["now"] += 1
+                running["peak"] = max(running["peak"], running["now"])
+            release.wait(timeout=5)
+            with lock:
+                running["now"] -= 1
+            return {"niche": niche, "status": "completed"}
+
+        niches = ["cats", "dogs", "owls", "frogs"]
+        with patch.object(orchestrator, "_analyze_niche", side_effect=slow_analysis):
+            runs = [orchestrator.submit_workflow(niche, 2, 2) for niche in niches]
+            assert len(orchestrator.list_workflows(status="pending")) >= 2
+            deadline = time.monotonic() + 5
+            while running["now"] < 2 and time.monotonic() < deadline:
+                time.sleep(0.005)
+            release.set()
+            orchestrator.shutdown(wait=True)
+
+        assert running["peak"] == 2
+        for run, niche in zip(runs, niches):
+            status = orchestrator.get_workflow_status(run.workflow_id)
+            assert status["status"] == "completed"
+            assert status["state"]["niche_analysis"]["niche"] == niche
+        assert len(orchestrator.list_workflows(niche="owls")) == 1
+
+    def test_active_workflow_id_is_rejected(self, orchestrator):
+        """The same workflow id cannot run twice at once"""
+        release = threading.Event()
+
+        def blocked(niche):
+            release.wait(timeout=5)
+            return {"status": "completed"}
+
+        with patch.object(orchestrator, "_analyze_niche", side_effect=blocked):
+            orchestrator.submit_workflow("cats", 1, 1, workflow_id="workflow_dup")
+            with pytest.raises(ValueError):
+                orchestrator.submit_workflow("cats", 1, 1, workflow_id="workflow_dup")
+            release.set()
@@ -0,0 +1,145 @@
+"""
+Unit tests for the heap-based TikTok post scheduler
+"""
+
+import pytest
+import sys
+import os
+import time
+import threading
+from datetime import datetime, timedelta
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from agents.post_scheduler import PostScheduler
+from agents.tiktok_manager import TikTokManagerAgent
+
+
+class FakeClock:
+    """Manually advanced clock"""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def scheduler(clock):
+    return PostScheduler(lambda ids: None, interval_seconds=60, batch_size=3, clock=clock)
+
+
+class TestPostScheduler:
+    """Test ordering, spacing and batching"""
+
+    def test_pop_due_in_time_order(self, scheduler, clock):
+        """Only due posts are returned, earliest first"""
+        scheduler.schedule("late", 1300)
+        scheduler.schedule("early", 1100)
+        scheduler.schedule("middle", 1200)
+
+        clock.now = 1250
+        assert scheduler.pop_due() == ["early", "middle"]
+        assert len(scheduler) == 1
+
+    def test_batches_are_capped(self, scheduler):
+        """A backlog of due posts is drained in batch_size chunks"""
+        for i in range(7):
+            scheduler.schedule(f"post_{i}", 900 + i)
+
+        assert len(scheduler.pop_due()) == 3
+        assert len(scheduler.pop_due()) == 3
+        assert scheduler.pop_due() == ["post_6"]
+
+    def test_cancel_and_reschedule(self, scheduler, clock):
+        """Cancelled posts are skipped and rescheduled posts use their new time"""
+        scheduler.schedule("a", 1100)
+        scheduler.schedule("b", 1100)
+        scheduler.schedule("b", 5000)
+        assert scheduler.cancel("a")
+        assert not scheduler.cancel("missing")
+
+        clock.now = 2000
+        assert scheduler.pop_due() == []
+        clock.now = 5000
+        assert scheduler.pop_due() == ["b"]
+
+    def test_auto_slots_are_spaced(self, scheduler, clock):
+        """Automatic slots are one interval apart"""
+        first = scheduler.next_slot()
+        second = scheduler.next_slot()
+        assert first == clock.now + 60
+        assert second - first == 60
+
+    def test_dispatcher_publishes_due_posts(self):
+        """The background thread publishes posts when they fall due"""
+        published = []
+        done = threading.Event()
+
+        def publish(ids):
+            published.extend(ids)
+            if len(published) == 2:
+                done.set()
+
+        scheduler = PostScheduler(publish, interval_seconds=60)
+        scheduler.start()
+        try:
+            scheduler.schedule("soon", time.time() + 0.05)
+            scheduler.schedule("now", time.time())
+            assert done.wait(timeout=2)
+        finally:
+            scheduler.stop()
+        assert published == ["now", "soon"]
+
+
+class TestTikTokScheduling:
+    """Test TikTokManagerAgent integration"""
+
+    def test_posts_are_spaced_and_published_by_id(self):
+        """Posts without a time are spaced by the posting interval"""
+        agent = TikTokManagerAgent(api_key="test-key")
+        first = agent.schedule_post("https://example.com/a.mp4", "caption a")
+        second = agent.schedule_post("https://example.com/b.mp4", "caption b")
+
+        gap = datetime.fromisoformat(second["scheduled_time"]) - datetime.fromisoformat(first["scheduled_time"])
+        assert gap == timedelta(seconds=agent.scheduler.interval_seconds)
+
+        assert agent.publish_post(first["id"])["status"] == "published"
+        assert not agent.scheduler.is_scheduled(first["id"])
+        assert agent.publish_post("tiktok_post_missing") == {"error": "Post not found"}
+
+    def test_invalid_time_rejected(self):
+        """Unparseable times raise ValueError"""
+        agent = TikTokManagerAgent(api_key="test-key")
+        with pytest.raises(ValueError):
+            agent.schedule_post("https://example.com/a.mp4", "caption", scheduled_time="tomorrow")
+
+    def test_concurrent_posts_get_unique_ids(self):
+        """Posts scheduled from many threads never share an id"""
+        agent = TikTokManagerAgent(api_key="test-key")
+        threads = [threading.Thread(target=lambda: [agent.schedule_post("v.mp4", "c") for _ in range(20)])
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        ids = [post["id"] for post in agent.get_scheduled_posts()]
+        assert len(ids) == len(set(ids)) == 80
+
+    def test_pending_posts_are_requeued_on_startup(self):
+        """A new agent on an existing store queues the posts that never went out"""
+        first = TikTokManagerAgent(api_key="test-key")
+        pending = first.schedule_post("a.mp4", "a")
+        done = first.schedule_post("b.mp4", "b")
+        first.publish_post(done["id"])
+
+        restarted = TikTokManagerAgent(api_key="test-key", scheduled_posts=first.scheduled_posts)
+        assert restarted.scheduler.is_scheduled(pending["id"])
+        assert not restarted.scheduler.is_scheduled(done["id"])
@@ -0,0 +1,94 @@
+"""
+Unit tests for the banded print export pipeline
+"""
+
+import pytest
+import sys
+import os
+
+import cv2
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from agents.print_export import PrintExporter, render_print, print_pixels
+
+
+@pytest.fixture
+def source_image(tmp_path):
+    """Square gradient test image"""
+    ramp = np.linspace(0, 255, 256, dtype=np.uint8)
+    image = np.dstack([np.tile(ramp, (256, 1)), np.tile(ramp[:, None], (1, 256)), np.full((256, 256), 128, np.uint8)])
+    path = tmp_path / "source.png"
+    cv2.imwrite(str(path), image)
+    return path
+
+
+class TestRenderPrint:
+    """Test single-size rendering"""
+
+    def test_output_size_and_dpi(self, source_image, tmp_path):
+        """Output has the requested pixels and a 300 DPI JFIF header"""
+        output = tmp_path / "out" / "print.jpg"
+        result = render_print(str(source_image), str(output), 300, 420, dpi=300, band_rows=64)
+
+        assert result["pixels"] == "300x420"
+        image = cv2.imread(str(output))
+        assert image.shape == (420, 300, 3)
+        with open(output, "rb") as f:
+            header = f.read(18)
+        assert header[13] == 1
+        assert int.from_bytes(header[14:16], "big") == 300
+        assert not output.with_suffix(".scratch").exists()
+
+    def test_banding_matches_single_pass(self, source_image, tmp_path):
+        """Band boundaries do not change the resampled output"""
+        banded = tmp_path / "banded.jpg"
+        whole = tmp_path / "whole.jpg"
+        render_print(str(source_image), str(banded), 200, 250, band_rows=16)
+        render_print(str(source_image), str(whole), 200, 250, band_rows=1000)
+
+        diff = np.abs(cv2.imread(str(banded)).astype(int) - cv2.imread(str(whole)).astype(int))
+        assert diff.max() <= 1
+
+    def test_unreadable_source(self, tmp_path):
+        with pytest.raises(ValueError):
+            render_print(str(tmp_path / "missing.png"), str(tmp_path / "out.jpg"), 10, 10)
+
+
+class TestPrintExporter:
+    """Test multi-size export on the process pool"""
+
+    def test_export_many(self, source_image, tmp_path):
+        sizes = {"small": (1, 1.4), "wide": (1.5, 1)}
+        exporter = PrintExporter(output_dir=tmp_path / "exports", sizes=sizes, dpi=100, max_workers=2)
+        try:
+            results = exporter.export_many({"img_a": str(source_image), "img_b": str(source_image)})
+        finally:
+            exporter.close()
+
+        assert set(results) == {"img_a", "img_b"}
+        for files in results.values():
+            assert [f["size"] for f in files] == ["small", "wide"]
+            assert all(os.path.exists(f["path"]) for f in files)
+        assert results["img_a"][1]["pixels"] == "150x100"
+
+    def test_ids_cannot_escape_output_dir(self, source_image, tmp_path):
+        exporter = PrintExporter(output_dir=tmp_path / "exports", sizes={"small": (1, 1)}, dpi=50, max_workers=1)
+        try:
+            results = exporter.export_many({"img_../../escaped": str(source_image)})
+        finally:
+            exporter.close()
+
+        path = results["img_../../escaped"][0]["path"]
+        assert os.path.realpath(path).startswith(os.path.realpath(tmp_path / "exports") + os.sep)
+        assert not (tmp_path / "escaped").exists()
+
+    def test_unknown_size(self, source_image, tmp_path):
+        exporter = PrintExporter(output_dir=tmp_path, max_workers=1)
+        with pytest.raises(ValueError):
+            exporter.export_many({"img": str(source_image)}, sizes=["poster"])
+
+    def test_print_pixels(self):
+        assert print_pixels((16, 20), 300) == (4800, 6000)
@@ -0,0 +1,83 @@
+"""
+Tests for slotted records and the fast JSON provider
+"""
+
+import os
+import sys
+import json
+
+import pytest
+from flask import Flask, jsonify
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from agents.history_store import HistoryStore
+from agents.records import Listing, TikTokPost, json_default
+from web.json_provider import FastJSONProvider
+
+
+@pytest.fixture
+def listing():
+    return Listing(id="listing_00001", title="Cat Print", description="A cat", price=19.99,
+                   image_url="https://example.com/cat.png", tags=["cat", "print"], created_at="2026-01-07")
+
+
+class TestRecords:
+    """Tests for dict-compatible slotted records"""
+
+    def test_no_instance_dict(self, listing):
+        assert not hasattr(listing, "__dict__")
+
+    def test_mapping_access(self, listing):
+        assert listing["title"] == "Cat Print"
+        assert listing.get("mockups", []) == []
+        assert "mockups" not in listing
+        assert {**listing, "score": 1.0}["score"] == 1.0
+
+    def test_mutation(self, listing):
+        listing.update({"title": "Dog Print", "status": "published"})
+        listing.setdefault("etsy_image_ids", []).append(7)
+        assert listing.title == "Dog Print"
+        assert listing["etsy_image_ids"] == [7]
+        with pytest.raises(KeyError):
+            listing["no_such_field"] = 1
+
+    def test_dict_round_trip(self, listing):
+        data = listing.to_dict()
+        assert "mockups" not in data
+        assert Listing.from_dict({**data, "unknown": 1}) == listing
+        assert listing == data
+
+    def test_history_store_rebuilds_records(self, tmp_path):
+        store = HistoryStore("posts", key="id", hot_size=1, spill_dir=tmp_path, record_type=TikTokPost)
+        store.extend([TikTokPost(id=f"p{i}", video_url="v.mp4", caption="c", scheduled_time="t") for i in range(3)])
+        spilled = store.get("p0")
+        assert isinstance(spilled, TikTokPost)
+        spilled["status"] = "published"
+        store.put(spilled)
+        assert store[0].status == "published"
+        store.close()
+
+    def test_json_default(self, listing):
+        assert json.loads(json.dumps({"listing": listing}, default=json_default))["listing"]["id"] == "listing_00001"
+
+
+class TestFastJSONProvider:
+    """Tests for the orjson-backed Flask JSON provider"""
+
+    @pytest.fixture
+    def app(self):
+        app = Flask(__name__)
+        app.json = FastJSONProvider(app)
+        return app
+
+    def test_response_matches_default_output(self, app, listing):
+        with app.app_context():
+            response = jsonify({"listings": [listing], "count": 1})
+        assert response.mimetype == "application/json"
+        assert json.loads(response.get_data()) == {"listings": [listing.to_dict()], "count": 1}
+
+    def test_dumps_and_loads(self, app, listing):
+        text = app.json.dumps({"b": 1, "a": listing})
+        assert text.index('"a"') < text.index('"b"')
+        assert app.json.loads(text)["a"]["tags"] == ["cat", "print"]
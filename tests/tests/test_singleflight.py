@@ -0,0 +1,97 @@
+"""
+Unit tests for single-flight request coalescing
+"""
+
+import pytest
+import sys
+import os
+import threading
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from agents.singleflight import SingleFlight, coalesce
+
+
+class Analyzer:
+    """Slow analyzer that counts real executions"""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = threading.Event()
+
+    @coalesce()
+    def analyze(self, niche):
+        self.calls += 1
+        self.release.wait(timeout=5)
+        if niche == "broken":
+            raise RuntimeError("analysis failed")
+        return {"niche": niche, "keywords": []}
+
+
+def run_concurrently(fn, count):
+    results, errors = [], []
+
+    def call():
+        try:
+            results.append(fn())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results, errors
+
+
+class TestCoalescing:
+    """Test shared execution of identical calls"""
+
+    def test_identical_calls_share_one_execution(self):
+        """Eight concurrent calls run the method once and get equal, independent results"""
+        analyzer = Analyzer()
+        threads, results, _ = run_concurrently(lambda: analyzer.analyze("kawaii cats"), 8)
+        while analyzer.analyze.singleflight.waiting() < 7:
+            pass
+        analyzer.release.set()
+        for thread in threads:
+            thread.join()
+
+        assert analyzer.calls == 1
+        assert len(results) == 8
+        results[0]["keywords"].append("mutated")
+        assert all(r["keywords"] == [] for r in results[1:])
+
+    def test_unhashable_arguments_run_uncoalesced(self):
+        """Unhashable arguments fall back to a plain call"""
+        analyzer = Analyzer()
+        analyzer.release.set()
+        assert analyzer.analyze(["cats", "dogs"])["niche"] == ["cats", "dogs"]
+        assert analyzer.calls == 1
+
+    def test_different_arguments_run_separately(self):
+        """Calls with different arguments are not coalesced"""
+        analyzer = Analyzer()
+        analyzer.release.set()
+        analyzer.analyze("cats")
+        analyzer.analyze("dogs")
+        assert analyzer.calls == 2
+
+    def test_errors_are_shared(self):
+        """Followers see the leader's exception"""
+        analyzer = Analyzer()
+        threads, results, errors = run_concurrently(lambda: analyzer.analyze("broken"), 4)
+        while analyzer.analyze.singleflight.waiting() < 3:
+            pass
+        analyzer.release.set()
+        for thread in threads:
+            thread.join()
+
+        assert analyzer.calls == 1
+        assert len(errors) == 4 and not results
+
+    def test_sequential_calls_are_not_cached(self):
+        """Coalescing only covers calls that overlap in time"""
+        group = SingleFlight()
+        assert group.do("key", lambda: 1) == (1, False)
+        assert group.do("key", lambda: 2) == (2, False)
@@ -0,0 +1,63 @@
+"""
+Unit tests for local tag and keyword analytics
+"""
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from agents.tag_analytics import TagAnalytics
+
+
+@pytest.fixture
+def analytics():
+    analytics = TagAnalytics()
+    analytics.add_listing(["Kawaii", "cat", "nursery decor"])
+    analytics.add_listing(["kawaii", "cat", "cute gift"])
+    analytics.add_listing(["cat", "minimalist"])
+    analytics.add_listing(["mountain", "landscape"])
+    return analytics
+
+
+class TestTagAnalytics:
+    """Test co-occurrence counting and suggestions"""
+
+    def test_suggestions_rank_by_association(self, analytics):
+        suggestions = analytics.suggest_tags(["kawaii"])
+        tags = [s["tag"] for s in suggestions]
+
+        assert tags[0] == "cat"
+        assert set(tags) == {"cat", "nursery decor", "cute gift"}
+        assert "kawaii" not in tags
+
+    def test_top_pairs_count_each_pair_once(self, analytics):
+        top = analytics.top_pairs(limit=1)[0]
+        assert sorted(top["tags"]) == ["cat", "kawaii"]
+        assert top["count"] == 2
+
+    def test_update_retracts_old_tags(self, analytics):
+        analytics.update_listing(["cat", "minimalist"], ["cat", "kawaii"])
+        pairs = {tuple(sorted(p["tags"])): p["count"] for p in analytics.top_pairs()}
+
+        assert pairs[("cat", "kawaii")] == 3
+        assert ("cat", "minimalist") not in pairs
+
+    def test_niche_keywords_fill_suggestions(self, analytics):
+        analytics.record_keywords("Kawaii Cats", ["cat print", "kawaii art", "cat print"])
+        suggestions = analytics.suggest_tags(["landscape"], niche="kawaii cats", limit=3)
+
+        assert [s["tag"] for s in suggestions] == ["mountain", "cat print", "kawaii art"]
+        assert suggestions[1]["source"] == "niche keywords"
+
+    def test_keyword_table_and_overlap(self, analytics):
+        analytics.record_keywords("cats", ["cat art", "cat gift"])
+        analytics.record_keywords("dogs", ["dog art", "cat gift"])
+
+        table = analytics.keyword_table()
+        assert table.loc["cat gift", "niches"] == 2
+        overlap = analytics.niche_overlap()
+        assert overlap.loc["cats", "dogs"] == pytest.approx(1 / 3, abs=1e-3)
+        assert overlap.loc["cats", "cats"] == 1.0
@@ -0,0 +1,112 @@
+"""
+Unit tests for span tracing and per-request profiling
+"""
+
+import pytest
+import sys
+import os
+from unittest.mock import patch
+
+from flask import Flask
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from agents.checkpoints import CheckpointStore
+from agents.orchestrator import OrchestratorAgent
+from agents.tracing import Tracer, current_trace_id, trace_context, tracer
+from web.profiling import RequestProfiler
+
+
+class TestTracer:
+    """Test span recording and Chrome trace export"""
+
+    def test_span_export(self):
+        local = Tracer(max_events=10, enabled=True)
+        with trace_context("wf_1"):
+            with local.span("outer", "phase", size=3):
+                with local.span("inner", "model"):
+                    pass
+        with local.span("other"):
+            pass
+
+        trace = local.export(trace_id="wf_1")
+        spans = [e for e in trace["traceEvents"] if e["ph"] == "X"]
+        assert [s["name"] for s in spans] == ["inner", "outer"]
+        assert spans[1]["args"] == {"size": 3, "trace_id": "wf_1"}
+        assert spans[1]["dur"] >= spans[0]["dur"]
+        assert any(e["ph"] == "M" for e in trace["traceEvents"])
+
+    def test_errors_are_recorded(self):
+        local = Tracer(enabled=True)
+        with pytest.raises(KeyError):
+            with local.span("lookup"):
+                raise KeyError("x")
+        assert local.export()["traceEvents"][-1]["args"]["error"] == "KeyError"
+
+    def test_disabled_records_nothing(self):
+        local = Tracer(enabled=False)
+        with local.span("ignored"):
+            pass
+        assert local.export()["traceEvents"] == []
+
+    def test_workflow_phases_are_traced(self, tmp_path):
+        orchestrator = OrchestratorAgent(api_key="test-key", checkpoint_store=CheckpointStore(tmp_path, fsync=False))
+        tracer.enabled = True
+        try:
+            with patch.object(orchestrator, "_analyze_niche", return_value={"status": "completed"}):
+                workflow_id = orchestrator.run_workflow("cats", 1, 1)["workflow_id"]
+        finally:
+            orchestrator.shutdown()
+
+        names = [e["name"] for e in tracer.export(trace_id=workflow_id)["traceEvents"] if e["ph"] == "X"]
+        assert names[-1] == "workflow"
+        assert {"niche_analysis", "generated_art", "listings", "tiktok_schedule"} <= set(names)
+
+
+class TestRequestProfiler:
+    """Test opt-in cProfile dumps"""
+
+    @pytest.fixture
+    def make_app(self, tmp_path):
+        def build(**kwargs):
+            app = Flask(__name__)
+            RequestProfiler(app, output_dir=tmp_path, **kwargs)
+
+            @app.route('/ping')
+            def ping():
+                return "pong"
+            return app
+        return build
+
+    def test_header_triggers_profile(self, make_app, tmp_path):
+        client = make_app(enabled=True).test_client()
+        response = client.get('/ping', headers={"X-Profile": "1"})
+
+        assert response.headers["X-Profile-File"].endswith(".prof")
+        assert (tmp_path / response.headers["X-Profile-File"]).exists()
+        assert "X-Profile-File" not in client.get('/ping').headers
+
+    def test_client_request_id_is_not_the_trace_id(self, make_app, tmp_path):
+        app = make_app(enabled=True)
+
+        @app.route('/trace')
+        def trace():
+            return current_trace_id.get()
+
+        client = app.test_client()
+        response = client.get('/trace', headers={"X-Profile": "1", "X-Request-ID": "../../wf_victim"})
+
+        trace_id = response.get_data(as_text=True)
+        assert trace_id != "../../wf_victim"
+        assert response.headers["X-Request-ID"] == trace_id
+        name = response.headers["X-Profile-File"]
+        assert "/" not in name and "victim" not in name
+        assert (tmp_path / name).exists()
+
+    def test_disabled_and_token(self, make_app):
+        assert "X-Profile-File" not in make_app().test_client().get('/ping?profile=1').headers
+
+        client = make_app(enabled=True, token="secret").test_client()
+        assert "X-Profile-File" not in client.get('/ping', headers={"X-Profile": "1"}).headers
+        assert "X-Profile-File" in client.get('/ping', headers={"X-Profile": "secret"}).headers
@@ -0,0 +1,95 @@
+"""
+Unit tests for the TikTok slideshow renderer
+"""
+
+import pytest
+import sys
+import os
+
+import cv2
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from agents import video_renderer
+from agents.video_renderer import SlideshowRenderer, render_slideshow
+
+
+@pytest.fixture
+def image_paths(tmp_path):
+    """Three solid-colour test images"""
+    paths = []
+    for i, color in enumerate([(255, 0, 0), (0, 255, 0), (0, 0, 255)]):
+        path = tmp_path / f"slide_{i}.png"
+        cv2.imwrite(str(path), np.full((96, 96, 3), color, dtype=np.uint8))
+        paths.append(str(path))
+    return paths
+
+
+class TestRenderSlideshow:
+    """Test single video rendering"""
+
+    def test_frame_count_and_size(self, image_paths, tmp_path):
+        output = tmp_path / "video.mp4"
+        result = render_slideshow(image_paths, "Cute cats #art", str(output), duration=2, fps=10, size=(90, 160))
+
+        assert result["frames"] == 20
+        assert result["images"] == 3
+        capture = cv2.VideoCapture(str(output))
+        assert int(capture.get(cv2.CAP_PROP_FRAME_COUNT)) == 20
+        ok, frame = capture.read()
+        capture.release()
+        assert ok and frame.shape == (160, 90, 3)
+
+    def test_unreadable_images_are_skipped(self, image_paths, tmp_path):
+        paths = [str(tmp_path / "missing.png")] + image_paths[:1]
+        result = render_slideshow(paths, "", str(tmp_path / "video.mp4"), duration=1, fps=5, size=(90, 160))
+        assert result["images"] == 1
+
+    def test_ken_burns_motion_is_continuous(self, image_paths, tmp_path, monkeypatch):
+        """A slide keeps moving forward from where its fade-in left it"""
+        progress = {}
+        original = video_renderer._ken_burns
+
+        def record(base, width, height, t, index):
+            progress.setdefault(index, []).append(t)
+            return original(base, width, height, t, index)
+
+        monkeypatch.setattr(video_renderer, "_ken_burns", record)
+        render_slideshow(image_paths, "", str(tmp_path / "video.mp4"), duration=3, fps=10, size=(90, 160))
+
+        for values in progress.values():
+            assert values == sorted(values)
+            assert all(0 <= t <= 1 for t in values)
+
+    def test_no_images(self, tmp_path):
+        with pytest.raises(ValueError):
+            render_slideshow([str(tmp_path / "missing.png")], "", str(tmp_path / "video.mp4"))
+
+
+class TestSlideshowRenderer:
+    """Test parallel rendering"""
+
+    def test_render_many(self, image_paths, tmp_path):
+        renderer = SlideshowRenderer(output_dir=tmp_path, duration=1, fps=5, max_workers=2)
+        try:
+            results = renderer.render_many({
+                "video_a": {"images": image_paths, "caption": "first"},
+                "video_b": {"images": [str(tmp_path / "missing.png")], "caption": "second"}
+            })
+        finally:
+            renderer.close()
+
+        assert os.path.exists(results["video_a"]["path"])
+        assert "error" in results["video_b"]
+
+    def test_video_ids_cannot_escape_output_dir(self, image_paths, tmp_path):
+        renderer = SlideshowRenderer(output_dir=tmp_path / "videos", duration=1, fps=5, max_workers=1)
+        try:
+            results = renderer.render_many({"../escaped": {"images": image_paths, "caption": ""}})
+        finally:
+            renderer.close()
+
+        assert "error" in results["../escaped"]
+        assert not (tmp_path / "escaped.mp4").exists()
@@ -0,0 +1 @@
+# Web layer helpers for the Flask API
@@ -0,0 +1,237 @@
+"""
+Admission control - Rate limits, concurrency limits and load shedding
+Expensive routes are wrapped in a gate: each client draws from a token
+bucket, at most N requests of a route group run at once, a few more may
+wait for a slot, and everything beyond that is answered immediately with
+429 and a Retry-After estimate. Requests are refused before they tie up a
+worker thread or an API quota, so unlimited routes (status, listings,
+events) stay fast under overload.
+"""
+
+import math
+import time
+import logging
+import threading
+from functools import wraps
+from typing import Dict, Any, Callable, Iterable, Optional
+
+from flask import jsonify, request
+
+from config.settings import (ADMISSION_ENABLED, ADMISSION_QUEUE_TIMEOUT, CLIENT_BURST,
+                             CLIENT_RATE_PER_MINUTE)
+
+logger = logging.getLogger(__name__)
+
+# Idle client buckets are dropped once this many clients are tracked
+MAX_TRACKED_CLIENTS = 10000
+# Weight of the newest sample in the running average of service time
+SERVICE_TIME_ALPHA = 0.2
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, holding at most `burst`."""
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, now: Optional[float] = None) -> float:
+        """Take one token. Returns 0 on success, else seconds until one is available."""
+        self._refill(time.monotonic() if now is None else now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def is_full(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.burst
+
+
+class RouteGate:
+    """Concurrency limit with a bounded wait queue for one route group."""
+
+    def __init__(self, name: str, max_concurrent: int, max_queue: int, queue_timeout: float = ADMISSION_QUEUE_TIMEOUT,
+                 backlog: Optional[Callable[[], int]] = None, max_backlog: Optional[int] = None):
+        """
+        Args:
+            name: Route group name, used in stats and logs
+            max_concurrent: Requests handled at once
+            max_queue: Requests allowed to wait for a slot; more are shed
+            queue_timeout: Seconds a queued request waits before being shed
+            backlog: Optional callable reporting downstream queue depth
+                (e.g. workflows waiting for the executor)
+            max_backlog: Shed while backlog() is at or above this
+        """
+        self.name = name
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self.backlog = backlog
+        self.max_backlog = max_backlog
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.shed = 0
+        self.avg_seconds = 1.0
+        self._cond = threading.Condition()
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free, from queue depth and average service time."""
+        ahead = self.waiting + 1 + (self.backlog() if self.backlog else 0)
+        return max(1, math.ceil(self.avg_seconds * ahead / self.max_concurrent))
+
+    def acquire(self) -> Optional[int]:
+        """Take a slot, waiting in the queue if allowed. Returns None when admitted, else a Retry-After."""
+        if self.backlog is not None and self.max_backlog is not None and self.backlog() >= self.max_backlog:
+            with self._cond:
+                self.shed += 1
+                return self.retry_after()
+
+        with self._cond:
+            if self.active >= self.max_concurrent:
+                if self.waiting >= self.max_queue:
+                    self.shed += 1
+                    return self.retry_after()
+                self.waiting += 1
+                deadline = time.monotonic() + self.queue_timeout
+                try:
+                    while self.active >= self.max_concurrent:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self.shed += 1
+                            return self.retry_after()
+                        self._cond.wait(remaining)
+                finally:
+                    self.waiting -= 1
+            self.active += 1
+            self.admitted += 1
+            return None
+
+    def release(self, elapsed: Optional[float] = None) -> None:
+        """Free a slot. Without `elapsed` the request was never served and is uncounted."""
+        with self._cond:
+            self.active -= 1
+            if elapsed is None:
+                self.admitted -= 1
+            else:
+                self.avg_seconds += SERVICE_TIME_ALPHA * (elapsed - self.avg_seconds)
+            self._cond.notify()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "active": self.active,
+                "waiting": self.waiting,
+                "max_concurrent": self.max_concurrent,
+                "max_queue": self.max_queue,
+                "admitted": self.admitted,
+                "shed": self.shed,
+                "avg_seconds": round(self.avg_seconds, 3)
+            }
+
+
+def _too_many(message: str, retry_after: int):
+    response = jsonify({"error": message, "retry_after": retry_after})
+    response.status_code = 429
+    response.headers["Retry-After"] = str(retry_after)
+    return response
+
+
+class AdmissionController:
+    """Per-client rate limits plus per-route-group gates, applied with the `limit` decorator."""
+
+    def __init__(self, enabled: bool = ADMISSION_ENABLED, rate_per_minute: float = CLIENT_RATE_PER_MINUTE,
+                 burst: int = CLIENT_BURST, client_key: Optional[Callable[[], str]] = None):
+        """
+        Args:
+            enabled: When False, `limit` leaves views untouched
+            rate_per_minute: Sustained requests per client across all limited routes
+            burst: Requests a client may make back to back
+            client_key: Identifies the client of the current request.
+                Defaults to the remote address (use ProxyFix behind a proxy).
+        """
+        self.enabled = enabled
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+        self.client_key = client_key or (lambda: request.remote_addr or "unknown")
+        self.gates: Dict[str, RouteGate] = {}
+        self.rate_limited = 0
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def _take_token(self, client: str) -> float:
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(client)
+            if bucket is None:
+                if len(self._buckets) >= MAX_TRACKED_CLIENTS:
+                    self._buckets = {k: b for k, b in self._buckets.items() if not b.is_full(now)}
+                bucket = self._buckets[client] = TokenBucket(self.rate, self.burst)
+            wait = bucket.take(now)
+            if wait:
+                self.rate_limited += 1
+            return wait
+
+    def limit(self, name: str, max_concurrent: int, max_queue: int, methods: Optional[Iterable[str]] = None,
+              **gate_options):
+        """
+        Decorator admitting requests to a view through the named gate.
+
+        Views decorated with the same name share one gate. Extra keyword
+        arguments go to RouteGate (queue_timeout, backlog, max_backlog).
+        The gate is checked before the client's token bucket, so requests
+        shed under load do not use up the client's rate budget.
+
+        Args:
+            methods: HTTP methods to limit; others pass straight through. All if None.
+        """
+        limited_methods = {m.upper() for m in methods} if methods else None
+
+        def decorator(view):
+            if not self.enabled:
+                return view
+            gate = self.gates.setdefault(name, RouteGate(name, max_concurrent, max_queue, **gate_options))
+
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if limited_methods is not None and request.method not in limited_methods:
+                    return view(*args, **kwargs)
+
+                client = self.client_key()
+                retry_after = gate.acquire()
+                if retry_after is not None:
+                    logger.warning("Shedding %s request from %s (retry after %ss)", name, client, retry_after)
+                    return _too_many(f"Server busy: too many {name} requests", retry_after)
+
+                wait = self._take_token(client)
+                if wait:
+                    gate.release()
+                    logger.info("Rate limited %s on %s", client, name)
+                    return _too_many("Rate limit exceeded", math.ceil(wait))
+
+                started = time.monotonic()
+                try:
+                    return view(*args, **kwargs)
+                finally:
+                    gate.release(time.monotonic() - started)
+            return wrapper
+        return decorator
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            clients = len(self._buckets)
+        return {
+            "enabled": self.enabled,
+            "clients": clients,
+            "rate_limited": self.rate_limited,
+            "routes": {name: gate.stats() for name, gate in self.gates.items()}
+        }
@@ -0,0 +1,115 @@
+"""
+HTTP caching helpers - version-based ETags and response compression
+"""
+
+import gzip
+import uuid
+import logging
+from functools import wraps
+from typing import Callable
+
+from flask import Flask, Response, make_response, request
+
+try:
+    import brotli
+except ImportError:  # Optional; gzip is always available
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_MIMETYPES = {
+    "application/json",
+    "application/javascript",
+    "text/html",
+    "text/css",
+    "text/plain",
+    "image/svg+xml",
+}
+
+# Version counters restart at 0 in every process; mixing in a per-process
+# epoch keeps ETags from one worker or run from matching another's.
+PROCESS_EPOCH = uuid.uuid4().hex[:8]
+
+
+def conditional(resource: str, version: Callable[[], object]):
+    """
+    Answer GET requests with 304 Not Modified while `version()` is unchanged.
+
+    The version is read before the view runs, so the view (and its JSON
+    serialization) is skipped entirely for unchanged resources. A mutation
+    racing with the request can only make the ETag older than the body,
+    which costs the client one extra full response, never a stale one.
+
+    Args:
+        resource: Name mixed into the ETag so resources never share tags
+        version: Callable returning the resource's current version
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view(*args, **kwargs)
+
+            tag = f"{resource}-{PROCESS_EPOCH}-{version()}"
+            if request.if_none_match.contains_weak(tag):
+                not_modified = Response(status=304)
+                not_modified.set_etag(tag, weak=True)
+                return not_modified
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                response.set_etag(tag, weak=True)
+                response.headers["Cache-Control"] = "no-cache"
+            return response
+        return wrapper
+    return decorator
+
+
+class Compression:
+    """
+    Compress eligible responses with brotli (if installed) or gzip.
+
+    Only buffered, uncompressed responses of compressible types and at
+    least `min_size` bytes are touched; streamed responses pass through.
+    """
+
+    def __init__(self, app: Flask = None, min_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 5):
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        app.after_request(self.compress)
+
+    def _choose_encoding(self) -> str:
+        accepted = request.accept_encodings
+        if brotli is not None and accepted["br"]:
+            return "br"
+        if accepted["gzip"]:
+            return "gzip"
+        return ""
+
+    def compress(self, response: Response) -> Response:
+        if (response.direct_passthrough or response.is_streamed
+                or response.status_code < 200 or response.status_code in (204, 304)
+                or "Content-Encoding" in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        encoding = self._choose_encoding()
+        data = response.get_data()
+        if not encoding or len(data) < self.min_size:
+            return response
+
+        if encoding == "br":
+            compressed = brotli.compress(data, quality=self.brotli_quality)
+        else:
+            compressed = gzip.compress(data, compresslevel=self.gzip_level)
+
+        response.set_data(compressed)
+        response.headers["Content-Encoding"] = encoding
+        response.headers["Content-Length"] = str(len(compressed))
+        return response
@@ -0,0 +1,63 @@
+"""
+Fast JSON provider - orjson-backed serialization for API responses
+Records from agents.records are serialized from their set fields. Without
+orjson installed the provider falls back to Flask's json-based one.
+"""
+
+from typing import Any
+
+from flask import Response
+from flask.json.provider import DefaultJSONProvider
+
+from agents.records import Record
+
+try:
+    import orjson
+except ImportError:  # Optional; the stdlib json path still handles records
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, Record):
+        return obj.to_dict()
+    return DefaultJSONProvider.default(obj)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider that uses orjson when available.
+
+    Install with `app.json = FastJSONProvider(app)`. Output matches the
+    default provider (sorted keys unless sort_keys is turned off), and
+    responses are built from bytes without an intermediate str.
+    """
+
+    default = staticmethod(_default)
+
+    def _options(self, pretty: bool = False) -> int:
+        options = orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if pretty:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        # Custom json.dumps arguments (cls, separators, ...) need the stdlib path
+        if orjson is None or set(kwargs) - {"indent"}:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=_default, option=self._options(bool(kwargs.get("indent")))).decode()
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        if orjson is None:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = (self.compact is None and self._app.debug) or self.compact is False
+        body = orjson.dumps(obj, default=_default, option=self._options(pretty) | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
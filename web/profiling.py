@@ -0,0 +1,95 @@
+"""
+Request tracing and opt-in profiling
+Every API request is recorded as a tracing span. When profiling is
+enabled, a request carrying an "X-Profile: 1" header (or "?profile=1")
+is run under cProfile and the stats are dumped to a .prof file.
+"""
+
+import time
+import uuid
+import cProfile
+import logging
+from pathlib import Path
+from typing import Optional
+
+from flask import Flask, Response, g, request
+
+from agents.tracing import current_trace_id, tracer
+
+logger = logging.getLogger(__name__)
+
+
+class RequestProfiler:
+    """Flask extension adding per-request spans and on-demand cProfile dumps."""
+
+    def __init__(self, app: Flask = None, enabled: bool = False, output_dir: Optional[Path] = None,
+                 token: Optional[str] = None):
+        """
+        Args:
+            app: Flask app to attach to
+            enabled: Allow profiling at all (tracing spans are always recorded)
+            output_dir: Where .prof files are written
+            token: If set, the X-Profile header must carry this value instead of "1"
+        """
+        self.enabled = enabled
+        self.output_dir = Path(output_dir) if output_dir else None
+        self.token = token
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        if self.output_dir is None:
+            from config.settings import LOG_DIR
+            self.output_dir = LOG_DIR / "profiles"
+        app.before_request(self._before)
+        app.after_request(self._after)
+        app.teardown_request(self._teardown)
+
+    def _wants_profile(self) -> bool:
+        if not self.enabled:
+            return False
+        flag = request.headers.get("X-Profile") or request.args.get("profile")
+        if not flag:
+            return False
+        return flag == self.token if self.token else flag in ("1", "true")
+
+    def _before(self) -> None:
+        # Trace and workflow keys are always server-generated; a client-supplied
+        # X-Request-ID is only recorded on the request span for correlation
+        g.request_id = uuid.uuid4().hex[:12]
+        g.client_request_id = (request.headers.get("X-Request-ID") or "")[:128] or None
+        g.trace_token = current_trace_id.set(g.request_id)
+        g.request_started = time.perf_counter()
+        g.profiler = None
+
+        if self._wants_profile():
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+                g.profiler = profiler
+            except ValueError:
+                # Another profiler is active on this interpreter
+                logger.warning("Profiler busy; serving request unprofiled")
+
+    def _after(self, response: Response) -> Response:
+        response.headers["X-Request-ID"] = g.request_id
+        profiler = g.pop("profiler", None)
+        if profiler is not None:
+            profiler.disable()
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            endpoint = (request.endpoint or "unknown").replace(".", "_")
+            path = self.output_dir / f"{time.strftime('%Y%m%dT%H%M%S')}_{endpoint}_{g.request_id}.prof"
+            profiler.dump_stats(str(path))
+            response.headers["X-Profile-File"] = path.name
+            logger.info("Profile for %s %s written to %s", request.method, request.path, path)
+        return response
+
+    def _teardown(self, error=None) -> None:
+        started = g.pop("request_started", None)
+        if started is not None:
+            tracer.record(f"{request.method} {request.url_rule or request.path}", "request",
+                          started, time.perf_counter(), error=type(error).__name__ if error else None,
+                          client_request_id=g.pop("client_request_id", None))
+        token = g.pop("trace_token", None)
+        if token is not None:
+            current_trace_id.reset(token)
@@ -0,0 +1,72 @@
+"""
+Server-sent events - Stream the event bus to browsers
+Each event goes out with its bus id, so the browser's EventSource sends
+it back as Last-Event-ID on reconnect and the stream resumes from there.
+"""
+
+import json
+from typing import Dict, Any, Iterator, Optional
+
+from flask import Response, stream_with_context
+
+from agents.events import EventBus
+from agents.records import json_default
+from config.settings import EVENT_HEARTBEAT_SECONDS
+
+# How long EventSource waits before reconnecting after the stream drops
+RECONNECT_MS = 3000
+
+
+def format_event(event: Dict[str, Any]) -> str:
+    """One event in text/event-stream framing."""
+    data = json.dumps(event, default=json_default, separators=(",", ":"))
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {data}\n\n"
+
+
+def event_stream(bus: EventBus, last_event_id: Optional[int] = None, workflow_id: Optional[str] = None,
+                 heartbeat: float = EVENT_HEARTBEAT_SECONDS, max_events: Optional[int] = None) -> Iterator[str]:
+    """
+    Yield SSE frames: missed events first, then live ones as they are published.
+
+    Without a last_event_id, a per-workflow stream starts with the
+    workflow's buffered events and a global stream starts live. If events
+    the client missed are gone from the buffer, a "reset" event (without an
+    id) tells it to reload its state from the REST API.
+
+    Args:
+        bus: Event source
+        last_event_id: Id of the last event the client received
+        workflow_id: Only stream this workflow's events
+        heartbeat: Seconds between keepalive comments on an idle stream
+        max_events: Stop after this many events (for tests and bounded clients)
+    """
+    if last_event_id is None:
+        cursor = 0 if workflow_id else bus.last_id
+        resumed = False
+    else:
+        cursor, resumed = last_event_id, True
+
+    yield f"retry: {RECONNECT_MS}\n\n"
+    sent = 0
+    while True:
+        events, next_cursor, complete = bus.since(cursor, workflow_id)
+        if resumed and not complete:
+            yield f"event: reset\ndata: {json.dumps({'last_event_id': cursor})}\n\n"
+        resumed = False
+        for event in events:
+            yield format_event(event)
+            sent += 1
+            if max_events is not None and sent >= max_events:
+                return
+        cursor = next_cursor
+        if not bus.wait(cursor, heartbeat):
+            yield ": keepalive\n\n"
+
+
+def sse_response(stream: Iterator[str]) -> Response:
+    """Wrap an SSE generator in an unbuffered streaming response."""
+    return Response(stream_with_context(stream), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        # Stop nginx and similar proxies from buffering the stream
+        "X-Accel-Buffering": "no"
+    })